@@ -1,8 +1,13 @@
+from app.core.cache import ResultCache
 from app.core.config import Config
+from app.core.jobs import JobQueue
+from app.core.metrics import init_request_metrics
+from app.core.pool import init_pool_metrics
 from flask import Flask
 from flask_cors import CORS
 from flask_marshmallow import Marshmallow
 from flask_sqlalchemy import SQLAlchemy
+from src.utils.metrics import Metrics
 
 db = SQLAlchemy()
 ma = Marshmallow()
@@ -15,10 +20,28 @@ def create_app(config_class=Config):
     app.config["INPUT_DIR"].mkdir(parents=True, exist_ok=True)
     app.config["OUTPUT_DIR"].mkdir(parents=True, exist_ok=True)
 
+    app.extensions["metrics"] = Metrics(
+        enabled=app.config.get("METRICS_ENABLED", False),
+        trace_memory=app.config.get("METRICS_TRACE_MEMORY", False),
+    )
+    init_pool_metrics(app, app.extensions["metrics"])
+
     # Initialize extensions
     db.init_app(app)
     ma.init_app(app)
     CORS(app)
+    app.extensions["result_cache"] = ResultCache(
+        cache_dir=app.config.get("RESULT_CACHE_DIR"),
+        ttl=app.config.get("RESULT_CACHE_TTL"),
+    )
+    # Unused barcodes of the current inputs; their allocations are stored in
+    # the database and shared by all workers
+    app.extensions["inventory_cache"] = ResultCache()
+    app.extensions["job_queue"] = JobQueue(
+        max_workers=app.config.get("JOB_WORKERS", 2),
+        state_dir=app.config.get("JOB_STATE_DIR"),
+    )
+    init_request_metrics(app, app.extensions["metrics"])
 
     # Register blueprints
     from app.api.routes import bp as api_bp
@@ -1,25 +1,53 @@
-from functools import lru_cache
 from http import HTTPStatus
 from pathlib import Path
-from typing import Any, Dict, Tuple
+from typing import Any, Dict, Iterable, Optional, Tuple
 
+from app.core.cache import fingerprint
+from app.core.jobs import Job
 from app.schemas.schemas import (
+    AllocateBarcodesSchema,
     CustomerOrderQuerySchema,
     OrderSchema,
+    PaginationQuerySchema,
+    ReleaseBarcodesSchema,
     TopCustomerSchema,
     UnusedBarcodeSchema,
 )
-from flask import Blueprint, current_app, jsonify, request
+from flask import Blueprint, Response, current_app, request
 from marshmallow import ValidationError
-from src.data_processing.processor import OrderProcessor
+from src.data_processing.dataset import ProcessedDataset
+from src.data_processing.incremental import IncrementalProcessor
+from src.data_processing.inventory import BarcodeInventory
+from src.data_processing.parallel import DEFAULT_PARTITION_SIZE
+from src.data_processing.processor import DEFAULT_DB_BATCH_SIZE, OrderProcessor
+from src.data_processing.queries import (
+    DATABASE_BACKEND,
+    MEMORY_BACKEND,
+    DatabaseQueries,
+)
+from src.exceptions import InventoryError
 from src.utils.logger import setup_logger
 
+from .serialization import (
+    barcode_records,
+    json_response,
+    ndjson_lines,
+    ndjson_response,
+    orders_records,
+    top_customers_records,
+    unused_barcodes_record,
+    validated,
+)
+
 bp = Blueprint("api", __name__)
 logger = setup_logger()
 
 # Initialize schemas
 order_schema = OrderSchema()
 customer_query_schema = CustomerOrderQuerySchema()
+pagination_query_schema = PaginationQuerySchema()
+allocate_barcodes_schema = AllocateBarcodesSchema()
+release_barcodes_schema = ReleaseBarcodesSchema()
 top_customer_schema = TopCustomerSchema(many=True)
 unused_barcode_schema = UnusedBarcodeSchema()
 
@@ -37,26 +65,185 @@ def error_response(message: str, status_code: int) -> Tuple[Dict[str, Any], int]
     return ({"status": "error", "message": message}, status_code)
 
 
-# Add lru_cache(Least Recently Used Cache) to cache processed data
-@lru_cache(maxsize=1)
-def get_processed_data(input_dir: str, output_dir: str):
+def get_processed_data(input_dir: str, output_dir: str) -> ProcessedDataset:
     """Cache and return processed data.
 
+    The result is cached in the app's result cache, which is invalidated when
+    orders.csv or barcodes.csv change and shared between worker processes.
+
+    Args:
+        input_dir (str): Input directory path
+        output_dir (str): Output directory path
+
+    Returns:
+        ProcessedDataset: Processed order data with lookup indexes
+    """
+
+    def compute():
+        processor = OrderProcessor(
+            logger=logger,
+            input_dir=input_dir,
+            output_dir=output_dir,
+            snapshot_dir=current_app.config.get("SNAPSHOT_DIR"),
+            metrics=current_app.extensions["metrics"],
+        )
+
+        # Set the input directory for the loader
+        processor.loader.input_dir = Path(input_dir)
+
+        workers = current_app.config.get("PROCESS_WORKERS", 1)
+        if workers <= 1:
+            return processor.process_dataset()
+
+        result_df = processor.process_parallel(
+            workers,
+            current_app.config.get("PARTITION_SIZE", DEFAULT_PARTITION_SIZE),
+        )
+        _, unused_barcodes_df = processor.get_unused_barcodes(result_df)
+        return ProcessedDataset.from_frame(
+            result_df, unused_barcodes_df["barcode"].to_numpy()
+        )
+
+    return current_app.extensions["result_cache"].get_or_compute(
+        f"processed:{input_dir}",
+        [Path(input_dir) / "orders.csv", Path(input_dir) / "barcodes.csv"],
+        compute,
+    )
+
+
+def get_barcode_inventory(input_dir: str, output_dir: str) -> BarcodeInventory:
+    """Return the unused-barcode inventory of the current inputs.
+
+    The inventory is built once per input fingerprint from the processed
+    data and kept in this process; allocations are read from and written to
+    the database, so all workers share them.
+
     Args:
         input_dir (str): Input directory path
         output_dir (str): Output directory path
 
     Returns:
-        pd.DataFrame: Processed order data
+        BarcodeInventory: Unused barcodes available for new orders
     """
-    processor = OrderProcessor(
-        logger=logger, input_dir=input_dir, output_dir=output_dir
+    return current_app.extensions["inventory_cache"].get_or_compute(
+        f"inventory:{input_dir}",
+        [Path(input_dir) / "orders.csv", Path(input_dir) / "barcodes.csv"],
+        lambda: BarcodeInventory(
+            get_processed_data(input_dir, output_dir).unused_barcodes
+        ),
     )
 
-    # Set the input directory for the loader
-    processor.loader.input_dir = Path(input_dir)
 
-    return processor.process()
+def database_queries() -> Optional[DatabaseQueries]:
+    """Return the database query engine when QUERY_BACKEND selects it.
+
+    Returns:
+        Optional[DatabaseQueries]: Query engine, or None to serve analytics
+            from the processed CSV data
+    """
+    backend = current_app.config.get("QUERY_BACKEND", MEMORY_BACKEND)
+    return DatabaseQueries() if backend == DATABASE_BACKEND else None
+
+
+def purge_processed_data() -> None:
+    """Drop all cached processed data."""
+    current_app.extensions["result_cache"].purge()
+
+
+def next_cursor(items, key, limit: Optional[int]) -> Optional[int]:
+    """Return the cursor of the next page, or None on the last page."""
+    if limit is None or len(items) < limit:
+        return None
+    return int(key(items))
+
+
+def save_to_database(
+    processor: OrderProcessor,
+    result_df,
+    unused_barcodes: Optional[Iterable[int]] = None,
+) -> Optional[Dict]:
+    """Save processed data with the ingestion mode selected in the config.
+
+    Args:
+        processor (OrderProcessor): Processor performing the ingestion
+        result_df (Union[pd.DataFrame, ProcessedDataset]): Processed data to
+            save
+        unused_barcodes (Iterable[int], optional): Barcodes without an order,
+            defaults to those of a ProcessedDataset
+
+    Returns:
+        Optional[Dict]: Rows inserted and skipped per table for bulk ingestion
+    """
+    if current_app.config.get("DB_BULK_INSERT", True):
+        return processor.bulk_save_to_database(
+            result_df,
+            batch_size=current_app.config.get("DB_BATCH_SIZE", DEFAULT_DB_BATCH_SIZE),
+            unused_barcodes=unused_barcodes,
+        )
+    if isinstance(result_df, ProcessedDataset):
+        result_df = result_df.to_frame()
+    processor.save_to_database(result_df)
+    return None
+
+
+def enqueue_processing_job(input_dir: str, output_dir: str) -> Job:
+    """Enqueue saving processed data to CSV and the database.
+
+    Requests for unchanged inputs share the job that is queued, running or
+    succeeded for the same input fingerprint, so they are saved only once.
+    The job saves the processed
+    dataset of :func:`get_processed_data`, so inputs are parsed and merged
+    once for both the response and the job.
+
+    Args:
+        input_dir (str): Input directory path
+        output_dir (str): Output directory path
+
+    Returns:
+        Job: The processing job
+    """
+    app = current_app._get_current_object()
+    sources = [Path(input_dir) / "orders.csv", Path(input_dir) / "barcodes.csv"]
+
+    def run(job: Job):
+        with app.app_context():
+            processor = OrderProcessor(
+                logger=logger,
+                input_dir=input_dir,
+                output_dir=output_dir,
+                metrics=app.extensions["metrics"],
+            )
+            with processor.metrics.run(job_id=job.id) as metrics_run:
+                stats = process(job, processor)
+            processor.save_run_report(metrics_run)
+            return stats
+
+    def process(job: Job, processor: OrderProcessor) -> Optional[Dict]:
+        if app.config.get("INCREMENTAL_PROCESSING", False):
+            # Only new or changed orders and new unused barcodes are written
+            # to the database
+            stats = {}
+            with job.stage("incremental", 1.0):
+                IncrementalProcessor(processor).run(
+                    apply_delta=lambda delta_df, unused_barcodes: stats.update(
+                        save_to_database(processor, delta_df, unused_barcodes) or {}
+                    )
+                )
+            return stats
+
+        # The dataset the request processed is reused from the result cache;
+        # when it is not cached anymore, it is processed inside the job's
+        # metrics run, so the run report covers loading and merging as well
+        with job.stage("process", 0.2):
+            dataset = get_processed_data(input_dir, output_dir)
+        with job.stage("save_results", 0.4):
+            processor.save_results(dataset)
+        with job.stage("save_to_database", 1.0):
+            return save_to_database(processor, dataset)
+
+    return app.extensions["job_queue"].submit(
+        f"process:{input_dir}:{fingerprint(sources)}", run
+    )
 
 
 @bp.route("/", methods=["GET"])
@@ -65,10 +252,36 @@ def index():
     return {"message": "Welcome to the Tiqets Order Processor API!"}, 200
 
 
+@bp.route("/metrics", methods=["GET"])
+def get_metrics():
+    """Per-stage and per-request metrics in Prometheus text format.
+
+    Metrics are only recorded when METRICS_ENABLED is set; otherwise the
+    metric families are empty.
+    """
+    return Response(
+        current_app.extensions["metrics"].render_prometheus(),
+        mimetype="text/plain; version=0.0.4",
+    )
+
+
+@bp.route("/cache", methods=["DELETE"])
+def purge_cache():
+    """Purge the processed-data cache so the next request reprocesses inputs."""
+    purge_processed_data()
+    return {"status": "success", "message": "Cache purged"}, HTTPStatus.OK
+
+
 @bp.route("/process", methods=["GET"])
 def process_orders():
     """Process order and barcode data and return comprehensive results.
 
+    Query Parameters:
+        limit (int, optional): Page size for orders; all orders when not set
+        after (int, optional): order_id of the last order of the previous page
+        format (str, optional): "json" (default) or "ndjson" to stream orders
+            and unused barcodes as one JSON object per line
+
     Returns:
         JSON response containing:
         - Processed orders
@@ -87,75 +300,140 @@ def process_orders():
                     "details": [...]
                 }
             }
-        }
+        },
+        "pagination": {"limit": int, "next": int | null},  # paginated only
+        "job": {"id": str, "status": str}  # first page only
     }
 
+    Paginated responses list unused barcode details only through
+    /api/barcodes/unused; their "unused_barcodes" entry holds the count.
+
+    Saving the results to CSV and the database is enqueued as a background
+    job; the response carries its ID under "job" (or the X-Job-Id header for
+    NDJSON) and /api/jobs/<id> reports its progress.
+
     Error Responses:
+        400: Bad Request - Invalid pagination parameters
         500: Internal Server Error - Processing failed
     """
     try:
         # Get paths from config
         input_dir = str(current_app.config["INPUT_DIR"])
         output_dir = str(current_app.config["OUTPUT_DIR"])
+        params = pagination_query_schema.load(request.args)
+        limit, after = params["limit"], params["after"]
 
-        # Use cached data processing
-        result_df = get_processed_data(input_dir, output_dir)
+        dataset = get_processed_data(input_dir, output_dir)
+        try:
+            rows = dataset.orders_page(after=after, limit=limit)
+        except KeyError:
+            raise ValidationError({"after": [f"Unknown order {after}"]})
 
-        # Create processor for operations
-        processor = OrderProcessor(
-            logger=logger, input_dir=input_dir, output_dir=output_dir
-        )
+        # Saving to CSV and database runs in the background, once per listing
+        job = enqueue_processing_job(input_dir, output_dir) if after is None else None
+
+        # Paginated listings only page orders; unused barcodes have their own
+        inventory = get_barcode_inventory(input_dir, output_dir)
+        unused = inventory.page(limit=0 if limit is not None else None)
 
-        # Save both to CSV and database
-        processor.save_results(result_df)
-        processor.save_to_database(result_df)
+        if params["format"] == "ndjson":
+
+            def lines():
+                yield from ndjson_lines(
+                    lambda start, end: [
+                        {"type": "order", **record}
+                        for record in orders_records(dataset, rows[start:end])
+                    ],
+                    len(rows),
+                )
+                yield from ndjson_lines(
+                    lambda start, end: [
+                        {"type": "unused_barcode", **record}
+                        for record in barcode_records(unused[start:end])
+                    ],
+                    len(unused),
+                )
 
-        # Get analytics
-        top_customers = processor.get_top_customers(result_df)
-        unused_count, unused_barcodes_df = processor.get_unused_barcodes(result_df)
+            response = ndjson_response(lines())
+            if job is not None:
+                response.headers["X-Job-Id"] = job.id
+            return response
+
+        if limit is None:
+            unused_barcodes = unused_barcodes_record(len(inventory), unused)
+        else:
+            unused_barcodes = {"count": len(inventory)}
 
         # Prepare response data
         response = {
             "status": "success",
             "data": {
-                "orders": order_schema.dump(
-                    [
-                        {
-                            "customer_id": int(row["customer_id"]),
-                            "order_id": int(row["order_id"]),
-                            "barcodes": [int(b) for b in row["barcode"]],
-                        }
-                        for _, row in result_df.iterrows()
-                    ],
-                    many=True,
+                "orders": validated(
+                    order_schema, orders_records(dataset, rows), many=True
                 ),
                 "analytics": {
-                    "top_customers": top_customer_schema.dump(
-                        [
-                            {"customer_id": int(cust_id), "ticket_count": int(count)}
-                            for cust_id, count in top_customers
-                        ]
+                    "top_customers": validated(
+                        top_customer_schema,
+                        top_customers_records(dataset.top_customers()),
                     ),
-                    "unused_barcodes": unused_barcode_schema.dump(
-                        {
-                            "count": int(unused_count),
-                            "barcodes": [
-                                {"barcode": int(row["barcode"]), "order_id": None}
-                                for _, row in unused_barcodes_df.iterrows()
-                            ],
-                        }
+                    "unused_barcodes": validated(
+                        unused_barcode_schema, unused_barcodes
                     ),
                 },
             },
         }
+        if limit is not None:
+            response["pagination"] = {
+                "limit": limit,
+                "next": next_cursor(
+                    rows, lambda rows: dataset.order_ids[rows[-1]], limit
+                ),
+            }
+        if job is not None:
+            response["job"] = {"id": job.id, "status": job.status}
 
-        return jsonify(response), HTTPStatus.OK
+        return json_response(response)
 
+    except ValidationError as err:
+        return error_response(str(err.messages), HTTPStatus.BAD_REQUEST)
     except Exception as e:
         logger.error(f"Error processing orders: {str(e)}")
         return error_response(str(e), HTTPStatus.INTERNAL_SERVER_ERROR)
 
 
+@bp.route("/jobs/<job_id>", methods=["GET"])
+def get_job(job_id):
+    """Get the status of a background processing job.
+
+    Args:
+        job_id (str): ID returned by /api/process
+
+    Response format:
+    {
+        "status": "success",
+        "data": {
+            "id": str,
+            "status": "queued" | "running" | "succeeded" | "failed",
+            "progress": float,
+            "error": str | null,
+            "result": {...} | null,
+            "created_at": float,
+            "started_at": float | null,
+            "finished_at": float | null,
+            "duration": float | null,
+            "timings": {"stage": seconds, ...}
+        }
+    }
+
+    Error Responses:
+        404: Not Found - Unknown job
+    """
+    job = current_app.extensions["job_queue"].get(job_id)
+    if job is None:
+        return error_response(f"Job {job_id} not found", HTTPStatus.NOT_FOUND)
+    return json_response({"status": "success", "data": job.to_dict()})
+
+
 @bp.route("/customers/top", methods=["GET"])
 def get_top_customers():
     """Get top customers by ticket count.
@@ -184,22 +462,17 @@ def get_top_customers():
     """
     try:
         params = customer_query_schema.load(request.args)
-        input_dir = str(current_app.config["INPUT_DIR"])
-        output_dir = str(current_app.config["OUTPUT_DIR"])
-
-        result_df = get_processed_data(input_dir, output_dir)
-        processor = OrderProcessor(
-            logger=logger, input_dir=input_dir, output_dir=output_dir
-        )
-        top_customers = processor.get_top_customers(result_df, limit=params["limit"])
-
-        result = top_customer_schema.dump(
-            [
-                {"customer_id": int(cust_id), "ticket_count": int(count)}
-                for cust_id, count in top_customers
-            ]
-        )
-        return jsonify({"status": "success", "data": result}), HTTPStatus.OK
+        queries = database_queries()
+        if queries is not None:
+            top_customers = queries.top_customers(limit=params["limit"])
+        else:
+            input_dir = str(current_app.config["INPUT_DIR"])
+            output_dir = str(current_app.config["OUTPUT_DIR"])
+            dataset = get_processed_data(input_dir, output_dir)
+            top_customers = dataset.top_customers(limit=params["limit"])
+
+        result = validated(top_customer_schema, top_customers_records(top_customers))
+        return json_response({"status": "success", "data": result})
 
     except ValidationError as err:
         return error_response(str(err.messages), HTTPStatus.BAD_REQUEST)
@@ -212,10 +485,16 @@ def get_top_customers():
 def get_unused_barcodes():
     """Get information about unused barcodes in the system.
 
+    Query Parameters:
+        limit (int, optional): Page size; all barcodes when not set
+        after (int, optional): Last barcode of the previous page
+        format (str, optional): "json" (default) or "ndjson" to stream one
+            barcode object per line
+
     Returns:
         JSON response containing:
         - Count of unused barcodes
-        - Details of each unused barcode
+        - Details of each unused barcode, in ascending barcode order
 
     Response format:
     {
@@ -229,36 +508,146 @@ def get_unused_barcodes():
                 },
                 ...
             ]
-        }
+        },
+        "pagination": {"limit": int, "next": int | null}  # paginated only
     }
 
     Error Responses:
+        400: Bad Request - Invalid pagination parameters
         500: Internal Server Error - Processing failed
     """
     try:
-        input_dir = str(current_app.config["INPUT_DIR"])
-        output_dir = str(current_app.config["OUTPUT_DIR"])
+        params = pagination_query_schema.load(request.args)
+        limit = params["limit"]
+
+        queries = database_queries()
+        if queries is not None:
+            count = queries.unused_count()
+            barcodes = queries.unused_page(after=params["after"], limit=limit)
+        else:
+            input_dir = str(current_app.config["INPUT_DIR"])
+            output_dir = str(current_app.config["OUTPUT_DIR"])
+            inventory = get_barcode_inventory(input_dir, output_dir)
+            count = len(inventory)
+            barcodes = inventory.page(after=params["after"], limit=limit)
+
+        if params["format"] == "ndjson":
+            return ndjson_response(
+                ndjson_lines(
+                    lambda start, end: barcode_records(barcodes[start:end]),
+                    len(barcodes),
+                )
+            )
+
+        result = validated(
+            unused_barcode_schema,
+            unused_barcodes_record(count, barcodes),
+        )
+        response = {"status": "success", "data": result}
+        if limit is not None:
+            response["pagination"] = {
+                "limit": limit,
+                "next": next_cursor(barcodes, lambda items: items[-1], limit),
+            }
+        return json_response(response)
 
-        result_df = get_processed_data(input_dir, output_dir)
-        processor = OrderProcessor(logger)
-        unused_count, unused_barcodes_df = processor.get_unused_barcodes(result_df)
+    except ValidationError as err:
+        return error_response(str(err.messages), HTTPStatus.BAD_REQUEST)
+    except Exception as e:
+        logger.error(f"Error getting unused barcodes: {str(e)}")
+        return error_response(str(e), HTTPStatus.INTERNAL_SERVER_ERROR)
 
-        # Prepare data for schema
-        data = {
-            "count": int(unused_count),
-            "barcodes": [
-                {"barcode": int(row["barcode"]), "order_id": None}
-                for _, row in unused_barcodes_df.iterrows()
-            ],
+
+@bp.route("/barcodes/allocate", methods=["POST"])
+def allocate_barcodes():
+    """Allocate unused barcodes for a new order.
+
+    The lowest available barcodes are taken atomically and no longer listed
+    by /api/barcodes/unused until they are released.
+
+    Request body:
+    {
+        "count": int  # 1 to 10000
+    }
+
+    Response format:
+    {
+        "status": "success",
+        "data": {
+            "barcodes": [int, ...],
+            "remaining": int
         }
+    }
+
+    Error Responses:
+        400: Bad Request - Invalid count
+        409: Conflict - Not enough unused barcodes
+        500: Internal Server Error - Processing failed
+    """
+    try:
+        params = allocate_barcodes_schema.load(request.get_json(silent=True) or {})
+        inventory = get_barcode_inventory(
+            str(current_app.config["INPUT_DIR"]), str(current_app.config["OUTPUT_DIR"])
+        )
+        barcodes = inventory.allocate(params["count"])
+        return json_response(
+            {
+                "status": "success",
+                "data": {"barcodes": barcodes.tolist(), "remaining": len(inventory)},
+            }
+        )
+
+    except ValidationError as err:
+        return error_response(str(err.messages), HTTPStatus.BAD_REQUEST)
+    except InventoryError as e:
+        return error_response(str(e), HTTPStatus.CONFLICT)
+    except Exception as e:
+        logger.error(f"Error allocating barcodes: {str(e)}")
+        return error_response(str(e), HTTPStatus.INTERNAL_SERVER_ERROR)
 
-        # Validate and serialize with schema
-        result = unused_barcode_schema.dump(data)
 
-        return jsonify({"status": "success", "data": result}), HTTPStatus.OK
+@bp.route("/barcodes/release", methods=["POST"])
+def release_barcodes():
+    """Return allocated barcodes to the unused inventory.
+
+    Request body:
+    {
+        "barcodes": [int, ...]  # barcodes returned by /api/barcodes/allocate
+    }
+
+    Response format:
+    {
+        "status": "success",
+        "data": {
+            "released": int,
+            "remaining": int
+        }
+    }
+
+    Error Responses:
+        400: Bad Request - Invalid barcode list
+        409: Conflict - Barcodes that were not allocated
+        500: Internal Server Error - Processing failed
+    """
+    try:
+        params = release_barcodes_schema.load(request.get_json(silent=True) or {})
+        inventory = get_barcode_inventory(
+            str(current_app.config["INPUT_DIR"]), str(current_app.config["OUTPUT_DIR"])
+        )
+        released = inventory.release(params["barcodes"])
+        return json_response(
+            {
+                "status": "success",
+                "data": {"released": released, "remaining": len(inventory)},
+            }
+        )
 
+    except ValidationError as err:
+        return error_response(str(err.messages), HTTPStatus.BAD_REQUEST)
+    except InventoryError as e:
+        return error_response(str(e), HTTPStatus.CONFLICT)
     except Exception as e:
-        logger.error(f"Error getting unused barcodes: {str(e)}")
+        logger.error(f"Error releasing barcodes: {str(e)}")
         return error_response(str(e), HTTPStatus.INTERNAL_SERVER_ERROR)
 
 
@@ -290,31 +679,22 @@ def get_customer_orders(customer_id):
         500: Internal Server Error - Processing failed
     """
     try:
-        input_dir = str(current_app.config["INPUT_DIR"])
-        output_dir = str(current_app.config["OUTPUT_DIR"])
-
-        result_df = get_processed_data(input_dir, output_dir)
-        customer_orders = result_df[result_df["customer_id"] == customer_id]
-
-        if customer_orders.empty:
+        queries = database_queries()
+        if queries is not None:
+            records = queries.customer_orders(customer_id)
+        else:
+            input_dir = str(current_app.config["INPUT_DIR"])
+            output_dir = str(current_app.config["OUTPUT_DIR"])
+            dataset = get_processed_data(input_dir, output_dir)
+            records = orders_records(dataset, dataset.customer_orders(customer_id))
+
+        if not records:
             return error_response(
                 f"No orders found for customer {customer_id}", HTTPStatus.NOT_FOUND
             )
 
-        # Convert DataFrame to format matching schema
-        orders_data = [
-            {
-                "customer_id": int(row["customer_id"]),
-                "order_id": int(row["order_id"]),
-                "barcodes": [int(b) for b in row["barcode"]],
-            }
-            for _, row in customer_orders.iterrows()
-        ]
-
-        # Validate and serialize with schema
-        result = order_schema.dump(orders_data, many=True)
-
-        return jsonify({"status": "success", "data": result}), HTTPStatus.OK
+        result = validated(order_schema, records, many=True)
+        return json_response({"status": "success", "data": result})
 
     except Exception as e:
         logger.error(f"Error getting customer orders: {str(e)}")
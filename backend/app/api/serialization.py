@@ -0,0 +1,125 @@
+from http import HTTPStatus
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import orjson
+from flask import current_app
+from src.data_processing.dataset import ProcessedDataset
+
+# Records encoded per chunk of a streamed NDJSON response
+NDJSON_BATCH_SIZE = 1000
+
+
+def dumps(payload: Any) -> bytes:
+    """Encode a payload to JSON bytes with orjson.
+
+    Args:
+        payload (Any): JSON-compatible data, may contain numpy values
+
+    Returns:
+        bytes: Encoded JSON
+    """
+    return orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY)
+
+
+def json_response(payload: Any, status: int = HTTPStatus.OK):
+    """Build a JSON response from pre-encoded bytes, bypassing jsonify.
+
+    Args:
+        payload (Any): JSON-compatible data
+        status (int): HTTP status code
+
+    Returns:
+        Response: Flask response with JSON body
+    """
+    return current_app.response_class(
+        dumps(payload), status=status, mimetype="application/json"
+    )
+
+
+def validated(schema, data: Any, many: Optional[bool] = None) -> Any:
+    """Run data through a marshmallow schema in response validation mode.
+
+    Schemas are only applied when ``VALIDATE_RESPONSES`` is enabled, since
+    dumping large payloads through marshmallow is expensive.
+
+    Args:
+        schema (Schema): Marshmallow schema describing the data
+        data (Any): Data to serialize
+        many (bool, optional): Whether data is a collection, defaults to the
+            schema's own setting
+
+    Returns:
+        Any: Serialized data
+    """
+    if current_app.config.get("VALIDATE_RESPONSES", False):
+        return schema.dump(data, many=many)
+    return data
+
+
+def orders_records(dataset: ProcessedDataset, rows: range) -> List[Dict[str, Any]]:
+    """Convert processed orders to response records from the flat arrays.
+
+    Args:
+        dataset (ProcessedDataset): Processed orders data
+        rows (range): Order rows to convert
+
+    Returns:
+        List[Dict[str, Any]]: Records with customer_id, order_id and barcodes
+    """
+    return [
+        {"customer_id": customer_id, "order_id": order_id, "barcodes": barcodes}
+        for customer_id, order_id, barcodes in dataset.iter_orders(rows)
+    ]
+
+
+def top_customers_records(top_customers: List[Tuple[int, int]]) -> List[Dict[str, int]]:
+    """Convert (customer_id, ticket_count) tuples to response records."""
+    return [
+        {"customer_id": int(customer_id), "ticket_count": int(count)}
+        for customer_id, count in top_customers
+    ]
+
+
+def unused_barcodes_record(count: int, barcodes: np.ndarray) -> Dict[str, Any]:
+    """Convert unused barcodes to the response record.
+
+    Args:
+        count (int): Number of unused barcodes
+        barcodes (np.ndarray): Unused barcodes to list
+
+    Returns:
+        Dict[str, Any]: Record with count and barcode details
+    """
+    return {"count": int(count), "barcodes": barcode_records(barcodes)}
+
+
+def barcode_records(barcodes: np.ndarray) -> List[Dict[str, Any]]:
+    """Convert unused barcodes to response records."""
+    return [{"barcode": barcode, "order_id": None} for barcode in barcodes.tolist()]
+
+
+def ndjson_lines(
+    records: Callable[[int, int], List[Dict[str, Any]]],
+    total: int,
+    batch_size: int = NDJSON_BATCH_SIZE,
+) -> Iterator[bytes]:
+    """Encode records as newline-delimited JSON, one batch at a time.
+
+    Args:
+        records (Callable[[int, int], List[Dict]]): Builds the records of a
+            ``[start, end)`` range
+        total (int): Number of records
+        batch_size (int): Records encoded per yielded chunk
+
+    Yields:
+        bytes: Encoded lines of one batch
+    """
+    for start in range(0, total, batch_size):
+        batch = records(start, min(start + batch_size, total))
+        yield b"".join(dumps(record) + b"\n" for record in batch)
+
+
+def ndjson_response(lines: Iterator[bytes]):
+    """Build a streaming NDJSON response from a line generator."""
+    return current_app.response_class(lines, mimetype="application/x-ndjson")
@@ -0,0 +1,243 @@
+import asyncio
+import multiprocessing
+import os
+import queue
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from flask import Flask
+from werkzeug.exceptions import HTTPException
+from werkzeug.test import EnvironBuilder
+
+# Read-only views served from the shared processed-data cache on the pool
+READ_ENDPOINTS = {
+    "api.get_top_customers",
+    "api.get_unused_barcodes",
+    "api.get_customer_orders",
+}
+
+# Seconds between checks that a process worker is still rendering
+QUEUE_POLL_INTERVAL = 1.0
+
+# ASGI response message, as passed to ``send``
+Message = Dict[str, Any]
+
+# Flask app of a process-pool worker, created by _init_worker
+_worker_app: Optional[Flask] = None
+
+
+def render(
+    app: Flask,
+    emit: Callable[[Message], None],
+    method: str,
+    path: str,
+    query_string: bytes,
+    headers,
+    body: bytes,
+) -> None:
+    """Dispatch one request through the Flask app and emit the response.
+
+    Runs on a pool thread or process, so the JSON building and encoding of
+    the views never blocks the event loop. Streamed responses, such as the
+    NDJSON listings, are emitted one chunk at a time as the view yields
+    them; other responses are emitted as one body message.
+
+    Args:
+        app (Flask): Application
+        emit (Callable[[Message], None]): Delivers each ASGI response
+            message to the client, blocking until it is accepted
+        method (str): HTTP method
+        path (str): Request path
+        query_string (bytes): Raw query string
+        headers: Request headers as (name, value) pairs
+        body (bytes): Request body
+    """
+    environ = EnvironBuilder(
+        path=path,
+        method=method,
+        query_string=query_string.decode("latin-1"),
+        headers=headers,
+        data=body,
+    ).get_environ()
+    with app.request_context(environ):
+        try:
+            response = app.full_dispatch_request()
+        except Exception as e:
+            response = app.handle_exception(e)
+        emit(
+            {
+                "type": "http.response.start",
+                "status": response.status_code,
+                "headers": [
+                    (name.lower().encode("latin-1"), value.encode("latin-1"))
+                    for name, value in response.headers.to_wsgi_list()
+                ],
+            }
+        )
+        if not response.is_streamed:
+            emit({"type": "http.response.body", "body": response.get_data()})
+            return
+        try:
+            for chunk in response.iter_encoded():
+                if chunk:
+                    emit(
+                        {"type": "http.response.body", "body": chunk, "more_body": True}
+                    )
+        finally:
+            response.close()
+            emit({"type": "http.response.body", "body": b""})
+
+
+def _init_worker(config_class) -> None:
+    global _worker_app
+    from app import create_app
+
+    _worker_app = create_app(config_class)
+
+
+def _render_in_worker(messages, *args) -> None:
+    # None tells the event loop that no more messages follow
+    try:
+        render(_worker_app, messages.put, *args)
+    finally:
+        messages.put(None)
+
+
+class AsyncAPI:
+    """ASGI application serving the Flask API from an event loop.
+
+    The read endpoints (top customers, unused barcodes, customer orders) are
+    dispatched to a thread or process pool; every worker reads the shared
+    processed-data cache. Other endpoints run on the event loop's default
+    thread pool against the main app, since they share in-process state such
+    as the job queue. URLs and responses are those of the Flask views, and
+    streamed responses reach the client chunk by chunk: thread workers send
+    each chunk through the event loop and wait for it, process workers pass
+    them through a queue of a shared manager process.
+    """
+
+    def __init__(
+        self,
+        flask_app: Flask,
+        executor: str = "thread",
+        workers: Optional[int] = None,
+        config_class=None,
+    ):
+        """Initialize AsyncAPI.
+
+        Args:
+            flask_app (Flask): Application whose views are served
+            executor (str): "thread" or "process" pool for the read endpoints
+            workers (int, optional): Pool size, defaults to the CPU count
+            config_class (optional): Config of the app created in each process
+                worker; must be importable by the workers
+        """
+        self.flask_app = flask_app
+        self.url_adapter = flask_app.url_map.bind("localhost")
+        self.workers = workers or os.cpu_count() or 1
+        self.executor_type = executor
+        self.config_class = config_class
+        self._executor: Optional[Executor] = None
+        self._manager = None
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            if self.executor_type == "process":
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    initializer=_init_worker,
+                    initargs=(self.config_class,),
+                )
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="asgi-read"
+                )
+        return self._executor
+
+    async def __call__(self, scope: Dict[str, Any], receive, send) -> None:
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+
+        body = b""
+        while True:
+            message = await receive()
+            body += message.get("body", b"")
+            if not message.get("more_body"):
+                break
+
+        method = scope["method"]
+        path = scope["path"]
+        headers = [
+            (name.decode("latin-1"), value.decode("latin-1"))
+            for name, value in scope.get("headers", [])
+        ]
+        args = (method, path, scope.get("query_string", b""), headers, body)
+
+        loop = asyncio.get_running_loop()
+        if not self._is_read_endpoint(method, path):
+            await loop.run_in_executor(
+                None, render, self.flask_app, self._emitter(loop, send), *args
+            )
+        elif self.executor_type == "process":
+            messages = self.manager.Queue()
+            call = loop.run_in_executor(
+                self.executor, _render_in_worker, messages, *args
+            )
+            while True:
+                try:
+                    message = await loop.run_in_executor(
+                        None, messages.get, True, QUEUE_POLL_INTERVAL
+                    )
+                except queue.Empty:
+                    # A worker that died never ends its messages
+                    if call.done():
+                        break
+                    continue
+                if message is None:
+                    break
+                await send(message)
+            await call
+        else:
+            await loop.run_in_executor(
+                self.executor, render, self.flask_app, self._emitter(loop, send), *args
+            )
+
+    @property
+    def manager(self):
+        """Manager process holding the message queues of process workers."""
+        if self._manager is None:
+            self._manager = multiprocessing.Manager()
+        return self._manager
+
+    @staticmethod
+    def _emitter(loop: asyncio.AbstractEventLoop, send) -> Callable[[Message], None]:
+        """Build a blocking ``emit`` for pool threads that sends on the loop."""
+
+        def emit(message: Message) -> None:
+            asyncio.run_coroutine_threadsafe(send(message), loop).result()
+
+        return emit
+
+    def _is_read_endpoint(self, method: str, path: str) -> bool:
+        try:
+            endpoint, _ = self.url_adapter.match(path, method)
+        except HTTPException:
+            return False
+        return endpoint in READ_ENDPOINTS
+
+    async def _lifespan(self, receive, send) -> None:
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                if self._executor is not None:
+                    self._executor.shutdown(wait=False, cancel_futures=True)
+                if self._manager is not None:
+                    self._manager.shutdown()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
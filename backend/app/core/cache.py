@@ -0,0 +1,256 @@
+import fcntl
+import hashlib
+import mmap
+import os
+import pickle
+import struct
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+# Shared entry layout: payload size and buffer count, then the offset and
+# size of each out-of-band buffer, the pickle payload and the buffers
+_HEADER = struct.Struct("<QQ")
+_BUFFER = struct.Struct("<QQ")
+
+# Alignment of out-of-band buffers in shared entries, in bytes
+_BUFFER_ALIGNMENT = 64
+
+
+def fingerprint(sources: Iterable[Path]) -> str:
+    """Fingerprint input files by path, size and modification time.
+
+    Args:
+        sources (Iterable[Path]): Input files the cached result depends on
+
+    Returns:
+        str: Hex digest changing whenever one of the files changes
+    """
+    digest = hashlib.sha256()
+    for source in sources:
+        try:
+            stat = Path(source).stat()
+            digest.update(f"{source}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+        except FileNotFoundError:
+            digest.update(f"{source}:missing;".encode())
+    return digest.hexdigest()
+
+
+def _dump(value: Any, path: Path) -> None:
+    """Pickle a value with its contiguous buffers (numpy arrays) out of band.
+
+    Args:
+        value (Any): Value to store
+        path (Path): Output file
+    """
+    buffers = []
+    payload = pickle.dumps(value, protocol=5, buffer_callback=buffers.append)
+    raws = [buffer.raw() for buffer in buffers]
+    offset = _HEADER.size + _BUFFER.size * len(raws) + len(payload)
+    layout = []
+    for raw in raws:
+        offset = -(-offset // _BUFFER_ALIGNMENT) * _BUFFER_ALIGNMENT
+        layout.append((offset, raw.nbytes))
+        offset += raw.nbytes
+
+    with open(path, "wb") as f:
+        f.write(_HEADER.pack(len(payload), len(raws)))
+        for entry in layout:
+            f.write(_BUFFER.pack(*entry))
+        f.write(payload)
+        for (start, _), raw in zip(layout, raws):
+            f.seek(start)
+            f.write(raw)
+
+
+def _load(path: Path) -> Any:
+    """Load a value written by :func:`_dump` without copying its buffers.
+
+    The file is memory-mapped read-only and the arrays of the value are
+    views of the mapping, so processes loading the same entry share its
+    pages instead of each holding a copy.
+
+    Args:
+        path (Path): Stored entry
+
+    Returns:
+        Any: Stored value, with read-only arrays
+    """
+    with open(path, "rb") as f:
+        view = memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+    payload_size, count = _HEADER.unpack_from(view)
+    layout = [
+        _BUFFER.unpack_from(view, _HEADER.size + i * _BUFFER.size) for i in range(count)
+    ]
+    start = _HEADER.size + _BUFFER.size * count
+    return pickle.loads(
+        view[start : start + payload_size],
+        buffers=[view[offset : offset + size] for offset, size in layout],
+    )
+
+
+class ResultCache:
+    """Result cache invalidated by input file fingerprints.
+
+    Results are kept in memory per process. When ``cache_dir`` is set they are
+    also stored on disk so worker processes sharing the directory reuse one
+    computation. Stored arrays are memory-mapped rather than unpickled, so
+    the workers share one copy of them in the page cache. Every read checks
+    that the shared entry is still the one held in memory, so a purge or a
+    recomputation by any worker is seen by all of them. Concurrent misses
+    for the same key are single-flighted with a thread lock and, across
+    processes, a file lock.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, ttl: Optional[float] = None):
+        """Initialize ResultCache.
+
+        Args:
+            cache_dir (str, optional): Directory shared between worker processes
+            ttl (float, optional): Seconds before an entry expires; entries only
+                expire on fingerprint changes when not set
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.ttl = ttl
+        # Fingerprint, creation time, shared entry generation and result
+        self._entries: Dict[str, Tuple[str, float, Optional[Tuple], Any]] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+        if self.cache_dir:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def _is_fresh(self, created_at: float) -> bool:
+        return self.ttl is None or time.time() - created_at < self.ttl
+
+    def _key_lock(self, key: str) -> threading.Lock:
+        with self._lock:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def _file_stem(self, key: str) -> str:
+        return hashlib.sha1(key.encode()).hexdigest()
+
+    def _entry_path(self, key: str, current: str) -> Path:
+        return self.cache_dir / f"{self._file_stem(key)}-{current}.pkl"
+
+    @staticmethod
+    def _generation(path: Path) -> Optional[Tuple[int, int]]:
+        """Identify the version of a shared entry, None if it is gone."""
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns
+
+    def _is_current(self, key: str, entry: Optional[Tuple], current: str) -> bool:
+        """Tell whether an in-memory entry can be served.
+
+        Args:
+            key (str): Cache key
+            entry (Tuple, optional): In-memory entry
+            current (str): Current input fingerprint
+
+        Returns:
+            bool: True if the entry matches the inputs, has not expired and,
+                with a shared directory, is still the shared entry
+        """
+        if not entry or entry[0] != current or not self._is_fresh(entry[1]):
+            return False
+        if self.cache_dir is None:
+            return True
+        generation = self._generation(self._entry_path(key, current))
+        return generation is not None and generation == entry[2]
+
+    def get_or_compute(
+        self, key: str, sources: Iterable[Path], compute: Callable[[], Any]
+    ) -> Any:
+        """Return the cached result for a key, computing it on a miss.
+
+        Args:
+            key (str): Cache key
+            sources (Iterable[Path]): Input files the result depends on
+            compute (Callable[[], Any]): Function producing the result
+
+        Returns:
+            Any: Cached or freshly computed result
+        """
+        sources = list(sources)
+        current = fingerprint(sources)
+
+        entry = self._entries.get(key)
+        if self._is_current(key, entry, current):
+            return entry[3]
+
+        with self._key_lock(key):
+            # Another thread may have filled the entry while we waited
+            entry = self._entries.get(key)
+            if self._is_current(key, entry, current):
+                return entry[3]
+
+            if self.cache_dir:
+                created_at, generation, value = self._get_or_compute_shared(
+                    key, current, compute
+                )
+            else:
+                created_at, generation, value = time.time(), None, compute()
+
+            self._entries[key] = (current, created_at, generation, value)
+            return value
+
+    def _get_or_compute_shared(
+        self, key: str, current: str, compute: Callable[[], Any]
+    ) -> Tuple[float, Optional[Tuple[int, int]], Any]:
+        """Load a result from the shared directory or compute and store it.
+
+        Args:
+            key (str): Cache key
+            current (str): Current input fingerprint
+            compute (Callable[[], Any]): Function producing the result
+
+        Returns:
+            Tuple[float, Optional[Tuple[int, int]], Any]: Creation time,
+                generation of the shared entry and result
+        """
+        stem = self._file_stem(key)
+        path = self._entry_path(key, current)
+
+        with open(self.cache_dir / f"{stem}.lock", "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                if path.exists() and self._is_fresh(path.stat().st_mtime):
+                    generation = self._generation(path)
+                    return path.stat().st_mtime, generation, _load(path)
+
+                value = compute()
+
+                # Replace results of older fingerprints atomically
+                for stale in self.cache_dir.glob(f"{stem}-*.pkl"):
+                    stale.unlink(missing_ok=True)
+                tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+                _dump(value, tmp_path)
+                os.replace(tmp_path, path)
+                # Serve the mapped copy, shared with the other workers
+                return path.stat().st_mtime, self._generation(path), _load(path)
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def purge(self, key: Optional[str] = None) -> None:
+        """Drop cached results from memory and the shared directory.
+
+        Other processes sharing the directory drop their in-memory copies on
+        their next read, as the shared entry is gone.
+
+        Args:
+            key (str, optional): Key to drop; all keys are dropped when not set
+        """
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+        if self.cache_dir:
+            pattern = f"{self._file_stem(key)}-*.pkl" if key else "*.pkl"
+            for path in self.cache_dir.glob(pattern):
+                path.unlink(missing_ok=True)
@@ -1,5 +1,52 @@
 import os
 from pathlib import Path
+from typing import Any, Dict
+
+from sqlalchemy.engine import make_url
+
+
+def engine_options(
+    database_uri: str,
+    pool_size: int = 5,
+    max_overflow: int = 10,
+    pool_timeout: int = 30,
+    pool_recycle: int = -1,
+    pool_pre_ping: bool = False,
+    statement_timeout_ms: int = 0,
+) -> Dict[str, Any]:
+    """Build SQLAlchemy engine options for a database URI.
+
+    In-memory SQLite databases live in a single connection, so they keep
+    their default pool and get no pool options.
+
+    Args:
+        database_uri (str): SQLAlchemy database URI
+        pool_size (int): Connections kept open in the pool
+        max_overflow (int): Connections opened beyond pool_size under load
+        pool_timeout (int): Seconds to wait for a connection before failing
+        pool_recycle (int): Seconds after which connections are replaced,
+            -1 to keep them
+        pool_pre_ping (bool): Test connections on checkout
+        statement_timeout_ms (int): PostgreSQL statement timeout, 0 for none
+
+    Returns:
+        Dict[str, Any]: Options for SQLALCHEMY_ENGINE_OPTIONS
+    """
+    url = make_url(database_uri)
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        return {}
+    options = {
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_timeout": pool_timeout,
+        "pool_recycle": pool_recycle,
+        "pool_pre_ping": pool_pre_ping,
+    }
+    if url.get_backend_name() == "postgresql" and statement_timeout_ms:
+        options["connect_args"] = {
+            "options": f"-c statement_timeout={statement_timeout_ms}"
+        }
+    return options
 
 
 class Config:
@@ -12,6 +59,13 @@ class Config:
     # File paths
     INPUT_DIR = BASE_DIR / "data" / "input"
     OUTPUT_DIR = BASE_DIR / "data" / "output"
+    SNAPSHOT_DIR = BASE_DIR / "data" / "cache"
+
+    # Processed-data result cache shared by worker processes
+    RESULT_CACHE_DIR = os.environ.get("RESULT_CACHE_DIR") or str(
+        BASE_DIR / "data" / "cache" / "results"
+    )
+    RESULT_CACHE_TTL = int(os.environ.get("RESULT_CACHE_TTL", 3600))
 
     # Database
     SQLALCHEMY_DATABASE_URI = (
@@ -21,3 +75,50 @@ class Config:
     SQLALCHEMY_TRACK_MODIFICATIONS = (
         False  # To reduce memory usage and improve performance
     )
+
+    # Connection pool; waits and timeouts are reported by /api/metrics
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(
+        SQLALCHEMY_DATABASE_URI,
+        pool_size=int(os.environ.get("DB_POOL_SIZE", 5)),
+        max_overflow=int(os.environ.get("DB_MAX_OVERFLOW", 10)),
+        pool_timeout=int(os.environ.get("DB_POOL_TIMEOUT", 30)),
+        pool_recycle=int(os.environ.get("DB_POOL_RECYCLE", 1800)),
+        pool_pre_ping=os.environ.get("DB_POOL_PRE_PING", "true").lower() == "true",
+        statement_timeout_ms=int(os.environ.get("DB_STATEMENT_TIMEOUT_MS", 0)),
+    )
+
+    # Analytics read endpoints query "memory" (processed CSVs) or "database"
+    QUERY_BACKEND = os.environ.get("QUERY_BACKEND", "memory")
+
+    # Background jobs for /api/process side effects (0 runs them inline),
+    # with their status shared by worker processes through JOB_STATE_DIR
+    JOB_WORKERS = int(os.environ.get("JOB_WORKERS", 2))
+    JOB_STATE_DIR = os.environ.get("JOB_STATE_DIR") or str(
+        BASE_DIR / "data" / "cache" / "jobs"
+    )
+
+    # ASGI serving (asgi.py): pool for the read endpoints, "thread" or "process"
+    ASGI_EXECUTOR = os.environ.get("ASGI_EXECUTOR", "thread")
+    ASGI_WORKERS = int(os.environ.get("ASGI_WORKERS", os.cpu_count() or 1))
+
+    # Run API responses through the marshmallow schemas (slow, for debugging)
+    VALIDATE_RESPONSES = os.environ.get("VALIDATE_RESPONSES", "false").lower() == "true"
+
+    # Parallel processing of order_id partitions (1 processes in-process)
+    PROCESS_WORKERS = int(os.environ.get("PROCESS_WORKERS", 1))
+    PARTITION_SIZE = int(os.environ.get("PARTITION_SIZE", 100_000))
+
+    # Database ingestion
+    DB_BULK_INSERT = os.environ.get("DB_BULK_INSERT", "true").lower() == "true"
+    DB_BATCH_SIZE = int(os.environ.get("DB_BATCH_SIZE", 5000))
+
+    # Only apply rows added or changed since the last /api/process run
+    INCREMENTAL_PROCESSING = (
+        os.environ.get("INCREMENTAL_PROCESSING", "false").lower() == "true"
+    )
+
+    # Per-stage timing/memory metrics (/api/metrics, run_report.json)
+    METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "false").lower() == "true"
+    METRICS_TRACE_MEMORY = (
+        os.environ.get("METRICS_TRACE_MEMORY", "false").lower() == "true"
+    )
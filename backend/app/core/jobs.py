@@ -0,0 +1,365 @@
+import contextlib
+import fcntl
+import hashlib
+import json
+import os
+import re
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional
+
+# Seconds between status reads while waiting for a job of another process
+POLL_INTERVAL = 0.1
+
+_JOB_ID = re.compile(r"[0-9a-f]{32}")
+
+
+class Job:
+    """A background job with status, progress and per-stage timings."""
+
+    def __init__(self, key: str):
+        """Initialize Job.
+
+        Args:
+            key (str): De-duplication key, e.g. the input fingerprint
+        """
+        self.id = uuid.uuid4().hex
+        self.key = key
+        self.status = "queued"
+        self.progress = 0.0
+        self.error: Optional[str] = None
+        self.result: Any = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.timings: Dict[str, float] = {}
+        self._done = threading.Event()
+        # Set by the queue: persists changes, or reloads a job of another
+        # process
+        self._on_change: Optional[Callable[["Job"], None]] = None
+        self._reload: Optional[Callable[[], Optional[Dict[str, Any]]]] = None
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Job":
+        """Rebuild a job stored by another process.
+
+        Args:
+            data (Dict[str, Any]): Stored record, see :meth:`to_dict`
+
+        Returns:
+            Job: Read-only view of the stored job
+        """
+        job = cls(data["key"])
+        job.id = data["id"]
+        job._update(data)
+        return job
+
+    def _update(self, data: Dict[str, Any]) -> None:
+        for name in (
+            "status",
+            "progress",
+            "error",
+            "result",
+            "created_at",
+            "started_at",
+            "finished_at",
+            "timings",
+        ):
+            setattr(self, name, data[name])
+
+    def _changed(self) -> None:
+        if self._on_change is not None:
+            self._on_change(self)
+
+    @property
+    def active(self) -> bool:
+        return self.status in ("queued", "running")
+
+    @property
+    def reusable(self) -> bool:
+        """Whether submissions with the same key get this job instead."""
+        return self.active or self.status == "succeeded"
+
+    def stage(self, name: str, progress: float):
+        """Time a stage of the job and advance its progress when it ends.
+
+        Args:
+            name (str): Stage name reported in the timings
+            progress (float): Progress (0 to 1) reached after the stage
+        """
+        return _JobStage(self, name, progress)
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the job finished.
+
+        Jobs of other processes are polled through the shared job store.
+
+        Args:
+            timeout (float, optional): Seconds to wait at most
+
+        Returns:
+            bool: True if the job finished in time
+        """
+        if self._reload is None:
+            return self._done.wait(timeout)
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            data = self._reload()
+            if data is not None:
+                self._update(data)
+            if not self.active:
+                return True
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(POLL_INTERVAL)
+
+    def to_dict(self) -> Dict[str, Any]:
+        duration = None
+        if self.started_at is not None:
+            duration = (self.finished_at or time.time()) - self.started_at
+        return {
+            "id": self.id,
+            "status": self.status,
+            "progress": round(self.progress, 3),
+            "error": self.error,
+            "result": self.result,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "duration": duration,
+            "timings": self.timings,
+        }
+
+
+class _JobStage:
+    def __init__(self, job: Job, name: str, progress: float):
+        self.job = job
+        self.name = name
+        self.progress = progress
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.job.timings[self.name] = time.perf_counter() - self.start
+        if exc_type is None:
+            self.job.progress = self.progress
+        self.job._changed()
+        return False
+
+
+class JobQueue:
+    """Run jobs on a thread pool, sharing one job per de-duplication key.
+
+    A key runs again only after its last job failed: submissions get the
+    queued, running or succeeded job of their key, so e.g. unchanged inputs
+    are not processed twice. Succeeded jobs are reused until they are pruned.
+
+    With ``max_workers=0`` jobs run synchronously on submit, which is useful
+    for tests and one-off scripts.
+
+    When ``state_dir`` is set, job records and de-duplication keys are also
+    kept there as JSON files, updated under a file lock, so worker processes
+    sharing the directory report each other's jobs and run a key only once
+    between them. Jobs of a process that exited are reported as failed and
+    no longer absorb submissions.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 2,
+        max_finished: int = 100,
+        state_dir: Optional[str] = None,
+    ):
+        """Initialize JobQueue.
+
+        Args:
+            max_workers (int): Worker threads, 0 to run jobs inline
+            max_finished (int): Finished jobs kept for status queries
+            state_dir (str, optional): Directory shared between worker
+                processes; jobs are only known to this process when not set
+        """
+        self.max_finished = max_finished
+        self.state_dir = Path(state_dir) if state_dir else None
+        self._owner = f"{socket.gethostname()}:{os.getpid()}"
+        self._executor = (
+            ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+            if max_workers > 0
+            else None
+        )
+        self._jobs: Dict[str, Job] = {}
+        # Last job submitted per key
+        self._latest: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+        if self.state_dir:
+            self.state_dir.mkdir(parents=True, exist_ok=True)
+
+    def submit(self, key: str, func: Callable[[Job], Any]) -> Job:
+        """Enqueue a job unless one with the same key is active or succeeded.
+
+        Args:
+            key (str): De-duplication key
+            func (Callable[[Job], Any]): Job body, receives the job to report
+                progress; its return value becomes the job result
+
+        Returns:
+            Job: The new job, or the active or succeeded job sharing the key
+        """
+        with self._lock, self._shared_lock():
+            latest = self._latest.get(key)
+            if latest is not None and latest.reusable:
+                return latest
+            latest = self._load_latest(key)
+            if latest is not None:
+                return latest
+
+            job = Job(key)
+            if self.state_dir:
+                job._on_change = self._save
+                self._save(job)
+                self._key_path(key).write_text(job.id)
+            self._jobs[job.id] = job
+            self._latest[key] = job
+            self._prune()
+
+        if self._executor is None:
+            self._run(job, func)
+        else:
+            self._executor.submit(self._run, job, func)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Return a job by ID, or None if it is unknown."""
+        job = self._jobs.get(job_id)
+        if job is not None or not self.state_dir:
+            return job
+        data = self._read(job_id)
+        if data is None:
+            return None
+        job = Job.from_dict(data)
+        job._reload = lambda: self._read(job_id)
+        return job
+
+    def _run(self, job: Job, func: Callable[[Job], Any]) -> None:
+        job.status = "running"
+        job.started_at = time.time()
+        job._changed()
+        try:
+            job.result = func(job)
+            job.progress = 1.0
+            job.status = "succeeded"
+        except Exception as e:
+            job.error = str(e)
+            job.status = "failed"
+        finally:
+            job.finished_at = time.time()
+            job._changed()
+            job._done.set()
+
+    def _prune(self) -> None:
+        """Forget the oldest finished jobs beyond ``max_finished``."""
+        finished = [job for job in self._jobs.values() if not job.active]
+        for job in finished[: max(0, len(finished) - self.max_finished)]:
+            del self._jobs[job.id]
+            if self._latest.get(job.key) is job:
+                del self._latest[job.key]
+
+        if self.state_dir:
+            records = [(path, self._read(path.stem)) for path in self._record_paths()]
+            finished = sorted(
+                (data["finished_at"] or 0, path)
+                for path, data in records
+                if data is not None and data["status"] not in ("queued", "running")
+            )
+            for _, path in finished[: max(0, len(finished) - self.max_finished)]:
+                path.unlink(missing_ok=True)
+
+    @contextlib.contextmanager
+    def _shared_lock(self) -> Iterator[None]:
+        """Serialize submissions across processes sharing ``state_dir``."""
+        if not self.state_dir:
+            yield
+            return
+        with open(self.state_dir / "jobs.lock", "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _key_path(self, key: str) -> Path:
+        return self.state_dir / f"key-{hashlib.sha1(key.encode()).hexdigest()}"
+
+    def _record_paths(self) -> Iterator[Path]:
+        return (
+            path
+            for path in self.state_dir.glob("*.json")
+            if _JOB_ID.fullmatch(path.stem)
+        )
+
+    def _load_latest(self, key: str) -> Optional[Job]:
+        """Return the active or succeeded job of another process sharing a
+        key, if any."""
+        if not self.state_dir:
+            return None
+        try:
+            job_id = self._key_path(key).read_text()
+        except FileNotFoundError:
+            return None
+        job = self.get(job_id)
+        return job if job is not None and job.reusable else None
+
+    def _save(self, job: Job) -> None:
+        """Write a job record atomically to the shared directory."""
+        path = self.state_dir / f"{job.id}.json"
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text(
+            json.dumps(
+                {**job.to_dict(), "key": job.key, "owner": self._owner}, default=str
+            )
+        )
+        os.replace(tmp_path, path)
+
+    def _read(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Read a job record, failing jobs whose process exited.
+
+        Args:
+            job_id (str): Job ID
+
+        Returns:
+            Optional[Dict[str, Any]]: Stored record, or None if unknown
+        """
+        if not _JOB_ID.fullmatch(job_id):
+            return None
+        try:
+            data = json.loads((self.state_dir / f"{job_id}.json").read_text())
+        except (FileNotFoundError, ValueError):
+            return None
+        if data["status"] in ("queued", "running") and not _alive(data["owner"]):
+            data["status"] = "failed"
+            data["error"] = "Worker process exited before the job finished"
+        return data
+
+
+def _alive(owner: str) -> bool:
+    """Tell whether the process owning a job is still running.
+
+    Processes on other hosts are assumed to be running.
+    """
+    host, _, pid = owner.rpartition(":")
+    if host != socket.gethostname():
+        return True
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
@@ -0,0 +1,35 @@
+from flask import Flask, g, request
+from src.utils.metrics import Metrics
+
+
+def init_request_metrics(app: Flask, metrics: Metrics) -> None:
+    """Measure every request and report its stages in a Server-Timing header.
+
+    Args:
+        app (Flask): Application
+        metrics (Metrics): Instrumentation shared with the processors
+    """
+    if not metrics.enabled:
+        return
+
+    @app.before_request
+    def start_request_run():
+        g.metrics_run = metrics.run().start()
+
+    @app.after_request
+    def finish_request_run(response):
+        run = g.pop("metrics_run", None)
+        if run is None:
+            return response
+        run.stop()
+        endpoint = request.url_rule.rule if request.url_rule else "unmatched"
+        metrics.observe_request(
+            request.method,
+            endpoint,
+            response.status_code,
+            run.wall_seconds,
+            run.cpu_seconds,
+        )
+        if run.stages:
+            response.headers["Server-Timing"] = run.server_timing()
+        return response
@@ -0,0 +1,57 @@
+import time
+from typing import Optional
+
+from flask import Flask
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+from src.utils.metrics import Metrics
+
+# Pool label of the default engine
+DEFAULT_POOL = "default"
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool reporting checkout waits and timeouts to Metrics.
+
+    Subclasses bind ``metrics``; every pool instance, including the ones an
+    engine creates on dispose, registers itself for the connection gauges.
+    """
+
+    metrics: Optional[Metrics] = None
+    pool_name = DEFAULT_POOL
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.metrics is not None:
+            self.metrics.register_pool(self.pool_name, self)
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.observe_pool_checkout(
+                self.pool_name, time.perf_counter() - start, timed_out=True
+            )
+            raise
+        self.metrics.observe_pool_checkout(self.pool_name, time.perf_counter() - start)
+        return connection
+
+
+def init_pool_metrics(app: Flask, metrics: Metrics) -> None:
+    """Instrument the connection pool configured in SQLALCHEMY_ENGINE_OPTIONS.
+
+    Must run before ``db.init_app`` creates the engine. Only queue pools
+    (configured with ``pool_size``) are instrumented.
+
+    Args:
+        app (Flask): Application
+        metrics (Metrics): Instrumentation exposed through /api/metrics
+    """
+    options = dict(app.config.get("SQLALCHEMY_ENGINE_OPTIONS") or {})
+    if not metrics.enabled or "pool_size" not in options or "poolclass" in options:
+        return
+    options["poolclass"] = type(
+        "AppQueuePool", (InstrumentedQueuePool,), {"metrics": metrics}
+    )
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = options
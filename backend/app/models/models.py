@@ -37,6 +37,7 @@ class Order(db.Model):
 
     id = db.Column(db.Integer, primary_key=True)
     customer_id = db.Column(db.Integer, db.ForeignKey("customers.id"), nullable=False)
+    source_order_id = db.Column(db.Integer, nullable=True)  # order_id in orders.csv
     created_at = db.Column(db.DateTime, default=datetime.now(timezone.utc))
     updated_at = db.Column(
         db.DateTime,
@@ -48,12 +49,16 @@ class Order(db.Model):
     barcodes = db.relationship("Barcode", back_populates="order", lazy="dynamic")
 
     # Indexes
-    __table_args__ = (db.Index("idx_customer_id", customer_id),)
+    __table_args__ = (
+        db.Index("idx_customer_id", customer_id),
+        db.Index("idx_source_order_id", source_order_id, unique=True),
+    )
 
     def to_dict(self):
         return {
             "id": self.id,
             "customer_id": self.customer_id,
+            "source_order_id": self.source_order_id,
             "barcodes": [barcode.to_dict() for barcode in self.barcodes],
             "created_at": self.created_at.isoformat(),
             "updated_at": self.updated_at.isoformat(),
@@ -66,7 +71,7 @@ class Barcode(db.Model):
     __tablename__ = "barcodes"
 
     id = db.Column(db.Integer, primary_key=True)
-    barcode_value = db.Column(db.String(255), unique=True)
+    barcode_value = db.Column(db.BigInteger, unique=True)
     order_id = db.Column(db.Integer, db.ForeignKey("orders.id"), nullable=True)
     is_used = db.Column(db.Boolean, default=False)
     created_at = db.Column(db.DateTime, default=datetime.now(timezone.utc))
@@ -78,10 +83,17 @@ class Barcode(db.Model):
     # Relationships
     order = db.relationship("Order", back_populates="barcodes")
 
-    # Indexes
+    # Indexes: order->barcodes lookups are index-only on PostgreSQL, and
+    # unused barcodes are a partial index scan in barcode order
     __table_args__ = (
-        db.Index("idx_order_id", order_id),
+        db.Index("idx_order_id", order_id, postgresql_include=["barcode_value"]),
         db.Index("idx_barcode_value", barcode_value, unique=True),
+        db.Index(
+            "idx_unused_barcode_value",
+            barcode_value,
+            postgresql_where=order_id.is_(None),
+            sqlite_where=order_id.is_(None),
+        ),
     )
 
     def to_dict(self):
@@ -93,3 +105,66 @@ class Barcode(db.Model):
             "created_at": self.created_at.isoformat(),
             "updated_at": self.updated_at.isoformat(),
         }
+
+
+class CustomerTicketStats(db.Model):
+    """Ticket count per customer, maintained by ingestion for top-N queries."""
+
+    __tablename__ = "customer_ticket_stats"
+
+    customer_id = db.Column(db.Integer, db.ForeignKey("customers.id"), primary_key=True)
+    ticket_count = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(
+        db.DateTime,
+        default=datetime.now(timezone.utc),
+        onupdate=datetime.now(timezone.utc),
+    )
+
+    # Indexes: top customers are the first rows of this index
+    __table_args__ = (db.Index("idx_ticket_count", ticket_count.desc(), customer_id),)
+
+    def to_dict(self):
+        return {
+            "customer_id": self.customer_id,
+            "ticket_count": self.ticket_count,
+            "updated_at": self.updated_at.isoformat(),
+        }
+
+
+class BarcodeReservation(db.Model):
+    """Unused barcode allocated to a new order, shared by all workers."""
+
+    __tablename__ = "barcode_reservations"
+
+    barcode_value = db.Column(db.BigInteger, primary_key=True, autoincrement=False)
+    reserved_at = db.Column(db.DateTime, default=datetime.now(timezone.utc))
+
+    def to_dict(self):
+        return {
+            "barcode_value": self.barcode_value,
+            "reserved_at": self.reserved_at.isoformat(),
+        }
+
+
+class BarcodeInventoryState(db.Model):
+    """Shared counters of one set of unused barcodes, kept by allocations."""
+
+    __tablename__ = "barcode_inventory_state"
+
+    # SHA-256 of the sorted unused barcodes the counters describe
+    unused_digest = db.Column(db.String(64), primary_key=True)
+    # Reservations of barcodes in the set
+    reserved = db.Column(db.Integer, nullable=False, default=0)
+    # Every unused barcode below this value is reserved
+    allocated_below = db.Column(db.BigInteger, nullable=False)
+    # Incremented by every release; allocations only raise allocated_below
+    # when no release happened since they read it
+    releases = db.Column(db.Integer, nullable=False, default=0)
+
+    def to_dict(self):
+        return {
+            "unused_digest": self.unused_digest,
+            "reserved": self.reserved,
+            "allocated_below": self.allocated_below,
+            "releases": self.releases,
+        }
@@ -22,6 +22,30 @@ class CustomerOrderQuerySchema(Schema):
     limit = fields.Int(validate=validate.Range(min=1, max=100), load_default=5)
 
 
+class PaginationQuerySchema(Schema):
+    """Schema for validating pagination query parameters"""
+
+    limit = fields.Int(validate=validate.Range(min=1, max=10000), load_default=None)
+    after = fields.Int(load_default=None)
+    format = fields.Str(
+        validate=validate.OneOf(["json", "ndjson"]), load_default="json"
+    )
+
+
+class AllocateBarcodesSchema(Schema):
+    """Schema for validating barcode allocation requests"""
+
+    count = fields.Int(required=True, validate=validate.Range(min=1, max=10000))
+
+
+class ReleaseBarcodesSchema(Schema):
+    """Schema for validating barcode release requests"""
+
+    barcodes = fields.List(
+        fields.Int(), required=True, validate=validate.Length(min=1, max=10000)
+    )
+
+
 class TopCustomerSchema(Schema):
     """Schema for top customer response"""
 
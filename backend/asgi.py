@@ -0,0 +1,12 @@
+from app import create_app
+from app.asgi import AsyncAPI
+from app.core.config import Config
+
+# Serve with any ASGI server, e.g. `uvicorn asgi:app`
+flask_app = create_app()
+app = AsyncAPI(
+    flask_app,
+    executor=flask_app.config["ASGI_EXECUTOR"],
+    workers=flask_app.config["ASGI_WORKERS"],
+    config_class=Config,
+)
@@ -0,0 +1,119 @@
+from pathlib import Path
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+# First barcode value, matching the shape of production barcodes
+BARCODE_START = 11111111111
+
+
+def generate_dataset(
+    output_dir: str,
+    orders: int = 10_000,
+    customers: int = 1_000,
+    barcodes_per_order: float = 3.0,
+    unused_fraction: float = 0.1,
+    duplicate_rate: float = 0.0,
+    missing_barcode_rate: float = 0.0,
+    customer_skew: float = 0.0,
+    seed: int = 0,
+    chunk_size: int = 1_000_000,
+) -> Dict[str, int]:
+    """Generate synthetic orders.csv and barcodes.csv files.
+
+    Orders are written in chunks so datasets with 10^7 barcodes can be
+    generated without holding them in memory.
+
+    Args:
+        output_dir (str): Directory receiving orders.csv and barcodes.csv
+        orders (int): Number of orders
+        customers (int): Number of distinct customers
+        barcodes_per_order (float): Mean barcodes per order (at least 1)
+        unused_fraction (float): Fraction of all barcodes without an order
+        duplicate_rate (float): Fraction of barcode rows repeating an earlier
+            barcode
+        missing_barcode_rate (float): Fraction of orders without barcodes
+        customer_skew (float): Zipf-like skew of orders per customer, 0 for
+            uniform
+        seed (int): Random seed
+        chunk_size (int): Orders generated per chunk
+
+    Returns:
+        Dict[str, int]: Number of orders, sold, unused and duplicate barcode
+            rows written
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(seed)
+
+    weights = _customer_weights(customers, customer_skew)
+    orders_path = output_dir / "orders.csv"
+    barcodes_path = output_dir / "barcodes.csv"
+    pd.DataFrame(columns=["order_id", "customer_id"]).to_csv(orders_path, index=False)
+    pd.DataFrame(columns=["barcode", "order_id"]).to_csv(barcodes_path, index=False)
+
+    stats = {"orders": 0, "sold_barcodes": 0, "unused_barcodes": 0, "duplicates": 0}
+    next_barcode = BARCODE_START
+
+    for start in range(0, orders, chunk_size):
+        order_ids = np.arange(start + 1, min(start + chunk_size, orders) + 1)
+        customer_ids = rng.choice(customers, size=len(order_ids), p=weights) + 1
+        pd.DataFrame({"order_id": order_ids, "customer_id": customer_ids}).to_csv(
+            orders_path, mode="a", header=False, index=False
+        )
+
+        # Barcodes per order: 1 + Poisson, or 0 for orders missing barcodes
+        counts = 1 + rng.poisson(max(barcodes_per_order - 1, 0), len(order_ids))
+        counts[rng.random(len(order_ids)) < missing_barcode_rate] = 0
+        sold = int(counts.sum())
+        unused = _unused_count(sold, unused_fraction, rng)
+
+        barcodes = np.arange(next_barcode, next_barcode + sold + unused)
+        next_barcode += sold + unused
+        barcode_orders = np.concatenate(
+            [np.repeat(order_ids, counts).astype(float), np.full(unused, np.nan)]
+        )
+        chunk = pd.DataFrame({"barcode": barcodes, "order_id": barcode_orders})
+
+        duplicates = _duplicates(chunk, duplicate_rate, rng)
+        chunk = pd.concat([chunk, duplicates]).iloc[
+            rng.permutation(len(chunk) + len(duplicates))
+        ]
+        chunk.to_csv(
+            barcodes_path,
+            mode="a",
+            header=False,
+            index=False,
+            float_format="%.0f",
+        )
+
+        stats["orders"] += len(order_ids)
+        stats["sold_barcodes"] += sold
+        stats["unused_barcodes"] += unused
+        stats["duplicates"] += len(duplicates)
+
+    return stats
+
+
+def _customer_weights(customers: int, skew: float) -> np.ndarray:
+    """Probability of each customer placing an order."""
+    weights = 1.0 / np.arange(1, customers + 1) ** skew
+    return weights / weights.sum()
+
+
+def _unused_count(sold: int, unused_fraction: float, rng) -> int:
+    """Number of unused barcodes so they make up the requested fraction."""
+    if unused_fraction <= 0:
+        return 0
+    return int(round(sold * unused_fraction / (1 - unused_fraction)))
+
+
+def _duplicates(chunk: pd.DataFrame, duplicate_rate: float, rng) -> pd.DataFrame:
+    """Rows repeating barcodes of the chunk, assigned to random orders."""
+    count = int(round(len(chunk) * duplicate_rate))
+    if count == 0:
+        return chunk.iloc[0:0]
+    rows = chunk.iloc[rng.integers(0, len(chunk), count)].copy()
+    rows["order_id"] = rng.permutation(rows["order_id"].to_numpy())
+    return rows
@@ -0,0 +1,164 @@
+"""Load test comparing API servers, e.g. the WSGI app against the ASGI app.
+
+Start the servers on the same inputs, then run (from backend/):
+    gunicorn -w 4 wsgi:app -b 127.0.0.1:5000
+    uvicorn asgi:app --port 8000
+    python -m benchmarks.loadtest --target wsgi=http://127.0.0.1:5000 \\
+        --target asgi=http://127.0.0.1:8000 --concurrency 64 --duration 15
+"""
+
+import argparse
+import http.client
+import json
+import statistics
+import threading
+import time
+from typing import Dict, List, Tuple
+from urllib.parse import urlsplit
+
+DEFAULT_PATHS = [
+    "/api/customers/top",
+    "/api/barcodes/unused?limit=1000",
+    "/api/orders/{customer_id}",
+]
+
+
+def run_target(
+    base_url: str, paths: List[str], concurrency: int, duration: float
+) -> Dict:
+    """Hammer one server with keep-alive clients for a fixed duration.
+
+    Args:
+        base_url (str): Server URL, e.g. http://127.0.0.1:8000
+        paths (List[str]): Request paths, cycled through by every client
+        concurrency (int): Number of concurrent clients
+        duration (float): Seconds to run
+
+    Returns:
+        Dict: Request count, throughput, latency percentiles and errors
+    """
+    url = urlsplit(base_url)
+    deadline = time.perf_counter() + duration
+    latencies: List[float] = []
+    errors: Dict[str, int] = {}
+    lock = threading.Lock()
+
+    def client(offset: int) -> None:
+        conn = http.client.HTTPConnection(url.hostname, url.port, timeout=60)
+        own: List[float] = []
+        own_errors: Dict[str, int] = {}
+        i = offset
+        while time.perf_counter() < deadline:
+            path = paths[i % len(paths)]
+            i += 1
+            start = time.perf_counter()
+            try:
+                conn.request("GET", path)
+                response = conn.getresponse()
+                response.read()
+                if response.status >= 500:
+                    key = str(response.status)
+                    own_errors[key] = own_errors.get(key, 0) + 1
+                else:
+                    own.append(time.perf_counter() - start)
+            except (OSError, http.client.HTTPException) as e:
+                key = type(e).__name__
+                own_errors[key] = own_errors.get(key, 0) + 1
+                conn.close()
+                conn = http.client.HTTPConnection(url.hostname, url.port, timeout=60)
+                time.sleep(0.01)
+        conn.close()
+        with lock:
+            latencies.extend(own)
+            for key, count in own_errors.items():
+                errors[key] = errors.get(key, 0) + count
+
+    started = time.perf_counter()
+    threads = [
+        threading.Thread(target=client, args=(n,), daemon=True)
+        for n in range(concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    return {
+        "url": base_url,
+        "requests": len(latencies),
+        "errors": errors,
+        "requests_per_s": len(latencies) / elapsed,
+        **latency_percentiles(latencies),
+    }
+
+
+def latency_percentiles(latencies: List[float]) -> Dict[str, float]:
+    if len(latencies) < 2:
+        return {}
+    cuts = statistics.quantiles(latencies, n=100)
+    return {
+        "latency_mean_ms": statistics.fmean(latencies) * 1000,
+        "latency_p50_ms": cuts[49] * 1000,
+        "latency_p95_ms": cuts[94] * 1000,
+        "latency_p99_ms": cuts[98] * 1000,
+    }
+
+
+def _parse_target(value: str) -> Tuple[str, str]:
+    name, sep, url = value.partition("=")
+    if not sep:
+        raise argparse.ArgumentTypeError("targets look like name=http://host:port")
+    return name, url
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Load test API servers")
+    parser.add_argument(
+        "--target",
+        type=_parse_target,
+        action="append",
+        required=True,
+        help="name=url of a server, repeat to compare servers",
+    )
+    parser.add_argument(
+        "--path",
+        action="append",
+        help="request path (repeatable), defaults to the read endpoints",
+    )
+    parser.add_argument("--customer-id", type=int, default=1)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--output", help="write JSON results to this file")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    paths = [
+        path.format(customer_id=args.customer_id)
+        for path in (args.path or DEFAULT_PATHS)
+    ]
+    results = {
+        name: run_target(url, paths, args.concurrency, args.duration)
+        for name, url in args.target
+    }
+    baseline = next(iter(results.values()))["requests_per_s"]
+    for result in results.values():
+        result["speedup"] = result["requests_per_s"] / baseline if baseline else None
+
+    report = {
+        "paths": paths,
+        "concurrency": args.concurrency,
+        "duration_s": args.duration,
+        "results": results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,691 @@
+"""Timed, memory-profiled benchmarks of the pipeline stages and API endpoints.
+
+Usage (from backend/):
+    python -m benchmarks.runner --orders 100000 --output results.json
+
+The database, endpoints and pool suites drop all tables of the benchmark
+database; they only run against --database-url with --allow-destructive.
+"""
+
+import argparse
+import json
+import logging
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+backend_path = Path(__file__).resolve().parent.parent
+if str(backend_path) not in sys.path:
+    sys.path.insert(0, str(backend_path))
+
+from app import create_app, db  # noqa: E402
+from app.core.config import engine_options  # noqa: E402
+from app.models.models import Customer  # noqa: E402
+from benchmarks.datagen import generate_dataset  # noqa: E402
+from benchmarks.loadtest import latency_percentiles  # noqa: E402
+from src.data_processing.loader import DataLoader  # noqa: E402
+from sqlalchemy import (  # noqa: E402
+    BigInteger,
+    Column,
+    Index,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    create_engine,
+    insert,
+    select,
+    text,
+)
+from src.data_processing.processor import OrderProcessor  # noqa: E402
+from src.data_processing.validator import (  # noqa: E402
+    barcodes_schema,
+    orders_schema,
+)
+
+ENDPOINTS = [
+    "/api/process",
+    "/api/customers/top",
+    "/api/barcodes/unused",
+    "/api/orders/{customer_id}",
+]
+
+# Suites that drop and recreate every table of the benchmark database
+DESTRUCTIVE_SUITES = {"database", "endpoints", "pool"}
+
+
+def measure(name: str, func: Callable, repeat: int = 1, memory: bool = True) -> Dict:
+    """Run func repeat times, recording wall time, then once more recording
+    peak traced memory.
+
+    tracemalloc slows allocation-heavy code several times over, so the timed
+    runs are untraced and the peak comes from a separate run.
+
+    Args:
+        name (str): Benchmark name
+        func (Callable): Zero-argument callable; may return a row count
+        repeat (int): Number of timed runs
+        memory (bool): Add the traced run; disable for benchmarks whose
+            first run differs from later ones, e.g. cold caches
+
+    Returns:
+        Dict: name, per-run wall seconds, best/mean seconds, peak MB (None
+            without the traced run) and rows, or name and error if func
+            raised
+    """
+    timings = []
+    rows = None
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            rows = func()
+            timings.append(time.perf_counter() - start)
+        peak = _traced_peak(func) if memory else None
+    except Exception as e:
+        # Invalid inputs (e.g. orders without barcodes) fail by design
+        return {"name": name, "error": f"{type(e).__name__}: {e}"}
+
+    return {
+        "name": name,
+        "runs": timings,
+        "best_s": min(timings),
+        "mean_s": sum(timings) / len(timings),
+        "peak_mb": None if peak is None else peak / 2**20,
+        "rows": rows if isinstance(rows, int) else None,
+    }
+
+
+def _traced_peak(func: Callable) -> int:
+    """Run func once under tracemalloc and return its peak traced bytes."""
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run_stages(input_dir: Path, output_dir: Path, repeat: int) -> List[Dict]:
+    """Benchmark each pipeline stage on the generated inputs."""
+    logger = _quiet_logger()
+    processor = OrderProcessor(
+        logger, input_dir=str(input_dir), output_dir=str(output_dir)
+    )
+    results = [
+        measure(
+            "load_orders",
+            lambda: len(DataLoader(str(input_dir), logger).load_orders()),
+            repeat,
+        ),
+        measure(
+            "load_barcodes",
+            lambda: len(DataLoader(str(input_dir), logger).load_barcodes()),
+            repeat,
+        ),
+    ]
+
+    def process():
+        processor.loader = DataLoader(str(input_dir), logger)
+        return len(processor.process())
+
+    results.append(measure("process", process, repeat))
+
+    def save_results():
+        processor.save_results(result_df)
+        return len(result_df)
+
+    try:
+        result_df = processor.process()
+    except Exception as e:
+        results.append({"name": "save_results", "error": f"{type(e).__name__}: {e}"})
+    else:
+        results.append(measure("save_results", save_results, repeat))
+    return results
+
+
+def run_database(
+    input_dir: Path, output_dir: Path, database_url: str, repeat: int
+) -> List[Dict]:
+    """Benchmark bulk ingestion into the database, first into an empty
+    database and then re-ingesting the same data."""
+    app = _create_app(input_dir, output_dir, database_url)
+    logger = _quiet_logger()
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        processor = OrderProcessor(
+            logger, input_dir=str(input_dir), output_dir=str(output_dir)
+        )
+
+        def ingest():
+            stats = processor.bulk_save_to_database(result_df)
+            return sum(s["inserted"] for s in stats.values())
+
+        try:
+            result_df = processor.process()
+        except Exception as e:
+            results = [{"name": "database", "error": f"{type(e).__name__}: {e}"}]
+        else:
+            results = [
+                measure("database_initial", ingest, memory=False),
+                measure("database_rerun", ingest, repeat),
+            ]
+        db.session.remove()
+        db.drop_all()
+    return results
+
+
+def run_endpoints(
+    input_dir: Path, output_dir: Path, database_url: str, repeat: int
+) -> List[Dict]:
+    """Benchmark the API endpoints through the Flask test client; the first
+    request of each endpoint is reported separately as a cold run."""
+    app = _create_app(input_dir, output_dir, database_url)
+    results = []
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        client = app.test_client()
+        top = client.get("/api/customers/top")
+        customers = top.get_json()["data"] if top.status_code == 200 else []
+        customer_id = customers[0]["customer_id"] if customers else 1
+
+        for endpoint in ENDPOINTS:
+            url = endpoint.format(customer_id=customer_id)
+
+            def request():
+                response = client.get(url)
+                if response.status_code != 200:
+                    raise RuntimeError(f"{url} returned {response.status_code}")
+                return None
+
+            app.extensions["result_cache"].purge()
+            results.append(measure(f"GET {endpoint} (cold)", request, memory=False))
+            results.append(measure(f"GET {endpoint}", request, repeat))
+        db.session.remove()
+        db.drop_all()
+    return results
+
+
+def run_pool(
+    input_dir: Path,
+    output_dir: Path,
+    database_url: str,
+    settings: List[str],
+    concurrency: int,
+    duration: float,
+) -> List[Dict]:
+    """Benchmark concurrent /api/orders/<customer_id> requests served from the
+    database with different connection pool settings.
+
+    Args:
+        input_dir (Path): Generated input data, ingested once up front
+        output_dir (Path): Output directory
+        database_url (str): SQLAlchemy URL of a file or server database
+        settings (List[str]): Pool settings as "pool_size:max_overflow"
+        concurrency (int): Number of concurrent client threads
+        duration (float): Seconds to run per setting
+
+    Returns:
+        List[Dict]: Throughput, latencies, errors and pool metrics per setting
+    """
+    app = _create_app(input_dir, output_dir, database_url)
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        processor = OrderProcessor(
+            _quiet_logger(), input_dir=str(input_dir), output_dir=str(output_dir)
+        )
+        try:
+            processor.bulk_save_to_database(processor.process_dataset())
+        except Exception as e:
+            return [{"name": "pool", "error": f"{type(e).__name__}: {e}"}]
+        customer_ids = db.session.scalars(select(Customer.id)).all()
+        db.session.remove()
+
+    results = []
+    for setting in settings:
+        pool_size, max_overflow = (int(value) for value in setting.split(":"))
+        app = _create_app(
+            input_dir,
+            output_dir,
+            database_url,
+            QUERY_BACKEND="database",
+            METRICS_ENABLED=True,
+            SQLALCHEMY_ENGINE_OPTIONS=engine_options(
+                database_url, pool_size=pool_size, max_overflow=max_overflow
+            ),
+        )
+        latencies: List[float] = []
+        errors = [0]
+        lock = threading.Lock()
+        deadline = time.perf_counter() + duration
+
+        def client(seed: int) -> None:
+            rng = np.random.default_rng(seed)
+            test_client = app.test_client()
+            own: List[float] = []
+            failed = 0
+            while time.perf_counter() < deadline:
+                customer_id = customer_ids[rng.integers(len(customer_ids))]
+                start = time.perf_counter()
+                response = test_client.get(f"/api/orders/{customer_id}")
+                if response.status_code == 200:
+                    own.append(time.perf_counter() - start)
+                else:
+                    failed += 1
+            with lock:
+                latencies.extend(own)
+                errors[0] += failed
+
+        started = time.perf_counter()
+        threads = [
+            threading.Thread(target=client, args=(n,)) for n in range(concurrency)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        results.append(
+            {
+                "name": f"GET /api/orders/{{customer_id}} (pool {setting})",
+                "concurrency": concurrency,
+                "requests": len(latencies),
+                "errors": errors[0],
+                "requests_per_s": len(latencies) / elapsed,
+                **latency_percentiles(latencies),
+                "pool": app.extensions["metrics"].pool_stats().get("default", {}),
+            }
+        )
+        with app.app_context():
+            db.engine.dispose()
+    return results
+
+
+# Barcode column types compared by the schema suite: before and after BIGINT
+BARCODE_STORAGE = {"string": String(255), "bigint": BigInteger()}
+
+
+def run_schema(input_dir: Path, database_url: str, repeat: int) -> List[Dict]:
+    """Compare barcode ingest and lookup throughput with barcodes stored as
+    strings and as BIGINT.
+
+    Each variant is a standalone copy of the barcodes table and its indexes
+    (unique barcode, order_id covering barcode_value, partial unused), filled
+    with the generated barcodes.
+
+    Args:
+        input_dir (Path): Generated input data
+        database_url (str): SQLAlchemy URL of the database to benchmark
+        repeat (int): Number of runs of the lookup benchmarks
+
+    Returns:
+        List[Dict]: Ingest, lookup and unused scan timings per variant, with
+            index sizes where the database reports them
+    """
+    barcodes = pd.read_csv(input_dir / "barcodes.csv", dtype={"order_id": "Int64"})
+    barcodes = barcodes.drop_duplicates("barcode")
+    values = barcodes["barcode"].to_numpy()
+    order_ids = (
+        barcodes["order_id"].astype(object).where(barcodes["order_id"].notna(), None)
+    )
+    rng = np.random.default_rng(0)
+    sample_values = rng.choice(values, size=min(1000, len(values)), replace=False)
+    sold = barcodes["order_id"].dropna().unique()
+    sample_orders = rng.choice(sold, size=min(1000, len(sold)), replace=False)
+
+    engine = create_engine(database_url)
+    results = []
+    for kind, column_type in BARCODE_STORAGE.items():
+        convert = str if kind == "string" else int
+        metadata = MetaData()
+        table = Table(
+            f"benchmark_barcodes_{kind}",
+            metadata,
+            Column("id", Integer, primary_key=True),
+            Column("barcode_value", column_type, unique=True),
+            Column("order_id", Integer),
+        )
+        Index(
+            f"benchmark_{kind}_order_id",
+            table.c.order_id,
+            postgresql_include=["barcode_value"],
+        )
+        Index(
+            f"benchmark_{kind}_unused",
+            table.c.barcode_value,
+            postgresql_where=table.c.order_id.is_(None),
+            sqlite_where=table.c.order_id.is_(None),
+        )
+        metadata.drop_all(engine)
+        metadata.create_all(engine)
+        rows = [
+            {"barcode_value": convert(value), "order_id": order_id}
+            for value, order_id in zip(values.tolist(), order_ids.tolist())
+        ]
+        lookup_values = [convert(value) for value in sample_values.tolist()]
+        lookup_orders = [int(order_id) for order_id in sample_orders.tolist()]
+
+        def ingest():
+            with engine.begin() as conn:
+                for start in range(0, len(rows), 5000):
+                    conn.execute(insert(table), rows[start : start + 5000])
+            return len(rows)
+
+        def lookup_barcodes():
+            with engine.connect() as conn:
+                return len(
+                    conn.execute(
+                        select(table.c.id).where(
+                            table.c.barcode_value.in_(lookup_values)
+                        )
+                    ).all()
+                )
+
+        def lookup_orders_barcodes():
+            with engine.connect() as conn:
+                return len(
+                    conn.execute(
+                        select(table.c.barcode_value).where(
+                            table.c.order_id.in_(lookup_orders)
+                        )
+                    ).all()
+                )
+
+        def scan_unused():
+            with engine.connect() as conn:
+                return len(
+                    conn.execute(
+                        select(table.c.barcode_value)
+                        .where(table.c.order_id.is_(None))
+                        .order_by(table.c.barcode_value)
+                    ).all()
+                )
+
+        # A second ingest would violate the unique barcode index
+        ingest_result = measure(f"schema_ingest ({kind})", ingest, memory=False)
+        ingest_result["index_bytes"] = _index_bytes(engine, table)
+        results += [
+            ingest_result,
+            measure(f"schema_lookup_barcodes ({kind})", lookup_barcodes, repeat),
+            measure(f"schema_order_barcodes ({kind})", lookup_orders_barcodes, repeat),
+            measure(f"schema_unused_scan ({kind})", scan_unused, repeat),
+        ]
+        metadata.drop_all(engine)
+    engine.dispose()
+    return results
+
+
+def _pandera_schemas() -> Dict:
+    """The pandera schemas FrameSchema replaced, as comparison baseline."""
+    import pandera as pa
+
+    return {
+        "orders": pa.DataFrameSchema(
+            {
+                "order_id": pa.Column(int, unique=True, coerce=True),
+                "customer_id": pa.Column(int, coerce=True),
+            },
+            strict=True,
+        ),
+        "barcodes": pa.DataFrameSchema(
+            {
+                "barcode": pa.Column(int, unique=True, coerce=True),
+                "order_id": pa.Column("Int64", nullable=True, coerce=True),
+            },
+            strict=True,
+        ),
+    }
+
+
+def run_validation(input_dir: Path, repeat: int) -> List[Dict]:
+    """Compare input validation with FrameSchema and with pandera.
+
+    Both validate the same parsed frames (barcodes deduplicated first, as
+    the loader does), so only validation is timed.
+
+    Args:
+        input_dir (Path): Generated input data
+        repeat (int): Number of runs per benchmark
+
+    Returns:
+        List[Dict]: Timings per schema and engine, with the speedup of
+            FrameSchema over pandera
+    """
+    frames = {
+        "orders": pd.read_csv(input_dir / "orders.csv"),
+        "barcodes": pd.read_csv(input_dir / "barcodes.csv").drop_duplicates("barcode"),
+    }
+    schemas = {"orders": orders_schema, "barcodes": barcodes_schema}
+    try:
+        baselines = _pandera_schemas()
+    except ImportError:
+        baselines = {}
+
+    results = []
+    for name, df in frames.items():
+        result = measure(
+            f"validate_{name} (vectorized)",
+            lambda: len(schemas[name].validate(df)),
+            repeat,
+        )
+        results.append(result)
+        if name in baselines:
+            baseline = measure(
+                f"validate_{name} (pandera)",
+                lambda: len(baselines[name].validate(df)),
+                repeat,
+            )
+            if "best_s" in result and "best_s" in baseline:
+                result["speedup"] = baseline["best_s"] / result["best_s"]
+            results.append(baseline)
+    return results
+
+
+def _index_bytes(engine, table) -> Optional[Dict[str, int]]:
+    """Size of each index of a table, if the database reports it."""
+    names = [index.name for index in table.indexes] + [
+        f"{table.name}_barcode_value_key"
+    ]
+    with engine.connect() as conn:
+        try:
+            if engine.dialect.name == "postgresql":
+                query = "SELECT pg_relation_size(CAST(:name AS regclass))"
+            elif engine.dialect.name == "sqlite":
+                query = "SELECT SUM(pgsize) FROM dbstat WHERE name = :name"
+                names = [
+                    name
+                    for (name,) in conn.execute(
+                        text(
+                            "SELECT name FROM sqlite_master "
+                            "WHERE type = 'index' AND tbl_name = :table"
+                        ),
+                        {"table": table.name},
+                    )
+                ]
+            else:
+                return None
+            return {
+                name: conn.execute(text(query), {"name": name}).scalar()
+                for name in names
+            }
+        except Exception:
+            return None
+
+
+def run(args) -> Dict:
+    """Generate the dataset and run the selected benchmarks."""
+    params = {
+        "orders": args.orders,
+        "customers": args.customers,
+        "barcodes_per_order": args.barcodes_per_order,
+        "unused_fraction": args.unused_fraction,
+        "duplicate_rate": args.duplicate_rate,
+        "missing_barcode_rate": args.missing_barcode_rate,
+        "customer_skew": args.customer_skew,
+        "seed": args.seed,
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        work_dir = Path(args.work_dir or tmp)
+        input_dir = work_dir / "input"
+        output_dir = work_dir / "output"
+        output_dir.mkdir(parents=True, exist_ok=True)
+        database_url = args.database_url or f"sqlite:///{work_dir / 'bench.db'}"
+
+        start = time.perf_counter()
+        dataset = generate_dataset(str(input_dir), **params)
+        dataset["generate_s"] = time.perf_counter() - start
+
+        results = []
+        if "stages" in args.suites:
+            results += run_stages(input_dir, output_dir, args.repeat)
+        if "database" in args.suites:
+            results += run_database(input_dir, output_dir, database_url, args.repeat)
+        if "endpoints" in args.suites:
+            results += run_endpoints(input_dir, output_dir, database_url, args.repeat)
+        if "schema" in args.suites:
+            results += run_schema(input_dir, database_url, args.repeat)
+        if "validation" in args.suites:
+            results += run_validation(input_dir, args.repeat)
+        if "pool" in args.suites:
+            results += run_pool(
+                input_dir,
+                output_dir,
+                database_url,
+                args.pool_settings,
+                args.concurrency,
+                args.duration,
+            )
+
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "database": database_url.split(":", 1)[0],
+        "params": params,
+        "dataset": dataset,
+        "results": results,
+    }
+
+
+def _create_app(input_dir: Path, output_dir: Path, database_url: str, **settings):
+    class BenchmarkConfig:
+        SQLALCHEMY_DATABASE_URI = database_url
+        SQLALCHEMY_TRACK_MODIFICATIONS = False
+        SECRET_KEY = "benchmark"
+        JOB_WORKERS = 0
+        INPUT_DIR = input_dir
+        OUTPUT_DIR = output_dir
+
+    for key, value in settings.items():
+        setattr(BenchmarkConfig, key, value)
+    return create_app(BenchmarkConfig)
+
+
+def _quiet_logger() -> logging.Logger:
+    logger = logging.getLogger("benchmark")
+    logger.addHandler(logging.NullHandler())
+    logger.propagate = False
+    return logger
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=backend_path,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the order processor")
+    parser.add_argument("--orders", type=int, default=100_000)
+    parser.add_argument("--customers", type=int, default=10_000)
+    parser.add_argument("--barcodes-per-order", type=float, default=3.0)
+    parser.add_argument("--unused-fraction", type=float, default=0.1)
+    parser.add_argument("--duplicate-rate", type=float, default=0.0)
+    parser.add_argument("--missing-barcode-rate", type=float, default=0.0)
+    parser.add_argument(
+        "--customer-skew",
+        type=float,
+        default=0.0,
+        help="zipf-like skew of orders per customer, 0 for uniform",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--suites",
+        nargs="+",
+        choices=["stages", "database", "endpoints", "pool", "schema", "validation"],
+        default=["stages", "database", "endpoints"],
+    )
+    parser.add_argument(
+        "--pool-settings",
+        nargs="+",
+        default=["1:0", "5:0", "5:10", "20:10"],
+        help="pool_size:max_overflow settings compared by the pool suite",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=16,
+        help="client threads of the pool suite",
+    )
+    parser.add_argument(
+        "--duration",
+        type=float,
+        default=5.0,
+        help="seconds per setting of the pool suite",
+    )
+    parser.add_argument(
+        "--database-url",
+        help="SQLAlchemy URL, e.g. postgresql://... (default: temporary SQLite file)",
+    )
+    parser.add_argument("--work-dir", help="keep generated data in this directory")
+    parser.add_argument("--output", help="write JSON results to this file")
+    parser.add_argument(
+        "--allow-destructive",
+        action="store_true",
+        help="allow the database, endpoints and pool suites to drop all tables "
+        "of --database-url",
+    )
+    args = parser.parse_args(argv)
+    destructive = sorted(set(args.suites) & DESTRUCTIVE_SUITES)
+    if args.database_url and destructive and not args.allow_destructive:
+        parser.error(
+            f"the {', '.join(destructive)} suites drop all tables of "
+            "--database-url; pass --allow-destructive if it is a scratch database"
+        )
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    report = run(args)
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
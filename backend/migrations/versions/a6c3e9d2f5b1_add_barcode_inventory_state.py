@@ -0,0 +1,30 @@
+"""Add barcode_inventory_state
+
+Revision ID: a6c3e9d2f5b1
+Revises: f2b7d94e1c08
+Create Date: 2026-10-17 16:20:41.275903
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "a6c3e9d2f5b1"
+down_revision = "f2b7d94e1c08"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "barcode_inventory_state",
+        sa.Column("unused_digest", sa.String(length=64), nullable=False),
+        sa.Column("reserved", sa.Integer(), nullable=False),
+        sa.Column("allocated_below", sa.BigInteger(), nullable=False),
+        sa.Column("releases", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("unused_digest"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("barcode_inventory_state")
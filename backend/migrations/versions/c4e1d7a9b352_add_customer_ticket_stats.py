@@ -0,0 +1,52 @@
+"""Add customer_ticket_stats
+
+Revision ID: c4e1d7a9b352
+Revises: bf8cc2a1c11d
+Create Date: 2026-10-17 15:20:41.582019
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "c4e1d7a9b352"
+down_revision = "bf8cc2a1c11d"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "customer_ticket_stats",
+        sa.Column("customer_id", sa.Integer(), nullable=False),
+        sa.Column("ticket_count", sa.Integer(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(
+            ["customer_id"],
+            ["customers.id"],
+        ),
+        sa.PrimaryKeyConstraint("customer_id"),
+    )
+    with op.batch_alter_table("customer_ticket_stats", schema=None) as batch_op:
+        batch_op.create_index(
+            "idx_ticket_count",
+            [sa.text("ticket_count DESC"), "customer_id"],
+            unique=False,
+        )
+
+    # Backfill the counts of already ingested barcodes
+    op.execute(
+        """
+        INSERT INTO customer_ticket_stats (customer_id, ticket_count, updated_at)
+        SELECT orders.customer_id, COUNT(barcodes.id), CURRENT_TIMESTAMP
+        FROM orders JOIN barcodes ON barcodes.order_id = orders.id
+        GROUP BY orders.customer_id
+        """
+    )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("customer_ticket_stats", schema=None) as batch_op:
+        batch_op.drop_index("idx_ticket_count")
+
+    op.drop_table("customer_ticket_stats")
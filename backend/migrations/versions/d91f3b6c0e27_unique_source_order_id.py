@@ -0,0 +1,50 @@
+"""Make source_order_id unique
+
+Revision ID: d91f3b6c0e27
+Revises: c4e1d7a9b352
+Create Date: 2026-10-17 15:58:12.904417
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "d91f3b6c0e27"
+down_revision = "c4e1d7a9b352"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Merge orders stored more than once into the first copy of each
+    op.execute(
+        """
+        UPDATE barcodes SET order_id = (
+            SELECT MIN(keep.id) FROM orders keep
+            JOIN orders dup ON dup.source_order_id = keep.source_order_id
+            WHERE dup.id = barcodes.order_id
+        )
+        WHERE order_id IN (
+            SELECT id FROM orders WHERE source_order_id IS NOT NULL
+        )
+        """
+    )
+    op.execute(
+        """
+        DELETE FROM orders
+        WHERE source_order_id IS NOT NULL AND id NOT IN (
+            SELECT MIN(id) FROM orders
+            WHERE source_order_id IS NOT NULL
+            GROUP BY source_order_id
+        )
+        """
+    )
+
+    with op.batch_alter_table("orders", schema=None) as batch_op:
+        batch_op.drop_index("idx_source_order_id")
+        batch_op.create_index("idx_source_order_id", ["source_order_id"], unique=True)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("orders", schema=None) as batch_op:
+        batch_op.drop_index("idx_source_order_id")
+        batch_op.create_index("idx_source_order_id", ["source_order_id"], unique=False)
@@ -0,0 +1,60 @@
+"""Store barcodes as BIGINT, covering and partial barcode indexes
+
+Revision ID: e5a8c2f4d613
+Revises: d91f3b6c0e27
+Create Date: 2026-10-17 16:14:37.250861
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "e5a8c2f4d613"
+down_revision = "d91f3b6c0e27"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("barcodes", schema=None) as batch_op:
+        batch_op.drop_index("idx_order_id")
+        batch_op.alter_column(
+            "barcode_value",
+            existing_type=sa.String(length=255),
+            type_=sa.BigInteger(),
+            existing_nullable=True,
+            postgresql_using="barcode_value::bigint",
+        )
+
+    # order->barcodes lookups become index-only scans on PostgreSQL
+    op.create_index(
+        "idx_order_id",
+        "barcodes",
+        ["order_id"],
+        unique=False,
+        postgresql_include=["barcode_value"],
+    )
+    # Unused barcodes in barcode order, without scanning sold ones
+    op.create_index(
+        "idx_unused_barcode_value",
+        "barcodes",
+        ["barcode_value"],
+        unique=False,
+        postgresql_where=sa.text("order_id IS NULL"),
+        sqlite_where=sa.text("order_id IS NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_unused_barcode_value", table_name="barcodes")
+    op.drop_index("idx_order_id", table_name="barcodes")
+
+    with op.batch_alter_table("barcodes", schema=None) as batch_op:
+        batch_op.alter_column(
+            "barcode_value",
+            existing_type=sa.BigInteger(),
+            type_=sa.String(length=255),
+            existing_nullable=True,
+            postgresql_using="barcode_value::varchar",
+        )
+        batch_op.create_index("idx_order_id", ["order_id"], unique=False)
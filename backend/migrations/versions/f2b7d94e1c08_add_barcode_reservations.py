@@ -0,0 +1,30 @@
+"""Add barcode_reservations
+
+Revision ID: f2b7d94e1c08
+Revises: e5a8c2f4d613
+Create Date: 2026-10-17 18:02:13.418736
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "f2b7d94e1c08"
+down_revision = "e5a8c2f4d613"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "barcode_reservations",
+        sa.Column(
+            "barcode_value", sa.BigInteger(), autoincrement=False, nullable=False
+        ),
+        sa.Column("reserved_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("barcode_value"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("barcode_reservations")
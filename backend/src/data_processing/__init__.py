@@ -1,4 +1,5 @@
+from .dataset import ProcessedDataset
 from .loader import DataLoader
 from .processor import OrderProcessor
 
-__all__ = ["DataLoader", "OrderProcessor"]
+__all__ = ["DataLoader", "OrderProcessor", "ProcessedDataset"]
@@ -0,0 +1,99 @@
+import heapq
+from pathlib import Path
+from typing import Iterable, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+def rank_customers(
+    customer_ids: np.ndarray, ticket_counts: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Sort customers by ticket count, highest first.
+
+    Ties are broken by ascending customer ID, matching ``Series.nlargest``
+    on counts grouped by customer.
+
+    Args:
+        customer_ids (np.ndarray): Customer identifiers
+        ticket_counts (np.ndarray): Ticket count per customer
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Ranked customer IDs and ticket counts
+    """
+    order = np.lexsort((customer_ids, -ticket_counts))
+    return customer_ids[order], ticket_counts[order]
+
+
+def customer_ticket_counts(df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+    """Count tickets per customer from per-order barcode counts.
+
+    Args:
+        df (pd.DataFrame): Processed orders data
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Customer IDs and their ticket counts
+    """
+    counts = df["barcode"].str.len().groupby(df["customer_id"]).sum()
+    return counts.index.to_numpy(), counts.to_numpy()
+
+
+def top_customers_from_stream(
+    rows: Iterable[Tuple[int, int]], limit: int
+) -> List[Tuple[int, int]]:
+    """Get top customers from a stream of (customer_id, ticket_count) rows.
+
+    Rows must be grouped by customer, as in the processed output. Only a heap
+    of ``limit`` customers is kept in memory.
+
+    Args:
+        rows (Iterable[Tuple[int, int]]): Ticket counts, e.g. one row per order
+        limit (int): Number of top customers to return
+
+    Returns:
+        List[Tuple[int, int]]: List of (customer_id, ticket_count) tuples
+    """
+    heap: List[Tuple[int, int]] = []
+
+    def push(customer_id: int, count: int) -> None:
+        # Smaller customer IDs win ties, so they rank higher in the heap
+        item = (count, -customer_id)
+        if len(heap) < limit:
+            heapq.heappush(heap, item)
+        elif item > heap[0]:
+            heapq.heapreplace(heap, item)
+
+    current, total = None, 0
+    for customer_id, count in rows:
+        if customer_id != current:
+            if current is not None:
+                push(current, total)
+            current, total = customer_id, 0
+        total += count
+    if current is not None:
+        push(current, total)
+
+    return [(-customer_id, count) for count, customer_id in sorted(heap, reverse=True)]
+
+
+def top_customers_from_csv(
+    path: Path, limit: int, chunksize: int = 100_000
+) -> List[Tuple[int, int]]:
+    """Get top customers from a processed_orders.csv without loading it.
+
+    Args:
+        path (Path): Processed output written by save_results or streaming
+        limit (int): Number of top customers to return
+        chunksize (int): Rows read per chunk
+
+    Returns:
+        List[Tuple[int, int]]: List of (customer_id, ticket_count) tuples
+    """
+
+    def rows():
+        for chunk in pd.read_csv(path, chunksize=chunksize):
+            # Barcode lists are written as "[b1, b2, ...]"
+            counts = chunk["barcode"].str.count(",") + 1
+            yield from zip(chunk["customer_id"].tolist(), counts.tolist())
+
+    return top_customers_from_stream(rows(), limit)
@@ -0,0 +1,441 @@
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# Values are split into a container key (high bits) and 16 low bits
+CONTAINER_BITS = 16
+
+# Containers with more values than this are stored as bitmaps
+ARRAY_CONTAINER_MAX = 4096
+
+# Barcode index written next to processed_orders.csv
+BARCODE_INDEX_FILE = "barcode_index.npz"
+
+_LOW_MASK = (1 << CONTAINER_BITS) - 1
+
+
+def _bits(container: np.ndarray) -> np.ndarray:
+    """Return a container as a 65536-bit uint64 word array."""
+    if container.dtype == np.uint64:
+        return container
+    flags = np.zeros(1 << CONTAINER_BITS, dtype=bool)
+    flags[container] = True
+    return np.packbits(flags, bitorder="little").view(np.uint64)
+
+
+def _values(container: np.ndarray) -> np.ndarray:
+    """Return the sorted low bits held by a container."""
+    if container.dtype == np.uint16:
+        return container
+    flags = np.unpackbits(container.view(np.uint8), bitorder="little")
+    return np.flatnonzero(flags).astype(np.uint16)
+
+
+def _count(container: np.ndarray) -> int:
+    """Return the number of values held by a container."""
+    if container.dtype == np.uint16:
+        return len(container)
+    return int(np.unpackbits(container.view(np.uint8)).sum())
+
+
+def _contains(container: np.ndarray, low: np.ndarray) -> np.ndarray:
+    """Test low bits for membership in a container."""
+    if container.dtype == np.uint64:
+        words = container[low >> 6]
+        return ((words >> (low & 63).astype(np.uint64)) & np.uint64(1)).astype(bool)
+    pos = np.minimum(np.searchsorted(container, low), len(container) - 1)
+    return container[pos] == low
+
+
+def _compact(words: np.ndarray) -> np.ndarray:
+    """Store a word array as array container if it is sparse enough."""
+    values = _values(words)
+    return values if len(values) <= ARRAY_CONTAINER_MAX else words
+
+
+def _union(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    if a.dtype == b.dtype == np.uint16:
+        merged = np.union1d(a, b)
+        return merged if len(merged) <= ARRAY_CONTAINER_MAX else _bits(merged)
+    return _bits(a) | _bits(b)
+
+
+def _intersection(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    if a.dtype == np.uint16:
+        return a[_contains(b, a)]
+    if b.dtype == np.uint16:
+        return b[_contains(a, b)]
+    return _compact(a & b)
+
+
+def _difference(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    if a.dtype == np.uint16:
+        return a[~_contains(b, a)]
+    return _compact(a & ~_bits(b))
+
+
+class RoaringBitmap:
+    """Compressed bitmap of int64 values, laid out like a roaring bitmap.
+
+    Values are grouped by their high bits into containers of 65536 values.
+    A container holds its low 16 bits as a sorted uint16 array while it has at
+    most ``ARRAY_CONTAINER_MAX`` values and as a 1024-word uint64 bitmap
+    otherwise, so dense barcode ranges cost one bit per barcode and sparse
+    ones two bytes. Set operations combine matching containers only, and
+    counts are kept per container, so only combined containers are
+    recounted.
+    """
+
+    def __init__(
+        self,
+        keys: Optional[np.ndarray] = None,
+        containers: Optional[List[np.ndarray]] = None,
+        counts: Optional[np.ndarray] = None,
+    ):
+        """Initialize RoaringBitmap from non-empty containers.
+
+        Args:
+            keys (np.ndarray, optional): Ascending container keys
+            containers (List[np.ndarray], optional): Container of each key
+            counts (np.ndarray, optional): Number of values of each
+                container, counted when not given
+        """
+        self.keys = np.asarray(keys if keys is not None else [], dtype=np.int64)
+        self.containers = list(containers or [])
+        if counts is None:
+            counts = [_count(c) for c in self.containers]
+        self.counts = np.asarray(counts, dtype=np.int64)
+        self._count = int(self.counts.sum())
+
+    @classmethod
+    def from_values(cls, values: Iterable[int]) -> "RoaringBitmap":
+        """Build a bitmap from values in any order, duplicates allowed.
+
+        Args:
+            values (Iterable[int]): Values to add
+
+        Returns:
+            RoaringBitmap: Bitmap of the distinct values
+        """
+        values = np.asarray(values, dtype=np.int64)
+        if len(values) > 1 and not (values[1:] > values[:-1]).all():
+            values = np.unique(values)
+        keys = values >> CONTAINER_BITS
+        low = (values & _LOW_MASK).astype(np.uint16)
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]]) if len(keys) else []
+        bounds = np.r_[starts, len(values)].astype(np.int64)
+        containers = [
+            low[start:end]
+            if end - start <= ARRAY_CONTAINER_MAX
+            else _bits(low[start:end])
+            for start, end in zip(bounds[:-1], bounds[1:])
+        ]
+        return cls(keys[bounds[:-1]], containers, np.diff(bounds))
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, value: int) -> bool:
+        return bool(self.contains(np.array([value]))[0])
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, RoaringBitmap):
+            return NotImplemented
+        return np.array_equal(self.to_array(), other.to_array())
+
+    def __or__(self, other: "RoaringBitmap") -> "RoaringBitmap":
+        return self.union(other)
+
+    def __and__(self, other: "RoaringBitmap") -> "RoaringBitmap":
+        return self.intersection(other)
+
+    def __sub__(self, other: "RoaringBitmap") -> "RoaringBitmap":
+        return self.difference(other)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the containers."""
+        return self.keys.nbytes + sum(c.nbytes for c in self.containers)
+
+    def contains(self, values: Iterable[int]) -> np.ndarray:
+        """Test many values for membership, container by container.
+
+        Args:
+            values (Iterable[int]): Values to test
+
+        Returns:
+            np.ndarray: Boolean mask aligned with ``values``
+        """
+        values = np.asarray(values, dtype=np.int64)
+        mask = np.zeros(len(values), dtype=bool)
+        if not len(self.keys) or not len(values):
+            return mask
+        keys = values >> CONTAINER_BITS
+        pos = np.minimum(np.searchsorted(self.keys, keys), len(self.keys) - 1)
+        candidates = np.flatnonzero(self.keys[pos] == keys)
+        if not len(candidates):
+            return mask
+
+        # Test the candidates grouped by container
+        candidates = candidates[np.argsort(pos[candidates], kind="stable")]
+        groups = pos[candidates]
+        starts = np.flatnonzero(np.r_[True, groups[1:] != groups[:-1]])
+        for start, end in zip(starts, np.r_[starts[1:], len(candidates)]):
+            rows = candidates[start:end]
+            low = (values[rows] & _LOW_MASK).astype(np.uint16)
+            mask[rows] = _contains(self.containers[groups[start]], low)
+        return mask
+
+    def union(self, other: "RoaringBitmap") -> "RoaringBitmap":
+        """Values in either bitmap."""
+        return self._combine(other, _union, keep_left=True, keep_right=True)
+
+    def intersection(self, other: "RoaringBitmap") -> "RoaringBitmap":
+        """Values in both bitmaps."""
+        return self._combine(other, _intersection, keep_left=False, keep_right=False)
+
+    def difference(self, other: "RoaringBitmap") -> "RoaringBitmap":
+        """Values in this bitmap but not in ``other``."""
+        return self._combine(other, _difference, keep_left=True, keep_right=False)
+
+    def update(self, values: Iterable[int]) -> None:
+        """Add values in place, e.g. while streaming chunks of an input.
+
+        Only the containers receiving values are merged and recounted; new
+        containers are inserted, and the others are left untouched.
+
+        Args:
+            values (Iterable[int]): Values to add, in any order
+        """
+        other = RoaringBitmap.from_values(values)
+        if not len(other.keys):
+            return
+        pos = np.searchsorted(self.keys, other.keys)
+        found = np.zeros(len(other.keys), dtype=bool)
+        if len(self.keys):
+            clipped = np.minimum(pos, len(self.keys) - 1)
+            found = self.keys[clipped] == other.keys
+        for i in np.flatnonzero(found).tolist():
+            j = pos[i]
+            container = _union(self.containers[j], other.containers[i])
+            self.containers[j] = container
+            self.counts[j] = _count(container)
+
+        new = np.flatnonzero(~found)
+        if len(new):
+            keys = np.r_[self.keys, other.keys[new]]
+            order = np.argsort(keys, kind="stable")
+            containers = self.containers + [other.containers[i] for i in new]
+            self.keys = keys[order]
+            self.containers = [containers[i] for i in order.tolist()]
+            self.counts = np.r_[self.counts, other.counts[new]][order]
+        self._count = int(self.counts.sum())
+
+    def intersection_count(self, other: "RoaringBitmap") -> int:
+        """Number of values in both bitmaps, without building the result."""
+        _, left, right = np.intersect1d(
+            self.keys, other.keys, assume_unique=True, return_indices=True
+        )
+        count = 0
+        for i, j in zip(left.tolist(), right.tolist()):
+            a, b = self.containers[i], other.containers[j]
+            if a.dtype == b.dtype == np.uint64:
+                count += int(np.unpackbits((a & b).view(np.uint8)).sum())
+            elif a.dtype == np.uint16:
+                count += int(_contains(b, a).sum())
+            else:
+                count += int(_contains(a, b).sum())
+        return count
+
+    def _combine(
+        self,
+        other: "RoaringBitmap",
+        combine: Callable[[np.ndarray, np.ndarray], np.ndarray],
+        keep_left: bool,
+        keep_right: bool,
+    ) -> "RoaringBitmap":
+        left = dict(zip(self.keys.tolist(), zip(self.containers, self.counts)))
+        right = dict(zip(other.keys.tolist(), zip(other.containers, other.counts)))
+        keys, containers, counts = [], [], []
+        for key in sorted(left.keys() | right.keys()):
+            a, b = left.get(key), right.get(key)
+            if a is not None and b is not None:
+                container = combine(a[0], b[0])
+                count = _count(container)
+            elif a is not None and keep_left:
+                container, count = a
+            elif b is not None and keep_right:
+                container, count = b
+            else:
+                continue
+            if count:
+                keys.append(key)
+                containers.append(container)
+                counts.append(count)
+        return RoaringBitmap(np.array(keys, dtype=np.int64), containers, counts)
+
+    def to_array(self) -> np.ndarray:
+        """Return the values as an ascending int64 array."""
+        if not self.containers:
+            return np.array([], dtype=np.int64)
+        return np.concatenate(
+            [
+                (key << CONTAINER_BITS) + _values(c).astype(np.int64)
+                for key, c in zip(self.keys.tolist(), self.containers)
+            ]
+        )
+
+    def to_arrays(self, prefix: str = "") -> Dict[str, np.ndarray]:
+        """Flatten the containers into arrays for ``np.savez``.
+
+        Args:
+            prefix (str): Name prefix, to store several bitmaps in one file
+
+        Returns:
+            Dict[str, np.ndarray]: Keys, container kinds and contents
+        """
+        is_bitmap = np.array([c.dtype == np.uint64 for c in self.containers], bool)
+        arrays = [c for c in self.containers if c.dtype == np.uint16]
+        bitmaps = [c for c in self.containers if c.dtype == np.uint64]
+        return {
+            f"{prefix}keys": self.keys,
+            f"{prefix}is_bitmap": is_bitmap,
+            f"{prefix}array_sizes": np.array([len(c) for c in arrays], np.int64),
+            f"{prefix}array_values": (
+                np.concatenate(arrays) if arrays else np.array([], np.uint16)
+            ),
+            f"{prefix}bitmap_words": (
+                np.stack(bitmaps) if bitmaps else np.zeros((0, 1024), np.uint64)
+            ),
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays, prefix: str = "") -> "RoaringBitmap":
+        """Rebuild a bitmap stored with :meth:`to_arrays`.
+
+        Args:
+            arrays (Mapping[str, np.ndarray]): Stored arrays, e.g. an NpzFile
+            prefix (str): Name prefix used when storing
+
+        Returns:
+            RoaringBitmap: Stored bitmap
+        """
+        is_bitmap = arrays[f"{prefix}is_bitmap"]
+        bounds = np.r_[0, np.cumsum(arrays[f"{prefix}array_sizes"])]
+        array_values = arrays[f"{prefix}array_values"]
+        bitmaps = iter(arrays[f"{prefix}bitmap_words"])
+        arrays_iter = iter(zip(bounds[:-1], bounds[1:]))
+        containers = []
+        for kind in is_bitmap:
+            if kind:
+                containers.append(next(bitmaps))
+            else:
+                start, end = next(arrays_iter)
+                containers.append(array_values[start:end])
+        return cls(arrays[f"{prefix}keys"], containers)
+
+
+class BarcodeIndex:
+    """Bitmaps answering set questions about the loaded barcodes.
+
+    ``barcodes`` holds every (deduplicated) barcode, ``sold`` the barcodes
+    assigned to an order and ``orders`` the order IDs that have barcodes.
+    Unused barcodes, orders without barcodes and already-seen barcodes are
+    bitmap operations on these instead of masks and hash joins over the
+    barcodes frame.
+    """
+
+    NAMES = ("barcodes", "sold", "orders")
+
+    def __init__(
+        self, barcodes: RoaringBitmap, sold: RoaringBitmap, orders: RoaringBitmap
+    ):
+        """Initialize BarcodeIndex.
+
+        Args:
+            barcodes (RoaringBitmap): All barcodes
+            sold (RoaringBitmap): Barcodes assigned to an order
+            orders (RoaringBitmap): Order IDs with at least one barcode
+        """
+        self.barcodes = barcodes
+        self.sold = sold
+        self.orders = orders
+        self._unused = None
+
+    @classmethod
+    def from_frame(cls, barcodes_df: pd.DataFrame) -> "BarcodeIndex":
+        """Build the index from validated barcodes.
+
+        Args:
+            barcodes_df (pd.DataFrame): Barcodes with nullable order_id
+
+        Returns:
+            BarcodeIndex: Index of the barcodes
+        """
+        values = barcodes_df["barcode"].to_numpy(dtype=np.int64)
+        sold = barcodes_df["order_id"].notna().to_numpy()
+        order_ids = barcodes_df["order_id"].to_numpy(dtype=np.int64, na_value=-1)
+        return cls(
+            RoaringBitmap.from_values(values),
+            RoaringBitmap.from_values(values[sold]),
+            RoaringBitmap.from_values(order_ids[sold]),
+        )
+
+    @classmethod
+    def from_dataset(cls, dataset) -> "BarcodeIndex":
+        """Build the index from processed data instead of reloading barcodes.
+
+        Args:
+            dataset (ProcessedDataset): Processed orders and unused barcodes
+
+        Returns:
+            BarcodeIndex: Index of the barcodes
+        """
+        sold = RoaringBitmap.from_values(dataset.barcodes)
+        has_barcodes = np.diff(dataset.barcode_offsets) > 0
+        return cls(
+            sold | RoaringBitmap.from_values(dataset.unused_barcodes),
+            sold,
+            RoaringBitmap.from_values(dataset.order_ids[has_barcodes]),
+        )
+
+    @property
+    def unused(self) -> RoaringBitmap:
+        """Barcodes without an order."""
+        if self._unused is None:
+            self._unused = self.barcodes - self.sold
+        return self._unused
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the bitmaps."""
+        return sum(getattr(self, name).nbytes for name in self.NAMES)
+
+    def save(self, path: Path) -> None:
+        """Write the bitmaps to one ``.npz`` file.
+
+        Args:
+            path (Path): Output file, e.g. next to processed_orders.csv
+        """
+        arrays = {}
+        for name in self.NAMES:
+            arrays.update(getattr(self, name).to_arrays(f"{name}."))
+        with open(path, "wb") as f:
+            np.savez(f, **arrays)
+
+    @classmethod
+    def load(cls, path: Path) -> "BarcodeIndex":
+        """Read bitmaps written by :meth:`save`.
+
+        Args:
+            path (Path): Index file
+
+        Returns:
+            BarcodeIndex: Stored index
+        """
+        with np.load(path) as arrays:
+            return cls(
+                *(RoaringBitmap.from_arrays(arrays, f"{name}.") for name in cls.NAMES)
+            )
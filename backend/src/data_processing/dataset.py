@@ -0,0 +1,324 @@
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .analytics import rank_customers
+
+
+def compact_ids(values: np.ndarray) -> np.ndarray:
+    """Downcast integer IDs to int32 when they fit, int64 otherwise."""
+    values = np.asarray(values, dtype=np.int64)
+    info = np.iinfo(np.int32)
+    if len(values) and (values.min() < info.min or values.max() > info.max):
+        return values
+    return values.astype(np.int32)
+
+
+class ProcessedDataset:
+    """Processed orders in a compact, integer-typed columnar layout.
+
+    Orders are rows sorted by ``customer_id`` and ``order_id``, held in
+    ``order_customer_ids`` and ``order_ids``. Their barcodes are one flat int64
+    array: the barcodes of row ``i`` are
+    ``barcodes[barcode_offsets[i]:barcode_offsets[i + 1]]``. A CSR-style
+    index maps each customer to its row range: the orders of
+    ``customer_ids[i]`` are rows ``customer_offsets[i]:customer_offsets[i + 1]``.
+    Customers are also ranked once by ticket count so top-N queries are slices,
+    and orders and unused barcodes can be paged by cursor in O(page size).
+
+    Row selections are returned as ``range`` objects, which
+    :meth:`to_frame` and the API serializers turn into records.
+    """
+
+    def __init__(
+        self,
+        order_customer_ids: np.ndarray,
+        order_ids: np.ndarray,
+        barcode_offsets: np.ndarray,
+        barcodes: np.ndarray,
+        unused_barcodes: Optional[np.ndarray] = None,
+    ):
+        """Build the dataset and its indexes from rows sorted by
+        (customer_id, order_id).
+
+        Args:
+            order_customer_ids (np.ndarray): Customer of each order
+            order_ids (np.ndarray): Order identifiers
+            barcode_offsets (np.ndarray): Start of each order's barcodes in
+                ``barcodes``, followed by the total number of barcodes
+            barcodes (np.ndarray): Barcodes of all orders, grouped by order
+            unused_barcodes (np.ndarray, optional): Barcodes without an order
+        """
+        self.order_customer_ids = compact_ids(order_customer_ids)
+        self.order_ids = compact_ids(order_ids)
+        self.barcode_offsets = np.asarray(barcode_offsets, dtype=np.int64)
+        self.barcodes = np.asarray(barcodes, dtype=np.int64)
+
+        customers = self.order_customer_ids
+        starts = np.flatnonzero(np.diff(customers)) + 1
+        self.customer_ids = customers[np.r_[0, starts]] if len(customers) else customers
+        self.customer_offsets = (
+            np.r_[0, starts, len(customers)] if len(customers) else np.r_[0]
+        ).astype(np.int64)
+
+        # Ticket counts per customer are barcode offset differences
+        ticket_counts = np.diff(self.barcode_offsets[self.customer_offsets])
+        self.ranked_customer_ids, self.ranked_ticket_counts = rank_customers(
+            self.customer_ids, ticket_counts
+        )
+
+        # Row of each order_id, for order cursors
+        self._order_rows = np.argsort(self.order_ids, kind="stable")
+        self._sorted_order_ids = self.order_ids[self._order_rows]
+
+        self.unused_barcodes = np.sort(
+            np.asarray(unused_barcodes if unused_barcodes is not None else [], np.int64)
+        )
+
+    @classmethod
+    def from_frame(
+        cls, df: pd.DataFrame, unused_barcodes: Optional[np.ndarray] = None
+    ) -> "ProcessedDataset":
+        """Build the dataset from processed data with a barcode list column.
+
+        Args:
+            df (pd.DataFrame): Processed data as returned by
+                OrderProcessor.process
+            unused_barcodes (np.ndarray, optional): Barcodes without an order
+
+        Returns:
+            ProcessedDataset: Compact dataset
+        """
+        if not cls._is_sorted(df):
+            df = df.sort_values(["customer_id", "order_id"])
+        counts = df["barcode"].str.len().to_numpy(dtype=np.int64)
+        barcodes = [barcode for order in df["barcode"] for barcode in order]
+        return cls(
+            df["customer_id"].to_numpy(),
+            df["order_id"].to_numpy(),
+            np.r_[0, np.cumsum(counts)],
+            np.array(barcodes, dtype=np.int64),
+            unused_barcodes,
+        )
+
+    @classmethod
+    def from_inputs(
+        cls, orders_df: pd.DataFrame, barcodes_df: pd.DataFrame
+    ) -> "ProcessedDataset":
+        """Build the dataset from validated orders and barcodes without
+        materializing per-order lists.
+
+        Barcodes keep their input order within an order, and orders without
+        barcodes are left out, as in :meth:`OrderProcessor.process`.
+
+        Args:
+            orders_df (pd.DataFrame): Orders data
+            barcodes_df (pd.DataFrame): Barcodes data with nullable order_id
+
+        Returns:
+            ProcessedDataset: Compact dataset
+        """
+        sold = barcodes_df["order_id"].notna().to_numpy()
+        barcode_orders = barcodes_df["order_id"].to_numpy(dtype=np.int64, na_value=-1)[
+            sold
+        ]
+        barcode_values = barcodes_df["barcode"].to_numpy(dtype=np.int64)
+
+        order_ids = orders_df["order_id"].to_numpy(dtype=np.int64)
+        customer_ids = orders_df["customer_id"].to_numpy(dtype=np.int64)
+        rows = np.lexsort((order_ids, customer_ids))
+        order_ids, customer_ids = order_ids[rows], customer_ids[rows]
+
+        # Row of each sold barcode's order; barcodes of unknown orders drop out
+        by_id = np.argsort(order_ids)
+        pos = np.searchsorted(order_ids, barcode_orders, sorter=by_id)
+        pos = np.minimum(pos, max(len(order_ids) - 1, 0))
+        known = (
+            order_ids[by_id[pos]] == barcode_orders
+            if len(order_ids)
+            else np.zeros(len(barcode_orders), dtype=bool)
+        )
+        barcode_rows = by_id[pos[known]]
+        barcodes = barcode_values[sold][known][np.argsort(barcode_rows, kind="stable")]
+
+        counts = np.bincount(barcode_rows, minlength=len(order_ids))
+        has_barcodes = counts > 0
+        return cls(
+            customer_ids[has_barcodes],
+            order_ids[has_barcodes],
+            np.r_[0, np.cumsum(counts[has_barcodes])],
+            barcodes,
+            barcode_values[~sold],
+        )
+
+    @staticmethod
+    def _is_sorted(df: pd.DataFrame) -> bool:
+        customer_steps = np.diff(df["customer_id"].to_numpy())
+        order_steps = np.diff(df["order_id"].to_numpy())
+        return bool(
+            np.all((customer_steps > 0) | ((customer_steps == 0) & (order_steps > 0)))
+        )
+
+    def __len__(self) -> int:
+        return len(self.order_ids)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the dataset's arrays."""
+        return sum(
+            array.nbytes
+            for array in (
+                self.order_customer_ids,
+                self.order_ids,
+                self.barcode_offsets,
+                self.barcodes,
+                self.customer_ids,
+                self.customer_offsets,
+                self.ranked_customer_ids,
+                self.ranked_ticket_counts,
+                self._order_rows,
+                self._sorted_order_ids,
+                self.unused_barcodes,
+            )
+        )
+
+    def order_barcodes(self, row: int) -> np.ndarray:
+        """Return the barcodes of one order row."""
+        return self.barcodes[self.barcode_offsets[row] : self.barcode_offsets[row + 1]]
+
+    def customer_orders(self, customer_id: int) -> range:
+        """Return the order rows of one customer without scanning the dataset.
+
+        Args:
+            customer_id (int): Customer identifier
+
+        Returns:
+            range: Rows of the customer's orders, empty if there are none
+        """
+        pos = np.searchsorted(self.customer_ids, customer_id)
+        if pos == len(self.customer_ids) or self.customer_ids[pos] != customer_id:
+            return range(0)
+        return range(
+            int(self.customer_offsets[pos]), int(self.customer_offsets[pos + 1])
+        )
+
+    def top_customers(self, limit: int = 5) -> List[Tuple[int, int]]:
+        """Get customers who purchased most tickets.
+
+        Args:
+            limit (int): Number of top customers to return
+
+        Returns:
+            List[Tuple[int, int]]: List of (customer_id, ticket_count) tuples
+        """
+        return list(
+            zip(
+                self.ranked_customer_ids[:limit].tolist(),
+                self.ranked_ticket_counts[:limit].tolist(),
+            )
+        )
+
+    def orders_page(
+        self, after: Optional[int] = None, limit: Optional[int] = None
+    ) -> range:
+        """Return the order rows following a cursor.
+
+        Args:
+            after (int, optional): order_id of the last order already returned
+            limit (int, optional): Maximum number of orders, all when not set
+
+        Returns:
+            range: Rows in (customer_id, order_id) order
+
+        Raises:
+            KeyError: If the cursor order does not exist
+        """
+        start = 0
+        if after is not None:
+            pos = np.searchsorted(self._sorted_order_ids, after)
+            if pos == len(self._sorted_order_ids) or (
+                self._sorted_order_ids[pos] != after
+            ):
+                raise KeyError(after)
+            start = int(self._order_rows[pos]) + 1
+        end = len(self) if limit is None else min(start + limit, len(self))
+        return range(start, end)
+
+    def unused_page(
+        self, after: Optional[int] = None, limit: Optional[int] = None
+    ) -> np.ndarray:
+        """Return the unused barcodes following a cursor.
+
+        Args:
+            after (int, optional): Last barcode already returned
+            limit (int, optional): Maximum number of barcodes, all when not set
+
+        Returns:
+            np.ndarray: Unused barcodes in ascending order
+        """
+        start = 0
+        if after is not None:
+            start = np.searchsorted(self.unused_barcodes, after, side="right")
+        end = len(self.unused_barcodes) if limit is None else start + limit
+        return self.unused_barcodes[start:end]
+
+    def iter_orders(self, rows: Optional[range] = None):
+        """Yield (customer_id, order_id, barcodes) per order row.
+
+        Args:
+            rows (range, optional): Rows to yield, all when not set
+
+        Yields:
+            Tuple[int, int, List[int]]: Order with its barcodes
+        """
+        rows = rows if rows is not None else range(len(self))
+        if not len(rows):
+            return
+        offsets = self.barcode_offsets[rows.start : rows.stop + 1]
+        barcodes = self.barcodes[offsets[0] : offsets[-1]].tolist()
+        bounds = (offsets - offsets[0]).tolist()
+        yield from zip(
+            self.order_customer_ids[rows.start : rows.stop].tolist(),
+            self.order_ids[rows.start : rows.stop].tolist(),
+            (barcodes[bounds[i] : bounds[i + 1]] for i in range(len(rows))),
+        )
+
+    def to_frame(self, rows: Optional[range] = None) -> pd.DataFrame:
+        """Materialize rows as processed data with a barcode list column.
+
+        Args:
+            rows (range, optional): Rows to include, all when not set
+
+        Returns:
+            pd.DataFrame: Columns order_id, customer_id and barcode, as
+                returned by OrderProcessor.process
+        """
+        orders = list(self.iter_orders(rows))
+        return pd.DataFrame(
+            {
+                "order_id": np.array([order[1] for order in orders], dtype=np.int64),
+                "customer_id": np.array([order[0] for order in orders], dtype=np.int64),
+                "barcode": pd.Series([order[2] for order in orders], dtype=object),
+            }
+        )
+
+    def to_csv(self, path: Path) -> None:
+        """Write the orders in the format of OrderProcessor.save_results.
+
+        Args:
+            path (Path): Output CSV file
+        """
+        barcodes = self.barcodes.astype(str)
+        bounds = self.barcode_offsets.tolist()
+        pd.DataFrame(
+            {
+                "customer_id": self.order_customer_ids,
+                "order_id": self.order_ids,
+                "barcode": [
+                    "[" + ", ".join(barcodes[bounds[i] : bounds[i + 1]]) + "]"
+                    for i in range(len(self))
+                ],
+            }
+        ).to_csv(path, index=False)
@@ -0,0 +1,65 @@
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+# Duplicate barcodes listed in the log; the side file has all of them
+MAX_LOGGED_DUPLICATES = 20
+
+# Side file with every dropped duplicate, written next to the output
+DUPLICATES_FILE = "duplicate_barcodes.csv"
+
+# Unsorted integers spanning at most this many values per element are
+# checked with a presence table before falling back to hashing
+DENSE_SPAN_FACTOR = 4
+
+
+def duplicate_mask(values: np.ndarray) -> np.ndarray:
+    """Flag every repeated value after its first occurrence in one pass.
+
+    Sorted integer arrays (the common shape of barcode exports) are checked by
+    comparing neighbours. Unsorted integers from a dense range are first
+    checked with a presence table, which proves the common duplicate-free
+    case without hashing; otherwise they go through a single hash pass.
+    Non-integer arrays fall back to ``pd.Series.duplicated``.
+
+    Args:
+        values (np.ndarray): Values to check, e.g. the int64 barcode column
+
+    Returns:
+        np.ndarray: Boolean mask, True for duplicates to drop (keep="first")
+    """
+    values = np.asarray(values)
+    if values.dtype.kind in "iu" and len(values) > 1:
+        if (values[1:] >= values[:-1]).all():
+            return np.concatenate(([False], values[1:] == values[:-1]))
+        low = values.min()
+        span = int(values.max()) - int(low) + 1
+        if span <= DENSE_SPAN_FACTOR * len(values):
+            present = np.zeros(span, dtype=bool)
+            present[values - low] = True
+            if np.count_nonzero(present) == len(values):
+                return np.zeros(len(values), dtype=bool)
+    return pd.Series(values, copy=False).duplicated(keep="first").to_numpy()
+
+
+def format_duplicates(
+    duplicates: pd.DataFrame, side_file: Optional[Path] = None
+) -> str:
+    """Summarize duplicate barcodes for the log, listing a capped sample.
+
+    Args:
+        duplicates (pd.DataFrame): Dropped duplicate rows
+        side_file (Path, optional): File listing all duplicates
+
+    Returns:
+        str: Log message
+    """
+    sample = duplicates["barcode"].head(MAX_LOGGED_DUPLICATES).tolist()
+    message = f"Found {len(duplicates)} duplicate barcodes: {sample}"
+    if len(duplicates) > MAX_LOGGED_DUPLICATES:
+        message += f" (first {MAX_LOGGED_DUPLICATES} shown)"
+    if side_file is not None:
+        message += f"; all duplicates written to {side_file}"
+    return message
@@ -0,0 +1,335 @@
+import hashlib
+import io
+import json
+import os
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+import pandas as pd
+
+from ..exceptions import DataValidationError, FileOperationError
+from .bitmap import RoaringBitmap
+from .ingest import BARCODES_DTYPES, ORDERS_DTYPES, read_tolerant_csv, read_typed_csv
+from .loader import orders_types_schema
+from .validator import FrameSchema, deduplicated_barcodes_schema, orders_schema
+
+# Read size used when hashing input prefixes
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+class IncrementalProcessor:
+    """Process only rows added or changed since the last successful run.
+
+    After each successful run a watermark is stored per input file: the byte
+    offset that was consumed and the SHA-256 of the bytes before it, next to
+    the validated input frames. If an input still starts with the recorded
+    bytes, only the appended rows are parsed; otherwise the file is reloaded.
+    Both reads go through the pinned-dtype ingest path, so malformed lines
+    are dropped and reported as in a full load. The new inputs are diffed
+    against the stored ones to find new orders, newly assigned barcodes and
+    barcodes that changed from unused to sold. Barcodes that moved to
+    another order are left out of the delta: the database keeps the first
+    order a barcode was sold with, as a full save does.
+    """
+
+    STATE_DIR_NAME = ".incremental"
+
+    def __init__(self, processor):
+        """Initialize IncrementalProcessor.
+
+        Args:
+            processor (OrderProcessor): Processor providing loader, merge logic
+                and output directory
+        """
+        self.processor = processor
+        self.logger = processor.logger
+        self.state_dir = processor.output_dir / self.STATE_DIR_NAME
+
+    def run(
+        self, apply_delta: Optional[Callable[..., None]] = None
+    ) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """Run an incremental processing pass.
+
+        The processed CSV is rewritten from the in-memory state, ``apply_delta``
+        receives only the changed orders and, as ``unused_barcodes``, the
+        barcodes without an order that are new (e.g. to update the database),
+        and the watermark is committed once both succeeded.
+
+        Args:
+            apply_delta (Callable, optional): Called with the delta frame and
+                the new unused barcodes
+
+        Returns:
+            Tuple[pd.DataFrame, pd.DataFrame]: Full processed data and the
+                delta with columns customer_id, order_id and barcode (the newly
+                assigned barcodes of each order)
+
+        Raises:
+            FileOperationError: If input files not found
+            DataValidationError: If data validation fails
+        """
+        # A watermark is only usable together with the state it describes
+        watermarks = self._load_watermarks()
+        if not all((self.state_dir / f"{name}.pkl").exists() for name in watermarks):
+            watermarks = {}
+        previous_orders = self._load_frame("orders", ["order_id", "customer_id"])
+        previous_barcodes = self._load_frame("barcodes", ["barcode", "order_id"])
+
+        orders_df, orders_mark = self._read_orders(
+            watermarks.get("orders"), previous_orders
+        )
+        barcodes_df, barcodes_mark = self._read_barcodes(
+            watermarks.get("barcodes"), previous_barcodes
+        )
+        if orders_df.empty or barcodes_df.empty:
+            raise DataValidationError("Empty input data")
+
+        valid_orders_df = self.processor._validate_orders_barcodes(
+            orders_df, barcodes_df
+        )
+        result_df = self.processor._merge_orders_barcodes(valid_orders_df, barcodes_df)
+        if result_df.empty:
+            raise DataValidationError("No valid orders found after processing")
+
+        # Barcodes that are sold now but were unknown or unused; stored sold
+        # barcodes are never reassigned, so moves are only logged
+        previous_order = barcodes_df["barcode"].map(
+            previous_barcodes.set_index("barcode")["order_id"]
+        )
+        sold = barcodes_df["order_id"].notna()
+        changed = sold & previous_order.isna()
+        moved = previous_order.notna() & (
+            sold & (previous_order != barcodes_df["order_id"])
+        ).fillna(False)
+        if moved.any():
+            self.logger.warning(
+                f"Ignoring {int(moved.sum())} barcodes moved to another order: "
+                f"{barcodes_df.loc[moved, 'barcode'].tolist()[:20]}"
+            )
+        delta_df = self.processor._merge_orders_barcodes(
+            valid_orders_df, barcodes_df[changed]
+        )
+        # Barcodes without an order that were not stored before
+        unused = barcodes_df["order_id"].isna() & ~barcodes_df["barcode"].isin(
+            previous_barcodes["barcode"]
+        )
+        unused_barcodes = barcodes_df.loc[unused, "barcode"].tolist()
+        self.logger.info(
+            f"Incremental run: {len(delta_df)} changed orders, "
+            f"{int(changed.sum())} newly assigned barcodes, "
+            f"{len(unused_barcodes)} new unused barcodes"
+        )
+
+        self.processor.save_results(result_df)
+        if apply_delta is not None and (not delta_df.empty or unused_barcodes):
+            apply_delta(delta_df, unused_barcodes=unused_barcodes)
+
+        self._save_frame("orders", orders_df)
+        self._save_frame("barcodes", barcodes_df)
+        self._save_watermarks({"orders": orders_mark, "barcodes": barcodes_mark})
+        return result_df, delta_df
+
+    def _read_orders(
+        self, watermark: Optional[Dict], previous: pd.DataFrame
+    ) -> Tuple[pd.DataFrame, Dict]:
+        """Read orders.csv, parsing only appended rows when possible."""
+        raw, mark, appended = self._read_input(
+            "orders.csv", watermark, ORDERS_DTYPES, orders_types_schema
+        )
+        orders = orders_schema.validate(raw)
+        if not appended:
+            return orders, mark
+
+        overlap = orders["order_id"].isin(previous["order_id"])
+        if overlap.any():
+            raise DataValidationError(
+                f"Appended orders reuse existing order IDs: "
+                f"{orders.loc[overlap, 'order_id'].tolist()}"
+            )
+        return pd.concat([previous, orders], ignore_index=True), mark
+
+    def _read_barcodes(
+        self, watermark: Optional[Dict], previous: pd.DataFrame
+    ) -> Tuple[pd.DataFrame, Dict]:
+        """Read barcodes.csv, parsing only appended rows when possible."""
+        raw, mark, appended = self._read_input(
+            "barcodes.csv", watermark, BARCODES_DTYPES, deduplicated_barcodes_schema
+        )
+        self.processor.loader._duplicates_written = False
+        barcodes = self.processor.loader._check_duplicate_barcodes(raw)
+        if not appended:
+            return deduplicated_barcodes_schema.validate(barcodes), mark
+
+        # Earlier rows win over appended duplicates, as in a full load
+        duplicates = RoaringBitmap.from_values(previous["barcode"]).contains(
+            barcodes["barcode"]
+        )
+        if duplicates.any():
+            self.logger.warning(
+                f"Skipping {int(duplicates.sum())} appended duplicate barcodes"
+            )
+        barcodes = deduplicated_barcodes_schema.validate(barcodes[~duplicates])
+        return pd.concat([previous, barcodes], ignore_index=True), mark
+
+    def _read_input(
+        self,
+        filename: str,
+        watermark: Optional[Dict],
+        dtypes: Dict[str, str],
+        schema: FrameSchema,
+    ) -> Tuple[pd.DataFrame, Dict, bool]:
+        """Read the rows of an input file beyond its watermark.
+
+        Rows are parsed with pinned dtypes like a full load; if they do not
+        fit them, malformed lines and invalid values are dropped and
+        reported with their line numbers in the file.
+
+        While the file keeps growing past what was read, its incomplete last
+        line is left for the next run, as it may still be being written. At
+        the end of a file without a trailing newline the last line is
+        consumed; if a later run finds that line extended, the file is
+        reloaded.
+
+        Args:
+            filename (str): Input file name
+            watermark (Dict, optional): Previous watermark of the file
+            dtypes (Dict[str, str]): dtype of each expected column
+            schema (FrameSchema): Type rules of the columns
+
+        Returns:
+            Tuple[pd.DataFrame, Dict, bool]: Parsed rows, new watermark and
+                whether the rows were appended to the previous state
+        """
+        path = self.processor.loader.input_dir / filename
+        try:
+            with open(path, "rb") as f:
+                digest = self._prefix_digest(f, watermark) if watermark else None
+                appended = digest is not None
+                if not appended:
+                    f.seek(0)
+                    digest = hashlib.sha256()
+
+                data = f.read()
+                growing = os.fstat(f.fileno()).st_size > f.tell()
+                if growing and not data.endswith(b"\n"):
+                    data = data[: data.rfind(b"\n") + 1]
+                digest.update(data)
+        except FileNotFoundError as e:
+            self.logger.error(f"Input file not found at {path}")
+            raise FileOperationError(f"Input file not found: {str(e)}")
+
+        if appended:
+            columns = watermark["columns"]
+            header = (",".join(columns) + "\n").encode()
+            offset = watermark["offset"] + len(data)
+            lines = watermark.get("lines", 0)
+        else:
+            header_end = data.find(b"\n") + 1 or len(data)
+            header, data = data[:header_end], data[header_end:]
+            columns = pd.read_csv(io.BytesIO(header), nrows=0).columns.tolist()
+            offset = len(header) + len(data)
+            lines = 0
+        rows = self._parse(path, header, data, dtypes, schema, lines)
+
+        mark = {
+            "offset": offset,
+            "sha256": digest.hexdigest(),
+            "columns": columns,
+            "lines": lines + data.count(b"\n"),
+            "terminated": (
+                data.endswith(b"\n")
+                if data
+                else not appended or watermark.get("terminated", True)
+            ),
+        }
+        return rows, mark, appended
+
+    def _parse(
+        self,
+        path: Path,
+        header: bytes,
+        data: bytes,
+        dtypes: Dict[str, str],
+        schema: FrameSchema,
+        line_offset: int,
+    ) -> pd.DataFrame:
+        """Parse rows of an input file with pinned dtypes.
+
+        Args:
+            path (Path): Input CSV file, naming its bad lines
+            header (bytes): Header line of the file
+            data (bytes): Rows to parse
+            dtypes (Dict[str, str]): dtype of each expected column
+            schema (FrameSchema): Type rules of the columns
+            line_offset (int): Lines of the file between the header and the
+                first row
+
+        Returns:
+            pd.DataFrame: Parsed rows
+
+        Raises:
+            SchemaValidationError: If columns are missing or unexpected
+        """
+        schema.validate(pd.read_csv(io.BytesIO(header), nrows=0, dtype=str))
+        try:
+            return read_typed_csv(io.BytesIO(header + data), dtypes)
+        except ValueError as e:
+            self.logger.warning(
+                f"Could not parse {path.name} with pinned dtypes ({e}), "
+                f"reparsing and dropping bad lines"
+            )
+        df, report = read_tolerant_csv(io.BytesIO(header + data), schema, line_offset)
+        self.processor.loader._record_bad_lines(path, report)
+        return df
+
+    def _prefix_digest(self, f, watermark: Dict):
+        """Hash the bytes consumed last time if the file still starts with them.
+
+        Args:
+            f: Binary file positioned at its start
+            watermark (Dict): Previous watermark of the file
+
+        Returns:
+            Running SHA-256 of the prefix with the file positioned after it,
+            or None if the prefix changed or its unterminated last line was
+            extended
+        """
+        if os.fstat(f.fileno()).st_size < watermark["offset"]:
+            return None
+
+        digest = hashlib.sha256()
+        remaining = watermark["offset"]
+        while remaining:
+            block = f.read(min(HASH_BLOCK_SIZE, remaining))
+            if not block:
+                return None
+            digest.update(block)
+            remaining -= len(block)
+        if digest.hexdigest() != watermark["sha256"]:
+            return None
+        if not watermark.get("terminated", True):
+            position = f.tell()
+            if f.read(1) not in (b"", b"\n", b"\r"):
+                return None
+            f.seek(position)
+        return digest
+
+    def _load_watermarks(self) -> Dict:
+        path = self.state_dir / "watermark.json"
+        return json.loads(path.read_text()) if path.exists() else {}
+
+    def _save_watermarks(self, watermarks: Dict) -> None:
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.state_dir / "watermark.json.tmp"
+        tmp_path.write_text(json.dumps(watermarks))
+        os.replace(tmp_path, self.state_dir / "watermark.json")
+
+    def _load_frame(self, name: str, columns) -> pd.DataFrame:
+        path = self.state_dir / f"{name}.pkl"
+        return pd.read_pickle(path) if path.exists() else pd.DataFrame(columns=columns)
+
+    def _save_frame(self, name: str, df: pd.DataFrame) -> None:
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.state_dir / f"{name}.pkl.tmp"
+        df.to_pickle(tmp_path)
+        os.replace(tmp_path, self.state_dir / f"{name}.pkl")
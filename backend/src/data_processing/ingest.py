@@ -0,0 +1,170 @@
+import contextlib
+import io
+import itertools
+import re
+import warnings
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from ..exceptions import SchemaValidationError
+from .validator import COLUMN_ERROR_ROW, FrameSchema, ValidationReport
+
+# Pinned dtypes of the input columns; unused barcodes have no order_id
+ORDERS_DTYPES = {"order_id": "int64", "customer_id": "int64"}
+BARCODES_DTYPES = {"barcode": "int64", "order_id": "Int64"}
+
+# Side file listing the lines dropped while loading an input
+BAD_LINES_FILE = "bad_lines_{name}.csv"
+
+# Column of errors about a whole line, e.g. a wrong number of fields
+LINE_ERROR_COLUMN = "*"
+
+# Largest integer every float64 represents exactly
+_MAX_EXACT_FLOAT = 2**53
+
+_SKIPPED_LINE = re.compile(r"Skipping line (\d+): ([^\n]+)")
+
+
+def read_typed_csv(
+    source: Union[Path, BinaryIO], dtypes: Dict[str, str]
+) -> pd.DataFrame:
+    """Parse a well-formed input file straight into its pinned dtypes.
+
+    Files are read through a memory map. The C parser is several times
+    slower at nullable Int64 columns than at float64 ones, so those are
+    parsed as float64 and converted exactly. Callers check beforehand that
+    the header holds exactly the expected columns: projecting them with
+    ``usecols`` would make the parser accept lines with extra fields.
+
+    Args:
+        source (Union[Path, BinaryIO]): Input CSV file, or a buffer holding
+            a chunk of one with its header
+        dtypes (Dict[str, str]): dtype of each expected column
+
+    Returns:
+        pd.DataFrame: Parsed columns
+
+    Raises:
+        ValueError: If a line or value does not fit the pinned dtypes
+    """
+    nullable = [name for name, dtype in dtypes.items() if dtype == "Int64"]
+    df = pd.read_csv(
+        source,
+        dtype={**dtypes, **{name: "float64" for name in nullable}},
+        engine="c",
+        memory_map=isinstance(source, (str, Path)),
+    )
+    for name in nullable:
+        floats = df[name].to_numpy()
+        nulls = np.isnan(floats)
+        values = np.where(nulls, 0, floats)
+        if (np.abs(values) >= _MAX_EXACT_FLOAT).any() or (
+            values != np.floor(values)
+        ).any():
+            raise ValueError(f"Column {name} has values that are not exact integers")
+        df[name] = pd.arrays.IntegerArray(values.astype(np.int64), nulls)
+    return df
+
+
+def read_tolerant_csv(
+    source: Union[Path, BinaryIO], schema: FrameSchema, line_offset: int = 0
+) -> Tuple[pd.DataFrame, ValidationReport]:
+    """Parse a malformed input file, dropping and reporting its bad lines.
+
+    Lines with a wrong number of fields are skipped by the parser and values
+    that ``schema`` rejects are dropped with their line.
+
+    Args:
+        source (Union[Path, BinaryIO]): Input CSV file, or a buffer holding
+            a chunk of one with its header
+        schema (FrameSchema): Column rules, without uniqueness checks
+        line_offset (int): Lines of the file between the header and the
+            first line of a chunk
+
+    Returns:
+        Tuple[pd.DataFrame, ValidationReport]: Coerced valid rows, and the
+            dropped lines (1-based file line numbers, the header is line 1)
+
+    Raises:
+        SchemaValidationError: If columns are missing or unexpected
+    """
+    # The C parser reports skipped lines on stderr (pandas < 2.2) or as
+    # ParserWarnings
+    messages = io.StringIO()
+    with contextlib.redirect_stderr(messages), warnings.catch_warnings(
+        record=True
+    ) as caught:
+        warnings.simplefilter("always", pd.errors.ParserWarning)
+        raw = pd.read_csv(
+            source,
+            dtype=str,
+            on_bad_lines="warn",
+            memory_map=isinstance(source, (str, Path)),
+        )
+    messages.writelines(str(warning.message) for warning in caught)
+    skipped = [
+        (int(match.group(1)) + line_offset, match.group(2))
+        for match in _SKIPPED_LINE.finditer(messages.getvalue())
+    ]
+
+    df, report = schema.check(raw)
+    errors = report.to_frame()
+    if (errors["row"] == COLUMN_ERROR_ROW).any():
+        raise SchemaValidationError(report)
+
+    # Rows of the parsed frame shift past every skipped line
+    skipped_lines = np.array(sorted(line for line, _ in skipped), dtype=np.int64)
+    rows_before = skipped_lines - line_offset - 2 - np.arange(len(skipped_lines))
+
+    def file_lines(rows: np.ndarray) -> np.ndarray:
+        return rows + line_offset + 2 + np.searchsorted(rows_before, rows, side="right")
+
+    lines = ValidationReport()
+    for line, reason in skipped:
+        lines.add(np.array([line]), LINE_ERROR_COLUMN, reason)
+    for (column, reason), group in errors.groupby(["column", "reason"], sort=False):
+        lines.add(file_lines(group["row"].to_numpy()), column, reason)
+    return df.reset_index(drop=True), lines
+
+
+def iter_csv_chunks(
+    path: Path, dtypes: Dict[str, str], schema: FrameSchema, chunksize: int
+) -> Iterator[Tuple[pd.DataFrame, ValidationReport]]:
+    """Parse an input file chunk by chunk like a full load.
+
+    Each chunk of ``chunksize`` lines is parsed with pinned dtypes; a chunk
+    that does not fit them is reparsed as text with its bad lines dropped
+    and reported, so one malformed line only slows down its own chunk.
+
+    Args:
+        path (Path): Input CSV file
+        dtypes (Dict[str, str]): dtype of each expected column
+        schema (FrameSchema): Column rules, without uniqueness checks
+        chunksize (int): Maximum number of lines per chunk
+
+    Yields:
+        Tuple[pd.DataFrame, ValidationReport]: Parsed rows of a chunk, and
+            its dropped lines (1-based file line numbers)
+
+    Raises:
+        SchemaValidationError: If columns are missing or unexpected
+    """
+    with open(path, "rb") as f:
+        header = f.readline()
+        line_offset = 0
+        while True:
+            lines = list(itertools.islice(f, chunksize))
+            if not lines:
+                return
+            if not lines[-1].endswith(b"\n"):
+                lines[-1] += b"\n"
+            chunk = header + b"".join(lines)
+            try:
+                parsed = read_typed_csv(io.BytesIO(chunk), dtypes), ValidationReport()
+            except ValueError:
+                parsed = read_tolerant_csv(io.BytesIO(chunk), schema, line_offset)
+            yield parsed
+            line_offset += len(lines)
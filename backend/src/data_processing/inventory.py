@@ -0,0 +1,333 @@
+import hashlib
+from datetime import datetime, timezone
+from typing import Iterable, Optional, Tuple
+
+import numpy as np
+from app import db
+from app.models.models import BarcodeInventoryState, BarcodeReservation
+from sqlalchemy import case, delete, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+
+from ..exceptions import InventoryError
+
+# Reservations inserted or deleted per statement
+ALLOCATE_BATCH_SIZE = 1000
+
+
+def _members(sorted_values: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """Flag the values present in a sorted array."""
+    if not len(sorted_values):
+        return np.zeros(len(values), dtype=bool)
+    pos = np.minimum(np.searchsorted(sorted_values, values), len(sorted_values) - 1)
+    return sorted_values[pos] == values
+
+
+class BarcodeInventory:
+    """Unused barcodes available for new orders.
+
+    The unused barcodes of an input are one sorted int64 array, built once
+    per input fingerprint. Allocations are rows of the
+    ``barcode_reservations`` table, keyed by barcode, so every worker and
+    every inventory built from the same database sees them, and they
+    survive restarts. A barcode is allocated by inserting its reservation;
+    the primary key lets exactly one concurrent allocation win it.
+
+    A ``barcode_inventory_state`` row per set of unused barcodes holds the
+    number of reservations and a value below which every unused barcode is
+    reserved; allocations and releases update it in their transaction.
+    Counting is one primary-key read, and a page reads only the
+    reservations between its first and last barcode above that value, so
+    neither grows with the total number of reservations. Building the
+    inventory of a new set drops the reservations of barcodes that are no
+    longer unused, e.g. sold in the input since.
+    """
+
+    def __init__(self, barcodes: Iterable[int]):
+        """Build the inventory once from the unused barcodes of an input.
+
+        Args:
+            barcodes (Iterable[int]): Unused barcodes, sorted or not
+        """
+        barcodes = np.asarray(barcodes, dtype=np.int64)
+        if len(barcodes) > 1 and not (barcodes[1:] > barcodes[:-1]).all():
+            barcodes = np.unique(barcodes)
+        self.unused = barcodes
+        self.digest = hashlib.sha256(barcodes.tobytes()).hexdigest()
+        self._reconcile()
+
+    def __len__(self) -> int:
+        """Number of barcodes available for allocation."""
+        reserved, _, _ = self._state()
+        return len(self.unused) - reserved
+
+    def page(
+        self, after: Optional[int] = None, limit: Optional[int] = None
+    ) -> np.ndarray:
+        """Return the available barcodes following a cursor.
+
+        Args:
+            after (int, optional): Last barcode already returned
+            limit (int, optional): Maximum number of barcodes, all when not set
+
+        Returns:
+            np.ndarray: Available barcodes in ascending order
+        """
+        _, allocated_below, _ = self._state()
+        return self._available(allocated_below, after, limit)
+
+    def allocate(self, count: int) -> np.ndarray:
+        """Reserve the lowest ``count`` available barcodes for new orders.
+
+        Either all ``count`` barcodes are reserved or none is. Barcodes
+        reserved concurrently by another worker are skipped.
+
+        Args:
+            count (int): Number of barcodes to allocate
+
+        Returns:
+            np.ndarray: Allocated barcodes in ascending order
+
+        Raises:
+            InventoryError: If fewer than ``count`` barcodes are available, or
+                the unused barcodes changed meanwhile
+        """
+        if count < 1:
+            raise ValueError("count must be positive")
+        statement = self._insert_ignore(BarcodeReservation).returning(
+            BarcodeReservation.barcode_value
+        )
+        reserved_at = datetime.now(timezone.utc)
+        allocated = []
+        try:
+            _, allocated_below, releases = self._state()
+            after = None
+            # Barcodes reserved since reading the reservations are skipped by
+            # the insert, and the next ones are tried in their place
+            while len(allocated) < count:
+                candidates = self._available(
+                    allocated_below,
+                    after,
+                    min(count - len(allocated), ALLOCATE_BATCH_SIZE),
+                )
+                if not len(candidates):
+                    break
+                after = int(candidates[-1])
+                allocated += db.session.scalars(
+                    statement.values(
+                        [
+                            {"barcode_value": value, "reserved_at": reserved_at}
+                            for value in candidates.tolist()
+                        ]
+                    )
+                ).all()
+            if len(allocated) < count:
+                raise InventoryError(
+                    f"Cannot allocate {count} barcodes, {len(allocated)} available"
+                )
+
+            # Every available barcode below the allocated ones is reserved
+            # now, unless one was released after reading the state
+            state = BarcodeInventoryState.__table__.c
+            below = max(allocated) + 1
+            self._update_state(
+                reserved=state.reserved + len(allocated),
+                allocated_below=case(
+                    (
+                        (state.releases == releases) & (state.allocated_below < below),
+                        below,
+                    ),
+                    else_=state.allocated_below,
+                ),
+            )
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        return np.sort(np.array(allocated, dtype=np.int64))
+
+    def release(self, barcodes: Iterable[int]) -> int:
+        """Return allocated barcodes to the inventory, e.g. for cancelled
+        orders.
+
+        Args:
+            barcodes (Iterable[int]): Barcodes returned by :meth:`allocate`
+
+        Returns:
+            int: Number of barcodes available again
+
+        Raises:
+            InventoryError: If a barcode is not allocated, or the unused
+                barcodes changed meanwhile
+        """
+        barcodes = np.unique(np.asarray(list(barcodes), dtype=np.int64))
+        values = barcodes.tolist()
+        try:
+            released = db.session.scalars(
+                delete(BarcodeReservation)
+                .where(BarcodeReservation.barcode_value.in_(values))
+                .returning(BarcodeReservation.barcode_value)
+            ).all()
+            if len(released) != len(values):
+                invalid = sorted(set(values) - set(released))
+                raise InventoryError(f"Barcodes not allocated: {invalid[:20]}")
+            if released:
+                state = BarcodeInventoryState.__table__.c
+                lowest = min(released)
+                self._update_state(
+                    reserved=state.reserved - len(released),
+                    releases=state.releases + 1,
+                    allocated_below=case(
+                        (state.allocated_below > lowest, lowest),
+                        else_=state.allocated_below,
+                    ),
+                )
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        return len(released)
+
+    def _available(
+        self, allocated_below: int, after: Optional[int], limit: Optional[int]
+    ) -> np.ndarray:
+        """Return unreserved barcodes following a cursor.
+
+        Windows of unused barcodes are checked against the reservations
+        within them, doubling in size until ``limit`` barcodes are found.
+
+        Args:
+            allocated_below (int): Every unused barcode below it is reserved
+            after (int, optional): Last barcode already returned
+            limit (int, optional): Maximum number of barcodes, all when not set
+
+        Returns:
+            np.ndarray: Available barcodes in ascending order
+        """
+        start = int(np.searchsorted(self.unused, allocated_below))
+        if after is not None:
+            start = max(start, int(np.searchsorted(self.unused, after, side="right")))
+        if limit is None:
+            candidates = self.unused[start:]
+            return candidates[~_members(self._reserved(candidates), candidates)]
+
+        pages = []
+        needed = size = limit
+        while needed > 0 and start < len(self.unused):
+            candidates = self.unused[start : start + size]
+            available = candidates[~_members(self._reserved(candidates), candidates)]
+            pages.append(available[:needed])
+            needed -= len(pages[-1])
+            start += len(candidates)
+            size *= 2
+        return np.concatenate(pages) if pages else self.unused[:0]
+
+    def _reconcile(self) -> None:
+        """Create the state of this set of unused barcodes if it is new.
+
+        Reservations of barcodes outside the set are dropped, and the state
+        of other sets is deleted first, so allocations by inventories of
+        outdated inputs fail instead of going uncounted.
+        """
+        state = BarcodeInventoryState.__table__.c
+        exists = db.session.execute(
+            select(state.unused_digest).where(state.unused_digest == self.digest)
+        ).first()
+        if exists is not None:
+            return
+        try:
+            db.session.execute(
+                delete(BarcodeInventoryState).where(
+                    BarcodeInventoryState.unused_digest != self.digest
+                )
+            )
+            reserved = self._reserved()
+            kept = _members(self.unused, reserved)
+            stale = reserved[~kept].tolist()
+            for start in range(0, len(stale), ALLOCATE_BATCH_SIZE):
+                db.session.execute(
+                    delete(BarcodeReservation).where(
+                        BarcodeReservation.barcode_value.in_(
+                            stale[start : start + ALLOCATE_BATCH_SIZE]
+                        )
+                    )
+                )
+            reserved = reserved[kept]
+
+            available = ~_members(reserved, self.unused)
+            if available.any():
+                allocated_below = int(self.unused[np.argmax(available)])
+            else:
+                allocated_below = int(self.unused[-1]) + 1 if len(self.unused) else 0
+            db.session.execute(
+                self._insert_ignore(BarcodeInventoryState).values(
+                    unused_digest=self.digest,
+                    reserved=len(reserved),
+                    allocated_below=allocated_below,
+                    releases=0,
+                )
+            )
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+    def _state(self) -> Tuple[int, int, int]:
+        """Return the reservation count, allocation floor and release count.
+
+        Raises:
+            InventoryError: If the unused barcodes changed since this
+                inventory was built
+        """
+        state = BarcodeInventoryState.__table__.c
+        row = db.session.execute(
+            select(state.reserved, state.allocated_below, state.releases).where(
+                state.unused_digest == self.digest
+            )
+        ).one_or_none()
+        if row is None:
+            raise InventoryError("Unused barcodes changed, retry")
+        return tuple(row)
+
+    def _update_state(self, **values) -> None:
+        """Update the state row of this set of unused barcodes.
+
+        Raises:
+            InventoryError: If the unused barcodes changed since this
+                inventory was built
+        """
+        table = BarcodeInventoryState.__table__
+        result = db.session.execute(
+            update(table).where(table.c.unused_digest == self.digest).values(**values)
+        )
+        if result.rowcount != 1:
+            raise InventoryError("Unused barcodes changed, retry")
+
+    def _reserved(self, within: Optional[np.ndarray] = None) -> np.ndarray:
+        """Return reserved barcodes in ascending order.
+
+        Args:
+            within (np.ndarray, optional): Sorted barcodes whose range limits
+                the reservations read, all when not set
+        """
+        if within is not None and not len(within):
+            return within[:0]
+        query = select(BarcodeReservation.barcode_value).order_by(
+            BarcodeReservation.barcode_value
+        )
+        if within is not None:
+            query = query.where(
+                BarcodeReservation.barcode_value.between(
+                    int(within[0]), int(within[-1])
+                )
+            )
+        return np.array(db.session.scalars(query).all(), dtype=np.int64)
+
+    @staticmethod
+    def _insert_ignore(model):
+        """Build an INSERT that skips rows whose primary key exists."""
+        dialect = db.session.get_bind().dialect.name
+        if dialect == "postgresql":
+            return postgresql.insert(model).on_conflict_do_nothing()
+        if dialect == "sqlite":
+            return sqlite.insert(model).on_conflict_do_nothing()
+        return insert(model)
@@ -1,40 +1,258 @@
 import logging
 from pathlib import Path
+from typing import Dict, Iterator, Optional
 
 import pandas as pd
 
-from .validator import barcodes_schema, orders_schema
+from ..utils.metrics import Metrics
+from .bitmap import BarcodeIndex
+from .dedup import DUPLICATES_FILE, duplicate_mask, format_duplicates
+from .ingest import (
+    BAD_LINES_FILE,
+    BARCODES_DTYPES,
+    ORDERS_DTYPES,
+    iter_csv_chunks,
+    read_tolerant_csv,
+    read_typed_csv,
+)
+from .snapshot import SnapshotCache
+from .validator import (
+    FrameSchema,
+    ValidationReport,
+    barcodes_schema,
+    deduplicated_barcodes_schema,
+    orders_schema,
+)
+
+# Type rules applied while parsing; uniqueness is checked after loading
+orders_types_schema = orders_schema.update_column("order_id", unique=False)
 
 
 class DataLoader:
-    def __init__(self, input_dir: str = "data/input", logger=None):
+    def __init__(
+        self,
+        input_dir: str = "data/input",
+        logger=None,
+        snapshot_dir: Optional[str] = None,
+        metrics: Optional[Metrics] = None,
+        duplicates_dir: Optional[str] = None,
+    ):
         """Initialize DataLoader with input directory and logger.
 
         Args:
             input_dir (str): Path to input data directory
             logger (logging.Logger, optional): Logger instance
+            snapshot_dir (str, optional): Directory for columnar snapshots of
+                validated inputs; snapshots are disabled when not set
+            metrics (Metrics, optional): Stage instrumentation
+            duplicates_dir (str, optional): Directory for the side files
+                listing all dropped duplicate barcodes and bad input lines
         """
         self.input_dir = Path(input_dir)
         self.logger = logger or logging.getLogger(__name__)
-        self._barcodes_df = None  # Cache the loaded data
+        self.metrics = metrics or Metrics()
+        self._orders_df = None  # Cache the loaded data
+        self._barcodes_df = None
+        self.barcode_index: Optional[BarcodeIndex] = None
+        self.duplicates_dir = Path(duplicates_dir) if duplicates_dir else None
+        self._duplicates_written = False
+        self.bad_lines: Dict[str, ValidationReport] = {}
+        self.snapshots = (
+            SnapshotCache(snapshot_dir, self.logger) if snapshot_dir else None
+        )
+
+    def _load_snapshot(self, source: Path) -> Optional[pd.DataFrame]:
+        """Return the cached snapshot of a source file, if any.
+
+        Args:
+            source (Path): Source CSV file
+
+        Returns:
+            Optional[pd.DataFrame]: Cached frame, or None if unavailable
+
+        Raises:
+            FileNotFoundError: If the source file does not exist
+        """
+        if self.snapshots is None:
+            return None
+        if not source.exists():
+            raise FileNotFoundError(source)
+        try:
+            return self.snapshots.load(source)
+        except Exception as e:
+            self.logger.warning(f"Ignoring unreadable snapshot of {source}: {e}")
+            return None
+
+    def _save_snapshot(self, source: Path, df: pd.DataFrame) -> None:
+        """Store a validated frame as snapshot of its source file.
+
+        Args:
+            source (Path): Source CSV file
+            df (pd.DataFrame): Validated frame
+        """
+        if self.snapshots is None:
+            return
+        try:
+            self.snapshots.save(source, df)
+        except Exception as e:
+            self.logger.warning(f"Could not write snapshot of {source}: {e}")
+
+    def _read_csv(
+        self, path: Path, dtypes: Dict[str, str], schema: FrameSchema
+    ) -> pd.DataFrame:
+        """Parse an input file with pinned dtypes.
+
+        Well-formed files are parsed in one typed pass. If that fails, the
+        file is parsed again as text; malformed lines and invalid values are
+        dropped, logged and listed in :attr:`bad_lines` and a side file
+        instead of aborting the load.
+
+        Args:
+            path (Path): Input CSV file
+            dtypes (Dict[str, str]): dtype of each expected column
+            schema (FrameSchema): Type rules of the columns
+
+        Returns:
+            pd.DataFrame: Parsed rows
+
+        Raises:
+            SchemaValidationError: If columns are missing or unexpected
+        """
+        # Projection would hide unexpected columns, so check the header first
+        schema.validate(pd.read_csv(path, nrows=0, dtype=str))
+        try:
+            return read_typed_csv(path, dtypes)
+        except ValueError as e:
+            self.logger.warning(
+                f"Could not parse {path.name} with pinned dtypes ({e}), "
+                f"reparsing and dropping bad lines"
+            )
+        df, report = read_tolerant_csv(path, schema)
+        self._record_bad_lines(path, report)
+        return df
+
+    def _iter_csv(
+        self,
+        path: Path,
+        dtypes: Dict[str, str],
+        schema: FrameSchema,
+        chunksize: int,
+    ) -> Iterator[pd.DataFrame]:
+        """Parse an input file in chunks with pinned dtypes.
+
+        Bad lines are dropped and reported as by :meth:`_read_csv`, once the
+        whole file has been read.
+
+        Args:
+            path (Path): Input CSV file
+            dtypes (Dict[str, str]): dtype of each expected column
+            schema (FrameSchema): Type rules of the columns
+            chunksize (int): Maximum number of lines per chunk
+
+        Yields:
+            pd.DataFrame: Parsed rows of a chunk
+
+        Raises:
+            SchemaValidationError: If columns are missing or unexpected
+        """
+        schema.validate(pd.read_csv(path, nrows=0, dtype=str))
+        bad_lines = ValidationReport()
+        for df, report in iter_csv_chunks(path, dtypes, schema, chunksize):
+            bad_lines.extend(report)
+            yield df
+        self._record_bad_lines(path, bad_lines)
+
+    def _record_bad_lines(self, path: Path, report: ValidationReport) -> None:
+        """List the dropped lines of an input, logging and writing them.
+
+        Args:
+            path (Path): Input CSV file
+            report (ValidationReport): Dropped lines
+        """
+        self.bad_lines[path.name] = report
+        if len(report):
+            message = f"Dropped bad lines of {path.name}: {report.summary(unit='line')}"
+            side_file = self._write_bad_lines(path, report)
+            if side_file is not None:
+                message += f"; all bad lines written to {side_file}"
+            self.logger.warning(message)
+
+    def _write_bad_lines(
+        self, source: Path, report: ValidationReport
+    ) -> Optional[Path]:
+        """Write the bad lines of an input to its side file.
+
+        Args:
+            source (Path): Input CSV file
+            report (ValidationReport): Dropped lines
+
+        Returns:
+            Optional[Path]: Side file path, or None if not configured
+        """
+        if self.duplicates_dir is None:
+            return None
+        path = self.duplicates_dir / BAD_LINES_FILE.format(name=source.stem)
+        try:
+            self.duplicates_dir.mkdir(parents=True, exist_ok=True)
+            report.to_frame().rename(columns={"row": "line"}).to_csv(path, index=False)
+            return path
+        except Exception as e:
+            self.logger.warning(f"Could not write bad lines: {e}")
+            return None
 
     def _check_duplicate_barcodes(self, df: pd.DataFrame) -> pd.DataFrame:
         """Check and handle duplicate barcodes.
 
+        Duplicates are found in one pass over the barcode array; the log
+        lists a capped sample and the side file (if configured) all of them.
+
         Args:
             df (pd.DataFrame): DataFrame containing barcode data
 
         Returns:
             pd.DataFrame: DataFrame with duplicate barcodes removed
         """
-        duplicates = df[df["barcode"].duplicated()]
-        if not duplicates.empty:
-            self.logger.warning(
-                f"\nFound {len(duplicates)} duplicate barcodes:\n"
-                f"{duplicates['barcode'].to_string()}"
+        mask = duplicate_mask(df["barcode"].to_numpy())
+        if not mask.any():
+            return df
+
+        self._report_duplicates(df[mask])
+        return df[~mask]
+
+    def _report_duplicates(self, duplicates: pd.DataFrame) -> None:
+        """Log dropped duplicate barcodes and append them to the side file.
+
+        Args:
+            duplicates (pd.DataFrame): Dropped duplicate rows
+        """
+        side_file = self._write_duplicates(duplicates)
+        self.logger.warning(format_duplicates(duplicates, side_file))
+
+    def _write_duplicates(self, duplicates: pd.DataFrame) -> Optional[Path]:
+        """Append duplicate rows to the side file of the current load.
+
+        Args:
+            duplicates (pd.DataFrame): Dropped duplicate rows
+
+        Returns:
+            Optional[Path]: Side file path, or None if not configured
+        """
+        if self.duplicates_dir is None:
+            return None
+        path = self.duplicates_dir / DUPLICATES_FILE
+        try:
+            self.duplicates_dir.mkdir(parents=True, exist_ok=True)
+            duplicates[["barcode", "order_id"]].to_csv(
+                path,
+                mode="a" if self._duplicates_written else "w",
+                header=not self._duplicates_written,
+                index=False,
             )
-            df = df.drop_duplicates(subset=["barcode"], keep="first")
-        return df
+            self._duplicates_written = True
+            return path
+        except Exception as e:
+            self.logger.warning(f"Could not write duplicate barcodes: {e}")
+            return None
 
     def load_orders(self) -> pd.DataFrame:
         """Load and validate orders data.
@@ -44,11 +262,25 @@ class DataLoader:
 
         Raises:
             FileNotFoundError: If orders.csv is not found
-            ValidationError: If data doesn't match expected schema
+            SchemaValidationError: If data doesn't match expected schema
         """
+        if self._orders_df is not None:
+            return self._orders_df
+
         try:
-            df = pd.read_csv(self.input_dir / "orders.csv")
-            return orders_schema.validate(df)
+            with self.metrics.stage("load_orders") as stage:
+                path = self.input_dir / "orders.csv"
+                df = self._load_snapshot(path)
+                if df is None:
+                    with self.metrics.stage("read_orders") as read:
+                        df = self._read_csv(path, ORDERS_DTYPES, orders_types_schema)
+                        read.rows = len(df)
+                    with self.metrics.stage("validate_orders", rows=len(df)):
+                        df = orders_schema.validate(df)
+                    self._save_snapshot(path, df)
+                stage.rows = len(df)
+            self._orders_df = df
+            return self._orders_df
         except FileNotFoundError:
             self.logger.error(
                 f"Orders file not found at {self.input_dir / 'orders.csv'}"
@@ -61,20 +293,38 @@ class DataLoader:
     def load_barcodes(self) -> pd.DataFrame:
         """Load and validate barcodes data.
 
+        Also builds :attr:`barcode_index`, the bitmaps of the loaded barcodes.
+
         Returns:
             pd.DataFrame: Validated barcodes data with duplicates removed
 
         Raises:
             FileNotFoundError: If barcodes.csv is not found
-            ValidationError: If data doesn't match expected schema
+            SchemaValidationError: If data doesn't match expected schema
         """
         if self._barcodes_df is not None:
             return self._barcodes_df
 
         try:
-            df = pd.read_csv(self.input_dir / "barcodes.csv")
-            df = self._check_duplicate_barcodes(df)
-            self._barcodes_df = barcodes_schema.validate(df)
+            with self.metrics.stage("load_barcodes") as stage:
+                path = self.input_dir / "barcodes.csv"
+                df = self._load_snapshot(path)
+                if df is None:
+                    self._duplicates_written = False
+                    with self.metrics.stage("read_barcodes") as read:
+                        df = self._read_csv(
+                            path, BARCODES_DTYPES, deduplicated_barcodes_schema
+                        )
+                        read.rows = len(df)
+                    with self.metrics.stage("check_duplicate_barcodes", rows=len(df)):
+                        df = self._check_duplicate_barcodes(df)
+                    with self.metrics.stage("validate_barcodes", rows=len(df)):
+                        df = deduplicated_barcodes_schema.validate(df)
+                    self._save_snapshot(path, df)
+                with self.metrics.stage("build_barcode_index", rows=len(df)):
+                    self.barcode_index = BarcodeIndex.from_frame(df)
+                stage.rows = len(df)
+            self._barcodes_df = df
             return self._barcodes_df
         except FileNotFoundError:
             self.logger.error(
@@ -84,3 +334,59 @@ class DataLoader:
         except Exception as e:
             self.logger.error(f"Error loading barcodes data: {str(e)}")
             raise
+
+    def iter_orders(self, chunksize: int) -> Iterator[pd.DataFrame]:
+        """Stream orders data in validated chunks.
+
+        Bad lines are dropped and reported as in :meth:`load_orders`, and
+        uniqueness of ``order_id`` is checked across chunks, repeats being
+        reported by their position among the parsed rows.
+
+        Args:
+            chunksize (int): Maximum number of rows per chunk
+
+        Yields:
+            pd.DataFrame: Validated orders chunk
+
+        Raises:
+            FileNotFoundError: If orders.csv is not found
+            SchemaValidationError: If a chunk doesn't match expected schema
+        """
+        path = self.input_dir / "orders.csv"
+        if not path.exists():
+            self.logger.error(f"Orders file not found at {path}")
+            raise FileNotFoundError(path)
+
+        yield from orders_schema.validate_chunks(
+            self._iter_csv(path, ORDERS_DTYPES, orders_types_schema, chunksize)
+        )
+
+    def iter_barcodes(self, chunksize: int) -> Iterator[pd.DataFrame]:
+        """Stream barcodes data in validated chunks.
+
+        Bad lines are dropped and reported as in :meth:`load_barcodes`, and
+        duplicate barcodes are dropped across chunks as in a full load, the
+        first occurrence in the file winning.
+
+        Args:
+            chunksize (int): Maximum number of rows per chunk
+
+        Yields:
+            pd.DataFrame: Validated barcodes chunk
+
+        Raises:
+            FileNotFoundError: If barcodes.csv is not found
+            SchemaValidationError: If a chunk doesn't match expected schema
+        """
+        path = self.input_dir / "barcodes.csv"
+        if not path.exists():
+            self.logger.error(f"Barcodes file not found at {path}")
+            raise FileNotFoundError(path)
+
+        self._duplicates_written = False
+        yield from barcodes_schema.validate_chunks(
+            self._iter_csv(
+                path, BARCODES_DTYPES, deduplicated_barcodes_schema, chunksize
+            ),
+            on_duplicates=self._report_duplicates,
+        )
@@ -0,0 +1,120 @@
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .bitmap import RoaringBitmap
+
+# Orders per partition in parallel mode
+DEFAULT_PARTITION_SIZE = 100_000
+
+Partition = Tuple[pd.DataFrame, pd.DataFrame]
+
+
+def partition_by_order(
+    orders_df: pd.DataFrame, barcodes_df: pd.DataFrame, num_partitions: int
+) -> List[Partition]:
+    """Hash-partition orders and their barcodes by ``order_id``.
+
+    Barcodes without an order are not part of any partition.
+
+    Args:
+        orders_df (pd.DataFrame): Orders data
+        barcodes_df (pd.DataFrame): Barcodes data
+        num_partitions (int): Number of partitions
+
+    Returns:
+        List[Partition]: (orders, barcodes) frames of each partition
+    """
+    sold = barcodes_df[barcodes_df["order_id"].notna()]
+    order_parts = orders_df["order_id"].to_numpy(dtype="int64") % num_partitions
+    barcode_parts = sold["order_id"].to_numpy(dtype="int64") % num_partitions
+
+    orders_by_part = dict(tuple(orders_df.groupby(order_parts, sort=False)))
+    barcodes_by_part = dict(tuple(sold.groupby(barcode_parts, sort=False)))
+    return [
+        (
+            orders_by_part.get(partition, orders_df.iloc[0:0]),
+            barcodes_by_part.get(partition, sold.iloc[0:0]),
+        )
+        for partition in range(num_partitions)
+    ]
+
+
+def process_partition(partition: Partition) -> Tuple[pd.DataFrame, List[int]]:
+    """Validate and merge the orders and barcodes of one partition.
+
+    Mirrors :meth:`OrderProcessor._validate_orders_barcodes` and
+    :meth:`OrderProcessor._merge_orders_barcodes`; runs in a worker process,
+    so invalid orders are returned instead of logged.
+
+    Args:
+        partition (Partition): Orders and barcodes of the partition
+
+    Returns:
+        Tuple[pd.DataFrame, List[int]]: Merged orders sorted by
+            (customer_id, order_id), and order IDs without barcodes
+    """
+    orders_df, barcodes_df = partition
+    orders_with_barcodes = RoaringBitmap.from_values(
+        barcodes_df["order_id"].dropna().to_numpy(dtype=np.int64)
+    )
+    has_barcodes = orders_with_barcodes.contains(
+        orders_df["order_id"].to_numpy(dtype=np.int64)
+    )
+    invalid_orders = orders_df.loc[~has_barcodes, "order_id"].tolist()
+
+    barcodes_grouped = (
+        barcodes_df.groupby("order_id")["barcode"].agg(list).reset_index()
+    )
+    result = orders_df[has_barcodes].merge(barcodes_grouped, on="order_id", how="inner")
+    return result.sort_values(["customer_id", "order_id"]), invalid_orders
+
+
+def process_partitions(
+    partitions: Sequence[Partition], workers: int
+) -> List[Tuple[pd.DataFrame, List[int]]]:
+    """Process partitions on a process pool, or in-process for one worker.
+
+    Args:
+        partitions (Sequence[Partition]): Partitions to process
+        workers (int): Number of worker processes
+
+    Returns:
+        List[Tuple[pd.DataFrame, List[int]]]: Results in partition order
+    """
+    if workers <= 1 or len(partitions) <= 1:
+        return [process_partition(partition) for partition in partitions]
+    with ProcessPoolExecutor(max_workers=min(workers, len(partitions))) as pool:
+        return list(pool.map(process_partition, partitions))
+
+
+def merge_sorted_partitions(parts: Sequence[pd.DataFrame]) -> pd.DataFrame:
+    """Merge frames each sorted by (customer_id, order_id) into one.
+
+    The sort keys are packed into one int64 so the stable (timsort) argsort
+    only merges the pre-sorted runs, like a k-way merge.
+
+    Args:
+        parts (Sequence[pd.DataFrame]): Sorted partition results
+
+    Returns:
+        pd.DataFrame: Merged frame sorted by (customer_id, order_id)
+    """
+    df = pd.concat(parts, ignore_index=True)
+    if df.empty:
+        return df
+
+    customer_ids = df["customer_id"].to_numpy(dtype="int64")
+    order_ids = df["order_id"].to_numpy(dtype="int64")
+    span = int(order_ids.max()) + 1
+    if (
+        customer_ids.min() >= 0
+        and order_ids.min() >= 0
+        and (int(customer_ids.max()) < np.iinfo(np.int64).max // span)
+    ):
+        order = np.argsort(customer_ids * span + order_ids, kind="stable")
+    else:
+        order = np.lexsort((order_ids, customer_ids))
+    return df.take(order).reset_index(drop=True)
@@ -1,10 +1,17 @@
 import logging
+import math
+import tempfile
+from collections import Counter
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import List, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
 
+import numpy as np
 import pandas as pd
 from app import db
-from app.models.models import Barcode, Customer, Order
+from app.models.models import Barcode, Customer, CustomerTicketStats, Order
+from sqlalchemy import bindparam, func, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.exc import SQLAlchemyError
 
 from ..exceptions import (
@@ -13,7 +20,33 @@ from ..exceptions import (
     DataValidationError,
     FileOperationError,
 )
+from ..utils.metrics import Metrics
+from .analytics import customer_ticket_counts, rank_customers
+from .bitmap import BARCODE_INDEX_FILE, BarcodeIndex, RoaringBitmap
+from .dataset import ProcessedDataset
 from .loader import DataLoader
+from .parallel import (
+    DEFAULT_PARTITION_SIZE,
+    merge_sorted_partitions,
+    partition_by_order,
+    process_partitions,
+)
+from .validator import orders_schema
+from .streaming import (
+    PartitionSpiller,
+    chunk_rows,
+    estimate_partitions,
+    merge_sorted_runs,
+)
+
+# Number of rows sent per multi-row INSERT / prefetch query
+DEFAULT_DB_BATCH_SIZE = 5000
+
+# Memory budget for the streaming pipeline
+DEFAULT_MEMORY_BUDGET_MB = 256
+
+# Per-stage metrics report written next to processed_orders.csv
+RUN_REPORT_FILE = "run_report.json"
 
 
 class OrderProcessor:
@@ -22,6 +55,8 @@ class OrderProcessor:
         logger: logging.Logger,
         input_dir: str = "data/input",
         output_dir: str = "data/output",
+        snapshot_dir: Optional[str] = None,
+        metrics: Optional[Metrics] = None,
     ):
         """Initialize OrderProcessor.
 
@@ -29,8 +64,18 @@ class OrderProcessor:
             logger (logging.Logger): Logger instance
             input_dir (str, optional): Directory for input files
             output_dir (str, optional): Directory for output files
+            snapshot_dir (str, optional): Directory for columnar snapshots of
+                validated inputs
+            metrics (Metrics, optional): Stage instrumentation
         """
-        self.loader = DataLoader(logger=logger)
+        self.metrics = metrics or Metrics()
+        self.loader = DataLoader(
+            input_dir=input_dir,
+            logger=logger,
+            snapshot_dir=snapshot_dir,
+            metrics=self.metrics,
+            duplicates_dir=output_dir,
+        )
         self.input_dir = Path(input_dir)
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
@@ -58,8 +103,13 @@ class OrderProcessor:
             if orders_df.empty or barcodes_df.empty:
                 raise DataValidationError("Empty input data")
 
-            valid_orders_df = self._validate_orders_barcodes(orders_df, barcodes_df)
-            result = self._merge_orders_barcodes(valid_orders_df, barcodes_df)
+            with self.metrics.stage("validate_orders_barcodes", rows=len(orders_df)):
+                valid_orders_df = self._validate_orders_barcodes(
+                    orders_df, barcodes_df, self.loader.barcode_index.orders
+                )
+            with self.metrics.stage("merge_orders_barcodes") as stage:
+                result = self._merge_orders_barcodes(valid_orders_df, barcodes_df)
+                stage.rows = len(result)
 
             if result.empty:
                 raise DataValidationError("No valid orders found after processing")
@@ -74,14 +124,240 @@ class OrderProcessor:
         except Exception as e:
             raise DataProcessingError(f"Error processing data: {str(e)}")
 
+    def process_dataset(self) -> ProcessedDataset:
+        """Process orders and barcodes into the compact dataset.
+
+        Validates like :meth:`process` but builds the integer arrays of
+        :class:`ProcessedDataset` directly instead of per-order lists.
+
+        Returns:
+            ProcessedDataset: Processed orders and unused barcodes
+
+        Raises:
+            FileOperationError: If input files not found or file operations fail
+            DataValidationError: If data validation fails
+            DataProcessingError: For processing errors
+        """
+        try:
+            self.logger.info("Loading data files...")
+            orders_df = self.loader.load_orders()
+            barcodes_df = self.loader.load_barcodes()
+
+            if orders_df.empty or barcodes_df.empty:
+                raise DataValidationError("Empty input data")
+
+            with self.metrics.stage("validate_orders_barcodes", rows=len(orders_df)):
+                valid_orders_df = self._validate_orders_barcodes(
+                    orders_df, barcodes_df, self.loader.barcode_index.orders
+                )
+            with self.metrics.stage("build_dataset") as stage:
+                dataset = ProcessedDataset.from_inputs(valid_orders_df, barcodes_df)
+                stage.rows = len(dataset)
+
+            if not len(dataset):
+                raise DataValidationError("No valid orders found after processing")
+
+            return dataset
+
+        except FileNotFoundError as e:
+            raise FileOperationError(f"Input file not found: {str(e)}")
+        except DataValidationError as e:
+            self.logger.error(f"Validation error: {str(e)}")
+            raise
+        except Exception as e:
+            raise DataProcessingError(f"Error processing data: {str(e)}")
+
+    def process_parallel(
+        self, workers: int, partition_size: int = DEFAULT_PARTITION_SIZE
+    ) -> pd.DataFrame:
+        """Process orders and barcodes on a pool of worker processes.
+
+        Orders and barcodes are hash-partitioned by ``order_id``; each worker
+        validates that the orders of its partition have barcodes and merges
+        them like :meth:`process`. The sorted partition results are merged by
+        ``(customer_id, order_id)`` into the same data :meth:`process` returns.
+
+        Args:
+            workers (int): Number of worker processes
+            partition_size (int): Target number of orders per partition
+
+        Returns:
+            pd.DataFrame: Processed data with columns customer_id, order_id
+                and barcode
+
+        Raises:
+            FileOperationError: If input files not found or file operations fail
+            DataValidationError: If data validation fails
+            DataProcessingError: For processing errors
+        """
+        try:
+            self.logger.info("Loading data files...")
+            orders_df = self.loader.load_orders()
+            barcodes_df = self.loader.load_barcodes()
+
+            if orders_df.empty or barcodes_df.empty:
+                raise DataValidationError("Empty input data")
+
+            num_partitions = max(workers, math.ceil(len(orders_df) / partition_size))
+            self.logger.info(
+                f"Processing {num_partitions} partitions on {workers} workers..."
+            )
+            with self.metrics.stage("partition_by_order", rows=len(orders_df)):
+                partitions = partition_by_order(orders_df, barcodes_df, num_partitions)
+            with self.metrics.stage("process_partitions", rows=len(orders_df)):
+                results = process_partitions(partitions, workers)
+
+            invalid_orders = sorted(
+                order_id for _, invalid in results for order_id in invalid
+            )
+            if invalid_orders:
+                self.logger.error(
+                    f"Found {len(invalid_orders)} orders without barcodes: "
+                    f"{invalid_orders}"
+                )
+
+            with self.metrics.stage("merge_partitions") as stage:
+                result = merge_sorted_partitions([part for part, _ in results])
+                stage.rows = len(result)
+
+            if result.empty:
+                raise DataValidationError("No valid orders found after processing")
+
+            return result
+
+        except FileNotFoundError as e:
+            raise FileOperationError(f"Input file not found: {str(e)}")
+        except DataValidationError as e:
+            self.logger.error(f"Validation error: {str(e)}")
+            raise
+        except Exception as e:
+            raise DataProcessingError(f"Error processing data: {str(e)}")
+
+    def process_streaming(
+        self,
+        memory_budget_mb: float = DEFAULT_MEMORY_BUDGET_MB,
+        output_path: Optional[Path] = None,
+    ) -> Path:
+        """Process orders and barcodes in bounded chunks and write the result.
+
+        Inputs are read in chunks, validated, and hash-partitioned by
+        ``order_id`` into spill files so that each partition fits the memory
+        budget. Each partition is merged like :meth:`process` and the sorted
+        partitions are k-way merged into the output CSV, which has the same
+        ``customer_id, order_id, barcode`` content as :meth:`save_results`.
+
+        Args:
+            memory_budget_mb (float): Memory budget for one chunk or partition
+            output_path (Path, optional): Output file, defaults to
+                ``processed_orders.csv`` in the output directory
+
+        Returns:
+            Path: Path of the written output file
+
+        Raises:
+            FileOperationError: If input files not found or file operations fail
+            DataValidationError: If data validation fails
+            DataProcessingError: For processing errors
+        """
+        output_path = Path(output_path or self.output_dir / "processed_orders.csv")
+        budget_bytes = int(memory_budget_mb * 1024 * 1024)
+        chunksize = chunk_rows(budget_bytes)
+
+        try:
+            num_partitions = estimate_partitions(
+                [
+                    self.loader.input_dir / "orders.csv",
+                    self.loader.input_dir / "barcodes.csv",
+                ],
+                budget_bytes,
+            )
+            self.logger.info(
+                f"Streaming data in chunks of {chunksize} rows "
+                f"over {num_partitions} partitions..."
+            )
+
+            with tempfile.TemporaryDirectory(dir=self.output_dir) as spill_dir:
+                spill_dir = Path(spill_dir)
+
+                # Barcodes arrive deduplicated across chunks, so they are
+                # partitioned by order_id straight away
+                by_order = PartitionSpiller(spill_dir, "sold", num_partitions)
+                offset = 0
+                with self.metrics.stage("partition_barcodes") as stage:
+                    for chunk in self.loader.iter_barcodes(chunksize):
+                        chunk = chunk.assign(row=range(offset, offset + len(chunk)))
+                        offset += len(chunk)
+                        by_order.write(chunk, "order_id")
+                    stage.rows = offset
+
+                orders = PartitionSpiller(spill_dir, "orders", num_partitions)
+                with self.metrics.stage("partition_orders") as stage:
+                    order_rows = 0
+                    for chunk in self.loader.iter_orders(chunksize):
+                        orders.write(chunk, "order_id")
+                        order_rows += len(chunk)
+                    stage.rows = order_rows
+
+                # Merge each partition into a sorted run
+                runs = []
+                for partition in range(num_partitions):
+                    with self.metrics.stage("merge_partition") as stage:
+                        orders_df = orders_schema.validate(
+                            orders.read(partition, ["order_id", "customer_id"])
+                        )
+                        barcodes_df = (
+                            by_order.read(partition, ["barcode", "order_id", "row"])
+                            .sort_values("row")
+                            .drop(columns="row")
+                        )
+                        if orders_df.empty or barcodes_df.empty:
+                            continue
+
+                        valid_orders_df = self._validate_orders_barcodes(
+                            orders_df, barcodes_df
+                        )
+                        result = self._merge_orders_barcodes(
+                            valid_orders_df, barcodes_df
+                        )
+                        run_path = spill_dir / f"run_{partition}.csv"
+                        result[["customer_id", "order_id", "barcode"]].to_csv(
+                            run_path, index=False
+                        )
+                        runs.append(run_path)
+                        stage.rows = len(result)
+
+                with self.metrics.stage("merge_runs") as stage:
+                    rows = merge_sorted_runs(runs, output_path)
+                    stage.rows = rows
+
+            if rows == 0:
+                raise DataValidationError("No valid orders found after processing")
+
+            self.logger.info(f"Streamed {rows} orders to {output_path}")
+            return output_path
+
+        except FileNotFoundError as e:
+            raise FileOperationError(f"Input file not found: {str(e)}")
+        except DataValidationError as e:
+            self.logger.error(f"Validation error: {str(e)}")
+            raise
+        except Exception as e:
+            raise DataProcessingError(f"Error processing data: {str(e)}")
+
     def _validate_orders_barcodes(
-        self, orders_df: pd.DataFrame, barcodes_df: pd.DataFrame
+        self,
+        orders_df: pd.DataFrame,
+        barcodes_df: pd.DataFrame,
+        orders_with_barcodes: Optional[RoaringBitmap] = None,
     ) -> pd.DataFrame:
         """Validate all orders have associated barcodes.
 
         Args:
             orders_df (pd.DataFrame): Orders data
             barcodes_df (pd.DataFrame): Barcodes data
+            orders_with_barcodes (RoaringBitmap, optional): Bitmap of the order
+                IDs in ``barcodes_df``, e.g. from the loader's barcode index;
+                built from ``barcodes_df`` when not given
 
         Returns:
             pd.DataFrame: Valid orders data with invalid orders removed
@@ -90,20 +366,21 @@ class OrderProcessor:
             DataValidationError: If validation fails
         """
         try:
-            orders_with_barcodes = barcodes_df["order_id"].unique()
-            orders_without_barcodes = orders_df[
-                ~orders_df["order_id"].isin(orders_with_barcodes)
-            ]
+            if orders_with_barcodes is None:
+                orders_with_barcodes = RoaringBitmap.from_values(
+                    barcodes_df["order_id"].dropna().to_numpy(dtype=np.int64)
+                )
+            has_barcodes = orders_with_barcodes.contains(
+                orders_df["order_id"].to_numpy(dtype=np.int64)
+            )
 
-            if not orders_without_barcodes.empty:
-                invalid_orders = orders_without_barcodes["order_id"].tolist()
+            if not has_barcodes.all():
+                invalid_orders = orders_df.loc[~has_barcodes, "order_id"].tolist()
                 self.logger.error(
-                    f"Found {len(orders_without_barcodes)} orders without barcodes: "
+                    f"Found {len(invalid_orders)} orders without barcodes: "
                     f"{invalid_orders}"
                 )
-                return orders_df[
-                    ~orders_df["order_id"].isin(orders_without_barcodes["order_id"])
-                ]
+                return orders_df[has_barcodes]
             return orders_df
 
         except Exception as e:
@@ -134,12 +411,12 @@ class OrderProcessor:
             raise DataProcessingError(f"Error merging orders and barcodes: {str(e)}")
 
     def get_top_customers(
-        self, df: pd.DataFrame, limit: int = 5
+        self, data: Union[pd.DataFrame, ProcessedDataset], limit: int = 5
     ) -> List[Tuple[int, int]]:
         """Get customers who purchased most tickets.
 
         Args:
-            df (pd.DataFrame): Processed orders data
+            data (Union[pd.DataFrame, ProcessedDataset]): Processed orders data
             limit (int): Number of top customers to return
 
         Returns:
@@ -150,18 +427,27 @@ class OrderProcessor:
         """
         try:
             self.logger.info(f"Calculating top {limit} customers...")
-            customer_tickets = (
-                df.explode("barcode").groupby("customer_id").size().nlargest(limit)
+            if isinstance(data, ProcessedDataset):
+                return data.top_customers(limit)
+            customer_ids, ticket_counts = rank_customers(*customer_ticket_counts(data))
+            return list(
+                zip(customer_ids[:limit].tolist(), ticket_counts[:limit].tolist())
             )
-            return list(customer_tickets.items())
         except Exception as e:
             raise DataProcessingError(f"Error calculating top customers: {str(e)}")
 
-    def get_unused_barcodes(self, df: pd.DataFrame) -> Tuple[int, pd.DataFrame]:
+    def get_unused_barcodes(
+        self, data: Union[pd.DataFrame, ProcessedDataset]
+    ) -> Tuple[int, pd.DataFrame]:
         """Get count and details of unused barcodes.
 
+        A processed frame does not carry the unused barcodes, so they come
+        from the barcode index this processor built while loading the
+        barcodes for it. Long-lived callers should keep a
+        :class:`BarcodeInventory` instead, which is built once per input.
+
         Args:
-            df (pd.DataFrame): Processed data
+            data (Union[pd.DataFrame, ProcessedDataset]): Processed data
 
         Returns:
             Tuple[int, pd.DataFrame]: Count of unused barcodes and their details
@@ -170,33 +456,76 @@ class OrderProcessor:
             DataProcessingError: If processing fails
         """
         try:
-            barcodes_df = self.loader.load_barcodes()
-            unused_barcodes = barcodes_df[barcodes_df["order_id"].isna()]
-            return unused_barcodes.shape[0], unused_barcodes
+            if isinstance(data, ProcessedDataset):
+                unused = data.unused_barcodes
+            else:
+                self.loader.load_barcodes()
+                unused = self.loader.barcode_index.unused.to_array()
+            return len(unused), pd.DataFrame(
+                {
+                    "barcode": unused,
+                    "order_id": pd.array([None] * len(unused), dtype="Int64"),
+                }
+            )
         except Exception as e:
             raise DataProcessingError(f"Error processing unused barcodes: {str(e)}")
 
-    def save_results(self, df: pd.DataFrame) -> None:
+    def save_results(self, data: Union[pd.DataFrame, ProcessedDataset]) -> None:
         """Save processed orders to CSV.
 
+        The barcode index of the loaded barcodes, or of the processed
+        dataset when no barcodes were loaded, is persisted next to the CSV as
+        ``barcode_index.npz``.
+
         Args:
-            df (pd.DataFrame): Processed data to save
+            data (Union[pd.DataFrame, ProcessedDataset]): Processed data to save
 
         Raises:
             FileOperationError: If saving fails
         """
         try:
             self.logger.info("Saving processed data...")
-            output_df = df[["customer_id", "order_id", "barcode"]]
             output_path = self.output_dir / "processed_orders.csv"
-            output_df.to_csv(output_path, index=False)
+            with self.metrics.stage("save_results", rows=len(data)):
+                if isinstance(data, ProcessedDataset):
+                    data.to_csv(output_path)
+                else:
+                    output_df = data[["customer_id", "order_id", "barcode"]]
+                    output_df.to_csv(output_path, index=False)
+                barcode_index = self.loader.barcode_index
+                if barcode_index is None and isinstance(data, ProcessedDataset):
+                    barcode_index = BarcodeIndex.from_dataset(data)
+                if barcode_index is not None:
+                    barcode_index.save(self.output_dir / BARCODE_INDEX_FILE)
             self.logger.info(f"Results saved to {output_path}")
         except Exception as e:
             raise FileOperationError(f"Error saving results to CSV: {str(e)}")
 
+    def save_run_report(self, run) -> Optional[Path]:
+        """Save the per-stage metrics of a run next to the processed orders.
+
+        Args:
+            run (Run): Run returned by ``self.metrics.run()``
+
+        Returns:
+            Optional[Path]: Path of the report, or None if metrics are disabled
+        """
+        if not self.metrics.enabled:
+            return None
+        try:
+            report_path = self.output_dir / RUN_REPORT_FILE
+            run.write(report_path)
+            self.logger.info(f"Run report saved to {report_path}")
+            return report_path
+        except Exception as e:
+            raise FileOperationError(f"Error saving run report: {str(e)}")
+
     def save_to_database(self, result_df: pd.DataFrame) -> None:
         """Save processed results to database.
 
+        Orders are upserted by their source order ID, so saving the same
+        data again does not add rows.
+
         Args:
             result_df (pd.DataFrame): Processed data to save
 
@@ -207,17 +536,32 @@ class OrderProcessor:
             self.logger.info("Saving data to database...")
 
             # Use transaction for atomic operations
-            with db.session.begin():
+            ticket_deltas = Counter()
+            with self.metrics.stage(
+                "save_to_database", rows=len(result_df)
+            ), db.session.begin():
                 for _, row in result_df.iterrows():
                     # Check if customer exists
-                    customer = Customer.query.get(row["customer_id"])
+                    customer = db.session.get(Customer, int(row["customer_id"]))
                     if not customer:
                         customer = Customer(id=row["customer_id"])
                         db.session.add(customer)
 
-                    # Create order
-                    order = Order(customer_id=customer.id)
-                    db.session.add(order)
+                    # Create the order, or move it if its customer changed
+                    order = Order.query.filter_by(
+                        source_order_id=int(row["order_id"])
+                    ).first()
+                    if order is None:
+                        order = Order(
+                            customer_id=customer.id,
+                            source_order_id=int(row["order_id"]),
+                        )
+                        db.session.add(order)
+                    elif order.customer_id != customer.id:
+                        tickets = order.barcodes.count()
+                        ticket_deltas[int(order.customer_id)] -= tickets
+                        ticket_deltas[int(customer.id)] += tickets
+                        order.customer_id = customer.id
 
                     # Flush to get order ID
                     db.session.flush()
@@ -225,20 +569,422 @@ class OrderProcessor:
                     # Create barcodes
                     for barcode_value in row["barcode"]:
                         existing_barcode = Barcode.query.filter_by(
-                            barcode_value=str(barcode_value)
+                            barcode_value=int(barcode_value)
                         ).first()
 
                         if not existing_barcode:
                             barcode = Barcode(
-                                barcode_value=str(barcode_value), order_id=order.id
+                                barcode_value=int(barcode_value), order_id=order.id
                             )
                             db.session.add(barcode)
+                            ticket_deltas[int(customer.id)] += 1
                         else:
                             self.logger.warning(
                                 f"Barcode {barcode_value} already exists, skipping..."
                             )
 
+                db.session.flush()
+                self._increment_ticket_stats(ticket_deltas, DEFAULT_DB_BATCH_SIZE)
+
+        except SQLAlchemyError as e:
+            raise DatabaseError(f"Database operation failed: {str(e)}")
+        except Exception as e:
+            raise DatabaseError(f"Unexpected error during database operation: {str(e)}")
+
+    def bulk_save_to_database(
+        self,
+        result_df: Union[pd.DataFrame, ProcessedDataset],
+        batch_size: int = DEFAULT_DB_BATCH_SIZE,
+        unused_barcodes: Optional[Iterable[int]] = None,
+    ) -> Dict[str, Dict[str, int]]:
+        """Save processed results to database using set-based bulk operations.
+
+        Existing customers, orders (by source order ID) and barcodes are
+        prefetched with set queries, and customers, orders and barcodes are
+        written with multi-row ``INSERT ... ON CONFLICT DO NOTHING`` statements
+        in batches. Order IDs and inserted barcodes are taken from
+        ``RETURNING`` instead of flushing once per row, so barcodes stored
+        concurrently since the prefetch count as skipped. Orders are upserted
+        by their unique source order ID: new barcodes of an already stored
+        order are attached to it and stored orders whose customer changed are
+        updated; both count as updated orders. All other stored orders are
+        skipped, so re-ingesting unchanged data writes nothing.
+
+        Unused barcodes are stored without an order, so the database can
+        answer the analytics queries on its own; a stored unused barcode that
+        has been sold since is assigned to its order. The ticket counts in
+        ``customer_ticket_stats`` are incremented by the newly sold barcodes
+        of each customer in the same transaction.
+
+        Args:
+            result_df (Union[pd.DataFrame, ProcessedDataset]): Processed data
+                to save
+            batch_size (int): Number of rows per INSERT and prefetch query
+            unused_barcodes (Iterable[int], optional): Barcodes without an
+                order, defaults to those of a ProcessedDataset
+
+        Returns:
+            Dict[str, Dict[str, int]]: Rows inserted, updated and skipped per
+                table
+
+        Raises:
+            DatabaseError: If database operations fail
+        """
+        try:
+            self.logger.info("Bulk saving data to database...")
+            stats = {
+                table: {"inserted": 0, "updated": 0, "skipped": 0}
+                for table in ("customers", "orders", "barcodes")
+            }
+            orders = list(self._iter_orders(result_df))
+            if unused_barcodes is None and isinstance(result_df, ProcessedDataset):
+                unused_barcodes = result_df.unused_barcodes.tolist()
+            unused_values = [int(barcode) for barcode in unused_barcodes or []]
+            customer_ids = list(dict.fromkeys(order[0] for order in orders))
+            barcode_values = [
+                int(barcode) for _, _, barcodes in orders for barcode in barcodes
+            ]
+
+            with self.metrics.stage(
+                "save_to_database", rows=len(result_df)
+            ), db.session.begin():
+                # Customers
+                existing_customers = self._fetch_existing(
+                    Customer.id, customer_ids, batch_size
+                )
+                new_customers = [
+                    {"id": customer_id}
+                    for customer_id in customer_ids
+                    if customer_id not in existing_customers
+                ]
+                self._execute_in_batches(
+                    self._insert_ignore(Customer), new_customers, batch_size
+                )
+                stats["customers"]["inserted"] = len(new_customers)
+                stats["customers"]["skipped"] = len(existing_customers)
+
+                # Orders: keep only barcodes not stored yet or stored unused
+                existing_barcodes = self._fetch_existing_barcodes(
+                    barcode_values + unused_values, batch_size
+                )
+                unassigned = {
+                    value
+                    for value, order_id in existing_barcodes.items()
+                    if order_id is None
+                }
+                existing_orders = self._fetch_existing_orders(
+                    [order[1] for order in orders], batch_size
+                )
+                pending_orders = []
+                barcode_rows = []
+                moved_orders = []
+                ticket_deltas = Counter()
+                for customer_id, source_order_id, barcodes in orders:
+                    new_barcodes = []
+                    for barcode in barcodes:
+                        value = int(barcode)
+                        if existing_barcodes.get(value) is not None:
+                            stats["barcodes"]["skipped"] += 1
+                        else:
+                            existing_barcodes[value] = source_order_id
+                            new_barcodes.append(value)
+                    ticket_deltas[int(customer_id)] += len(new_barcodes)
+
+                    order_id, stored_customer_id = existing_orders.get(
+                        int(source_order_id), (None, None)
+                    )
+                    if order_id is None and new_barcodes:
+                        pending_orders.append(
+                            (int(customer_id), int(source_order_id), new_barcodes)
+                        )
+                        continue
+
+                    if order_id is not None and stored_customer_id != customer_id:
+                        moved_orders.append(
+                            (order_id, stored_customer_id, int(customer_id))
+                        )
+                    if order_id is not None and (
+                        new_barcodes or stored_customer_id != customer_id
+                    ):
+                        stats["orders"]["updated"] += 1
+                    else:
+                        stats["orders"]["skipped"] += 1
+                    barcode_rows.extend(
+                        {"barcode_value": value, "order_id": order_id}
+                        for value in new_barcodes
+                    )
+
+                # Insert orders batch-wise and attach barcodes to returned IDs
+                for start in range(0, len(pending_orders), batch_size):
+                    batch = pending_orders[start : start + batch_size]
+                    order_ids = db.session.scalars(
+                        insert(Order).returning(Order.id, sort_by_parameter_order=True),
+                        [
+                            {"customer_id": customer_id, "source_order_id": source_id}
+                            for customer_id, source_id, _ in batch
+                        ],
+                    ).all()
+                    barcode_rows.extend(
+                        {"barcode_value": value, "order_id": order_id}
+                        for order_id, (_, _, values) in zip(order_ids, batch)
+                        for value in values
+                    )
+                    stats["orders"]["inserted"] += len(batch)
+
+                # Orders whose customer changed take their stored tickets along
+                stored_tickets = self._count_order_barcodes(
+                    [order_id for order_id, _, _ in moved_orders], batch_size
+                )
+                for order_id, old_customer_id, new_customer_id in moved_orders:
+                    ticket_deltas[old_customer_id] -= stored_tickets.get(order_id, 0)
+                    ticket_deltas[new_customer_id] += stored_tickets.get(order_id, 0)
+                self._execute_in_batches(
+                    update(Order.__table__)
+                    .where(Order.__table__.c.id == bindparam("order_id"))
+                    .values(customer_id=bindparam("new_customer_id")),
+                    [
+                        {"order_id": order_id, "new_customer_id": customer_id}
+                        for order_id, _, customer_id in moved_orders
+                    ],
+                    batch_size,
+                )
+
+                # Sold barcodes stored as unused are assigned, the rest inserted
+                assigned_rows = [
+                    {"value": row["barcode_value"], "new_order_id": row["order_id"]}
+                    for row in barcode_rows
+                    if row["barcode_value"] in unassigned
+                ]
+                barcode_rows = [
+                    row
+                    for row in barcode_rows
+                    if row["barcode_value"] not in unassigned
+                ]
+                barcode_rows.extend(
+                    {"barcode_value": value, "order_id": None}
+                    for value in dict.fromkeys(unused_values)
+                    if value not in existing_barcodes
+                )
+                stats["barcodes"]["skipped"] += sum(
+                    value in existing_barcodes for value in unused_values
+                )
+
+                # Rows stored concurrently since the lookup are skipped
+                inserted = self._insert_ignore(Barcode).returning(Barcode.barcode_value)
+                for start in range(0, len(barcode_rows), batch_size):
+                    stats["barcodes"]["inserted"] += len(
+                        db.session.scalars(
+                            inserted, barcode_rows[start : start + batch_size]
+                        ).all()
+                    )
+                stats["barcodes"]["skipped"] += (
+                    len(barcode_rows) - stats["barcodes"]["inserted"]
+                )
+                self._execute_in_batches(
+                    update(Barcode.__table__)
+                    .where(Barcode.__table__.c.barcode_value == bindparam("value"))
+                    .values(order_id=bindparam("new_order_id")),
+                    assigned_rows,
+                    batch_size,
+                )
+                stats["barcodes"]["updated"] = len(assigned_rows)
+
+                self._increment_ticket_stats(ticket_deltas, batch_size)
+
+            self.logger.info(f"Bulk database save finished: {stats}")
+            return stats
+
         except SQLAlchemyError as e:
             raise DatabaseError(f"Database operation failed: {str(e)}")
         except Exception as e:
             raise DatabaseError(f"Unexpected error during database operation: {str(e)}")
+
+    @staticmethod
+    def _iter_orders(
+        data: Union[pd.DataFrame, ProcessedDataset]
+    ) -> Iterator[Tuple[int, int, List[int]]]:
+        """Yield (customer_id, order_id, barcodes) of processed orders."""
+        if isinstance(data, ProcessedDataset):
+            return data.iter_orders()
+        return zip(
+            data["customer_id"].astype(int).tolist(),
+            data["order_id"].astype(int).tolist(),
+            data["barcode"].tolist(),
+        )
+
+    def _fetch_existing(self, column, values: List, batch_size: int) -> Set:
+        """Return the subset of values already stored in the given column.
+
+        Args:
+            column: Model column to look up
+            values (List): Candidate values
+            batch_size (int): Maximum number of values per IN clause
+
+        Returns:
+            Set: Values that already exist in the database
+        """
+        existing = set()
+        for start in range(0, len(values), batch_size):
+            batch = values[start : start + batch_size]
+            existing.update(db.session.scalars(select(column).where(column.in_(batch))))
+        return existing
+
+    def _fetch_existing_barcodes(
+        self, values: List[int], batch_size: int
+    ) -> Dict[int, Optional[int]]:
+        """Map already stored barcode values to their order IDs.
+
+        Args:
+            values (List[int]): Barcode values to look up
+            batch_size (int): Maximum number of values per IN clause
+
+        Returns:
+            Dict[int, Optional[int]]: Order ID per stored barcode, None for
+                unused barcodes
+        """
+        existing = {}
+        for start in range(0, len(values), batch_size):
+            batch = values[start : start + batch_size]
+            existing.update(
+                db.session.execute(
+                    select(Barcode.barcode_value, Barcode.order_id).where(
+                        Barcode.barcode_value.in_(batch)
+                    )
+                ).all()
+            )
+        return existing
+
+    def _fetch_existing_orders(
+        self, source_order_ids: List[int], batch_size: int
+    ) -> Dict[int, Tuple[int, int]]:
+        """Map already stored source order IDs to their stored orders.
+
+        Args:
+            source_order_ids (List[int]): Source order IDs to look up
+            batch_size (int): Maximum number of values per IN clause
+
+        Returns:
+            Dict[int, Tuple[int, int]]: Database order ID and customer ID per
+                stored source order ID
+        """
+        existing = {}
+        for start in range(0, len(source_order_ids), batch_size):
+            batch = source_order_ids[start : start + batch_size]
+            existing.update(
+                (source_order_id, (order_id, customer_id))
+                for source_order_id, order_id, customer_id in db.session.execute(
+                    select(Order.source_order_id, Order.id, Order.customer_id).where(
+                        Order.source_order_id.in_(batch)
+                    )
+                )
+            )
+        return existing
+
+    def _count_order_barcodes(
+        self, order_ids: List[int], batch_size: int
+    ) -> Dict[int, int]:
+        """Count the stored barcodes of database orders.
+
+        Args:
+            order_ids (List[int]): Database order IDs
+            batch_size (int): Maximum number of values per IN clause
+
+        Returns:
+            Dict[int, int]: Barcode count per order with barcodes
+        """
+        counts = {}
+        for start in range(0, len(order_ids), batch_size):
+            batch = order_ids[start : start + batch_size]
+            counts.update(
+                db.session.execute(
+                    select(Barcode.order_id, func.count(Barcode.id))
+                    .where(Barcode.order_id.in_(batch))
+                    .group_by(Barcode.order_id)
+                ).all()
+            )
+        return counts
+
+    def _increment_ticket_stats(self, deltas: Dict[int, int], batch_size: int) -> None:
+        """Add newly sold tickets to the per-customer ticket counts.
+
+        Uses ``INSERT ... ON CONFLICT DO UPDATE`` where supported, so each
+        customer's row is created or incremented in one statement.
+
+        Args:
+            deltas (Dict[int, int]): New tickets per customer ID
+            batch_size (int): Number of customers per statement
+        """
+        now = datetime.now(timezone.utc)
+        rows = [
+            {"customer_id": customer_id, "ticket_count": count, "updated_at": now}
+            for customer_id, count in deltas.items()
+            if count
+        ]
+        table = CustomerTicketStats.__table__
+        dialect = db.session.get_bind().dialect.name
+        if dialect in ("postgresql", "sqlite"):
+            module = postgresql if dialect == "postgresql" else sqlite
+            statement = module.insert(table)
+            statement = statement.on_conflict_do_update(
+                index_elements=[table.c.customer_id],
+                set_={
+                    "ticket_count": table.c.ticket_count
+                    + statement.excluded.ticket_count,
+                    "updated_at": statement.excluded.updated_at,
+                },
+            )
+            self._execute_in_batches(statement, rows, batch_size)
+            return
+
+        existing = self._fetch_existing(
+            CustomerTicketStats.customer_id,
+            [row["customer_id"] for row in rows],
+            batch_size,
+        )
+        self._execute_in_batches(
+            insert(table),
+            [row for row in rows if row["customer_id"] not in existing],
+            batch_size,
+        )
+        self._execute_in_batches(
+            update(table)
+            .where(table.c.customer_id == bindparam("id"))
+            .values(
+                ticket_count=table.c.ticket_count + bindparam("delta"),
+                updated_at=bindparam("now"),
+            ),
+            [
+                {"id": row["customer_id"], "delta": row["ticket_count"], "now": now}
+                for row in rows
+                if row["customer_id"] in existing
+            ],
+            batch_size,
+        )
+
+    def _insert_ignore(self, model):
+        """Build an INSERT statement that skips rows violating unique keys.
+
+        Args:
+            model: Model class to insert into
+
+        Returns:
+            Insert: Dialect specific ``ON CONFLICT DO NOTHING`` insert when
+                supported, plain insert otherwise
+        """
+        dialect = db.session.get_bind().dialect.name
+        if dialect == "postgresql":
+            return postgresql.insert(model.__table__).on_conflict_do_nothing()
+        if dialect == "sqlite":
+            return sqlite.insert(model.__table__).on_conflict_do_nothing()
+        return insert(model.__table__)
+
+    def _execute_in_batches(self, statement, rows: List[Dict], batch_size: int) -> None:
+        """Execute a multi-row statement in batches of parameter sets.
+
+        Args:
+            statement: Statement to execute
+            rows (List[Dict]): Parameter sets
+            batch_size (int): Number of parameter sets per execution
+        """
+        for start in range(0, len(rows), batch_size):
+            db.session.execute(statement, rows[start : start + batch_size])
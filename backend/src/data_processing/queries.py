@@ -0,0 +1,138 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from app import db
+from app.models.models import (
+    Barcode,
+    BarcodeReservation,
+    CustomerTicketStats,
+    Order,
+)
+from sqlalchemy import delete, exists, func, insert, select
+
+# Analytics query backends selectable with the QUERY_BACKEND setting
+MEMORY_BACKEND = "memory"
+DATABASE_BACKEND = "database"
+
+
+def _reserved(barcode_value):
+    """Build the condition that a barcode is allocated to a new order."""
+    return exists().where(BarcodeReservation.barcode_value == barcode_value)
+
+
+class DatabaseQueries:
+    """Analytics queries answered by the database instead of the CSV inputs.
+
+    Serves the same results as :class:`ProcessedDataset` from the tables
+    written by :meth:`OrderProcessor.bulk_save_to_database`: top customers are
+    the first rows of the ticket count index of ``customer_ticket_stats``,
+    which ingestion maintains, unused barcodes are paged by keyset
+    (``barcode_value > :after``) on the partial index of unused barcodes,
+    leaving out the ones reserved in ``barcode_reservations``, and customer
+    orders are read through the ``customer_id`` index. API replicas
+    in this mode need neither the CSV files nor the memory to hold them.
+    """
+
+    def top_customers(self, limit: int = 5) -> List[Tuple[int, int]]:
+        """Get customers who purchased most tickets.
+
+        Args:
+            limit (int): Number of top customers to return
+
+        Returns:
+            List[Tuple[int, int]]: List of (customer_id, ticket_count) tuples,
+                ties broken by ascending customer ID
+        """
+        statement = (
+            select(CustomerTicketStats.customer_id, CustomerTicketStats.ticket_count)
+            .where(CustomerTicketStats.ticket_count > 0)
+            .order_by(
+                CustomerTicketStats.ticket_count.desc(),
+                CustomerTicketStats.customer_id,
+            )
+            .limit(limit)
+        )
+        return [tuple(row) for row in db.session.execute(statement)]
+
+    def rebuild_ticket_stats(self) -> int:
+        """Recompute ``customer_ticket_stats`` from the barcodes table.
+
+        Ingestion keeps the table up to date; this repairs it after barcodes
+        were changed by other means.
+
+        Returns:
+            int: Number of customers with tickets
+        """
+        ticket_count = func.count(Barcode.id)
+        counts = db.session.execute(
+            select(Order.customer_id, ticket_count)
+            .join(Barcode, Barcode.order_id == Order.id)
+            .group_by(Order.customer_id)
+        ).all()
+        db.session.execute(delete(CustomerTicketStats))
+        if counts:
+            db.session.execute(
+                insert(CustomerTicketStats),
+                [
+                    {"customer_id": customer_id, "ticket_count": count}
+                    for customer_id, count in counts
+                ],
+            )
+        db.session.commit()
+        return len(counts)
+
+    def unused_count(self) -> int:
+        """Return the number of unreserved barcodes without an order."""
+        return db.session.scalar(
+            select(func.count(Barcode.id)).where(
+                Barcode.order_id.is_(None), ~_reserved(Barcode.barcode_value)
+            )
+        )
+
+    def unused_page(
+        self, after: Optional[int] = None, limit: Optional[int] = None
+    ) -> np.ndarray:
+        """Return the unreserved unused barcodes following a cursor.
+
+        Args:
+            after (int, optional): Last barcode already returned
+            limit (int, optional): Maximum number of barcodes, all when not set
+
+        Returns:
+            np.ndarray: Unused barcodes in ascending order
+        """
+        statement = (
+            select(Barcode.barcode_value)
+            .where(Barcode.order_id.is_(None), ~_reserved(Barcode.barcode_value))
+            .order_by(Barcode.barcode_value)
+        )
+        if after is not None:
+            statement = statement.where(Barcode.barcode_value > after)
+        if limit is not None:
+            statement = statement.limit(limit)
+        return np.array(db.session.scalars(statement).all(), dtype=np.int64)
+
+    def customer_orders(self, customer_id: int) -> List[Dict[str, Any]]:
+        """Return the orders of one customer with their barcodes.
+
+        Args:
+            customer_id (int): Customer identifier
+
+        Returns:
+            List[Dict[str, Any]]: Records with customer_id, order_id and
+                barcodes, ordered by order_id; empty if there are none
+        """
+        statement = (
+            select(Order.source_order_id, Barcode.barcode_value)
+            .join(Barcode, Barcode.order_id == Order.id)
+            .where(Order.customer_id == customer_id)
+            .order_by(Order.source_order_id, Barcode.id)
+        )
+        records: List[Dict[str, Any]] = []
+        for order_id, barcode in db.session.execute(statement):
+            if not records or records[-1]["order_id"] != order_id:
+                records.append(
+                    {"customer_id": customer_id, "order_id": order_id, "barcodes": []}
+                )
+            records[-1]["barcodes"].append(barcode)
+        return records
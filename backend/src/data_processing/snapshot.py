@@ -0,0 +1,171 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import IO, Callable, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+# Read size used when hashing source files
+HASH_BLOCK_SIZE = 1024 * 1024
+
+# Bumped when the stored layout or column dtypes change
+SNAPSHOT_VERSION = 2
+
+
+def file_digest(path: Path) -> str:
+    """Compute the SHA-256 content hash of a file.
+
+    Args:
+        path (Path): File to hash
+
+    Returns:
+        str: Hex digest of the file contents
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _write_atomically(path: Path, write: Callable[[IO[bytes]], None]) -> None:
+    """Write a file through a temporary file of its own, then rename it.
+
+    Concurrent writers each get a uniquely named temporary file, so readers
+    only ever see complete files.
+
+    Args:
+        path (Path): File to write
+        write (Callable[[IO[bytes]], None]): Writes the contents
+    """
+    with tempfile.NamedTemporaryFile(
+        dir=path.parent, prefix=f".{path.name}.", suffix=".tmp", delete=False
+    ) as f:
+        tmp_path = f.name
+        try:
+            write(f)
+        except BaseException:
+            f.close()
+            os.unlink(tmp_path)
+            raise
+    os.replace(tmp_path, path)
+
+
+class SnapshotCache:
+    """Typed columnar cache of validated input frames.
+
+    Each cached frame is stored as one ``.npy`` file per column plus a
+    ``meta.json`` describing the source file it was built from. Nullable
+    integer columns are stored as values plus a ``.mask.npy`` null mask.
+    Cached columns are memory-mapped on load instead of re-parsing the CSV.
+    Snapshots live in one directory per resolved source path, so inputs with
+    the same name in different directories do not share one.
+    """
+
+    def __init__(self, cache_dir: str, logger: Optional[logging.Logger] = None):
+        """Initialize SnapshotCache.
+
+        Args:
+            cache_dir (str): Directory holding the snapshots
+            logger (logging.Logger, optional): Logger instance
+        """
+        self.cache_dir = Path(cache_dir)
+        self.logger = logger or logging.getLogger(__name__)
+
+    def _snapshot_dir(self, source: Path) -> Path:
+        resolved = str(Path(source).resolve())
+        digest = hashlib.sha256(resolved.encode()).hexdigest()[:16]
+        return self.cache_dir / f"{Path(source).stem}-{digest}"
+
+    def load(self, source: Path) -> Optional[pd.DataFrame]:
+        """Load the snapshot of a source file if it is still valid.
+
+        The snapshot is valid when the source size and mtime match. When only
+        the mtime differs, the content hash decides and the stored mtime is
+        refreshed on a match.
+
+        Args:
+            source (Path): Source CSV file
+
+        Returns:
+            Optional[pd.DataFrame]: Cached frame, or None on a cache miss
+
+        Raises:
+            FileNotFoundError: If the source file does not exist
+        """
+        stat = Path(source).stat()
+        snapshot_dir = self._snapshot_dir(source)
+        meta_path = snapshot_dir / "meta.json"
+        if not meta_path.exists():
+            return None
+
+        meta = json.loads(meta_path.read_text())
+        if meta.get("version") != SNAPSHOT_VERSION:
+            return None
+        fingerprint = meta["source"]
+        if fingerprint["size"] != stat.st_size:
+            return None
+        if fingerprint["mtime_ns"] != stat.st_mtime_ns:
+            if fingerprint["sha256"] != file_digest(source):
+                return None
+            fingerprint["mtime_ns"] = stat.st_mtime_ns
+            self._write_meta(meta_path, meta)
+
+        columns = {}
+        for name, dtype in meta["columns"].items():
+            values = np.load(snapshot_dir / f"{name}.npy", mmap_mode="r")
+            if dtype == "Int64":
+                mask = np.load(snapshot_dir / f"{name}.mask.npy", mmap_mode="r")
+                values = pd.arrays.IntegerArray(values, mask)
+            columns[name] = values
+        self.logger.info(f"Loaded snapshot of {Path(source).name} from {snapshot_dir}")
+        return pd.DataFrame(columns, copy=False)
+
+    def save(self, source: Path, df: pd.DataFrame) -> None:
+        """Write a validated frame as the snapshot of a source file.
+
+        Args:
+            source (Path): Source CSV file the frame was built from
+            df (pd.DataFrame): Validated frame to cache
+        """
+        stat = Path(source).stat()
+        snapshot_dir = self._snapshot_dir(source)
+        snapshot_dir.mkdir(parents=True, exist_ok=True)
+
+        # Drop the metadata first so a partial write is never read back
+        meta_path = snapshot_dir / "meta.json"
+        meta_path.unlink(missing_ok=True)
+
+        columns: Dict[str, str] = {}
+        for name in df.columns:
+            column = df[name]
+            arrays = {name: column.to_numpy()}
+            if isinstance(column.dtype, pd.Int64Dtype):
+                arrays = {
+                    name: column.to_numpy(dtype=np.int64, na_value=0),
+                    f"{name}.mask": column.isna().to_numpy(),
+                }
+            for file_name, values in arrays.items():
+                _write_atomically(
+                    snapshot_dir / f"{file_name}.npy",
+                    lambda f, values=values: np.save(f, values),
+                )
+            columns[name] = str(column.dtype)
+
+        meta = {
+            "version": SNAPSHOT_VERSION,
+            "source": {
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+                "sha256": file_digest(source),
+            },
+            "columns": columns,
+        }
+        self._write_meta(meta_path, meta)
+
+    def _write_meta(self, meta_path: Path, meta: Dict) -> None:
+        _write_atomically(meta_path, lambda f: f.write(json.dumps(meta).encode()))
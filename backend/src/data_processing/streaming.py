@@ -0,0 +1,123 @@
+import csv
+import heapq
+import math
+from pathlib import Path
+from typing import Iterable, List
+
+import pandas as pd
+
+# Rough in-memory size of one parsed CSV row relative to its on-disk size
+MEMORY_EXPANSION_FACTOR = 10
+
+# Rough in-memory size of one parsed row, used to size read chunks
+BYTES_PER_ROW_ESTIMATE = 200
+
+
+def estimate_partitions(paths: Iterable[Path], memory_budget_bytes: int) -> int:
+    """Estimate how many partitions keep each one within the memory budget.
+
+    Args:
+        paths (Iterable[Path]): Input files that will be partitioned
+        memory_budget_bytes (int): Memory available for one partition
+
+    Returns:
+        int: Number of partitions (at least 1)
+    """
+    input_bytes = sum(Path(path).stat().st_size for path in paths)
+    return max(
+        1, math.ceil(input_bytes * MEMORY_EXPANSION_FACTOR / memory_budget_bytes)
+    )
+
+
+def chunk_rows(memory_budget_bytes: int) -> int:
+    """Number of CSV rows to read per chunk for a given memory budget.
+
+    Args:
+        memory_budget_bytes (int): Memory available for one chunk
+
+    Returns:
+        int: Rows per chunk (at least 1)
+    """
+    return max(1, memory_budget_bytes // BYTES_PER_ROW_ESTIMATE)
+
+
+class PartitionSpiller:
+    """Hash-partition DataFrame chunks into CSV spill files on disk."""
+
+    def __init__(self, spill_dir: Path, name: str, num_partitions: int):
+        """Initialize PartitionSpiller.
+
+        Args:
+            spill_dir (Path): Directory holding the spill files
+            name (str): Prefix for the spill file names
+            num_partitions (int): Number of partitions
+        """
+        self.spill_dir = Path(spill_dir)
+        self.name = name
+        self.num_partitions = num_partitions
+
+    def path(self, partition: int) -> Path:
+        """Return the spill file path of a partition."""
+        return self.spill_dir / f"{self.name}_{partition}.csv"
+
+    def write(self, df: pd.DataFrame, key: str) -> None:
+        """Append rows to their partitions, hashing on an integer column.
+
+        Rows with a null key are dropped.
+
+        Args:
+            df (pd.DataFrame): Rows to spill
+            key (str): Integer column to partition on
+        """
+        df = df[df[key].notna()]
+        partitions = df[key].astype("int64") % self.num_partitions
+        for partition, part in df.groupby(partitions):
+            path = self.path(partition)
+            part.to_csv(path, mode="a", header=not path.exists(), index=False)
+
+    def read(self, partition: int, columns: List[str]) -> pd.DataFrame:
+        """Read a partition back, or an empty frame if nothing was spilled.
+
+        Args:
+            partition (int): Partition number
+            columns (List[str]): Columns of the spilled frame
+
+        Returns:
+            pd.DataFrame: Spilled rows of the partition
+        """
+        path = self.path(partition)
+        if not path.exists():
+            return pd.DataFrame(columns=columns)
+        return pd.read_csv(path)
+
+
+def merge_sorted_runs(run_paths: Iterable[Path], output_path: Path) -> int:
+    """K-way merge processed CSV runs sorted by (customer_id, order_id).
+
+    Args:
+        run_paths (Iterable[Path]): Sorted run files with a header row
+        output_path (Path): Merged output file
+
+    Returns:
+        int: Number of rows written
+    """
+    files = [open(path, newline="") for path in run_paths]
+    try:
+        readers = [csv.reader(f) for f in files]
+        header = ["customer_id", "order_id", "barcode"]
+        for reader in readers:
+            next(reader, None)
+
+        rows = 0
+        with open(output_path, "w", newline="") as out:
+            writer = csv.writer(out, lineterminator="\n")
+            writer.writerow(header)
+            for row in heapq.merge(
+                *readers, key=lambda row: (int(row[0]), int(row[1]))
+            ):
+                writer.writerow(row)
+                rows += 1
+        return rows
+    finally:
+        for f in files:
+            f.close()
@@ -1,42 +1,381 @@
-import pandera as pa
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ..exceptions import SchemaValidationError
+from .bitmap import RoaringBitmap
+from .dedup import duplicate_mask
+
+# Rejected values listed in error messages; the report has all of them
+MAX_REPORTED_ERRORS = 20
+
+# Row of errors that concern a whole column (missing or unexpected)
+COLUMN_ERROR_ROW = -1
+
+_INT64 = np.iinfo(np.int64)
+
+
+class IntColumn:
+    """Integer column rule: coerced to int64, or nullable Int64."""
+
+    def __init__(
+        self, unique: bool = False, nullable: bool = False, description: str = ""
+    ):
+        """Initialize IntColumn.
+
+        Args:
+            unique (bool): Reject repeated values after their first occurrence
+            nullable (bool): Allow nulls; the column becomes nullable Int64
+            description (str): What the column holds
+        """
+        self.unique = unique
+        self.nullable = nullable
+        self.description = description
+
+
+class ValidationReport:
+    """Values rejected by a schema, with the row, column and reason of each.
+
+    Rows are positions in the validated input, counted across chunks for
+    chunked validation; errors concerning a whole column use row ``-1``.
+    """
+
+    def __init__(self):
+        self._rows: List[np.ndarray] = []
+        self._columns: List[str] = []
+        self._reasons: List[str] = []
+
+    def add(self, rows: np.ndarray, column: str, reason: str) -> None:
+        """Record one reason for a set of rows.
+
+        Args:
+            rows (np.ndarray): Rejected row positions
+            column (str): Column holding the rejected values
+            reason (str): Why the values were rejected
+        """
+        if len(rows):
+            self._rows.append(np.asarray(rows, dtype=np.int64))
+            self._columns.append(column)
+            self._reasons.append(reason)
+
+    def extend(self, other: "ValidationReport") -> None:
+        """Record all errors of another report, e.g. of a later chunk.
+
+        Args:
+            other (ValidationReport): Report to append
+        """
+        self._rows += other._rows
+        self._columns += other._columns
+        self._reasons += other._reasons
+
+    def __len__(self) -> int:
+        return sum(len(rows) for rows in self._rows)
+
+    @property
+    def rows(self) -> np.ndarray:
+        """Distinct rejected rows in ascending order."""
+        if not self._rows:
+            return np.array([], dtype=np.int64)
+        return np.unique(np.concatenate(self._rows))
+
+    def to_frame(self) -> pd.DataFrame:
+        """Return the errors as a frame with columns row, column and reason."""
+        counts = [len(rows) for rows in self._rows]
+        return (
+            pd.DataFrame(
+                {
+                    "row": (
+                        np.concatenate(self._rows)
+                        if self._rows
+                        else np.array([], np.int64)
+                    ),
+                    "column": np.repeat(self._columns, counts).astype(object),
+                    "reason": np.repeat(self._reasons, counts).astype(object),
+                }
+            )
+            .sort_values(["row", "column"], kind="stable")
+            .reset_index(drop=True)
+        )
+
+    def summary(self, limit: int = MAX_REPORTED_ERRORS, unit: str = "row") -> str:
+        """Summarize the errors, listing a capped sample.
+
+        Args:
+            limit (int): Maximum number of errors listed
+            unit (str): What the row numbers count, e.g. ``line``
+
+        Returns:
+            str: Message such as ``2 invalid values: row 3 order_id: ...``
+        """
+        errors = self.to_frame().head(limit)
+        sample = "; ".join(
+            f"column {column}: {reason}"
+            if row == COLUMN_ERROR_ROW
+            else f"{unit} {row} {column}: {reason}"
+            for row, column, reason in errors.itertuples(index=False)
+        )
+        message = f"{len(self)} invalid values: {sample}"
+        if len(self) > limit:
+            message += f" (first {limit} shown)"
+        return message
+
+
+class FrameSchema:
+    """Vectorized validation of input frames.
+
+    Every column is checked with a few numpy operations over its values:
+    coercion to int64, null and integrality checks, and a sort- or hash-based
+    uniqueness check, instead of pandera's per-check dispatch. Failures are
+    collected in a :class:`ValidationReport` rather than stopping at the
+    first one.
+    """
+
+    def __init__(self, columns: Dict[str, IntColumn], strict: bool = True):
+        """Initialize FrameSchema.
+
+        Args:
+            columns (Dict[str, IntColumn]): Rule of each expected column
+            strict (bool): Reject frames with unexpected columns
+        """
+        self.columns = columns
+        self.strict = strict
+
+    def update_column(self, name: str, **rules) -> "FrameSchema":
+        """Return a copy of the schema with changed rules for one column.
+
+        Args:
+            name (str): Column to change
+            **rules: IntColumn arguments to override
+
+        Returns:
+            FrameSchema: Updated schema
+        """
+        column = self.columns[name]
+        options = {
+            "unique": column.unique,
+            "nullable": column.nullable,
+            "description": column.description,
+            **rules,
+        }
+        return FrameSchema({**self.columns, name: IntColumn(**options)}, self.strict)
+
+    def check(
+        self,
+        df: pd.DataFrame,
+        offset: int = 0,
+        duplicates: Optional[ValidationReport] = None,
+    ) -> Tuple[pd.DataFrame, ValidationReport]:
+        """Coerce a frame and report invalid values without raising.
+
+        Args:
+            df (pd.DataFrame): Frame to validate
+            offset (int): Position of the first row, for chunked validation
+            duplicates (ValidationReport, optional): Collects the repeated
+                values of unique columns instead of the returned report
+
+        Returns:
+            Tuple[pd.DataFrame, ValidationReport]: Coerced frame without the
+                rejected rows (keeping the input index), and the report
+        """
+        report = ValidationReport()
+        self._check_columns(df, report)
+        if len(report):
+            return df.iloc[:0], report
+
+        columns = {}
+        for name in df.columns:
+            values, nulls = self._coerce(df[name], name, offset, report)
+            columns[name] = (values, nulls)
+
+        valid = np.ones(len(df), dtype=bool)
+        if len(report):
+            valid[report.rows - offset] = False
+        for name, rule in self.columns.items():
+            if rule.unique:
+                values, nulls = columns[name]
+                if valid.all() and not nulls.any():
+                    repeated = np.flatnonzero(duplicate_mask(values))
+                else:
+                    rows = np.flatnonzero(valid & ~nulls)
+                    repeated = rows[duplicate_mask(values[rows])]
+                (report if duplicates is None else duplicates).add(
+                    repeated + offset, name, "duplicate value"
+                )
+                valid[repeated] = False
+        return self._build(df, columns, valid), report
+
+    def validate(self, df: pd.DataFrame, offset: int = 0) -> pd.DataFrame:
+        """Coerce a frame, raising if any value is invalid.
+
+        Args:
+            df (pd.DataFrame): Frame to validate
+            offset (int): Position of the first row, for chunked validation
+
+        Returns:
+            pd.DataFrame: Coerced frame
+
+        Raises:
+            SchemaValidationError: With the report of all invalid values
+        """
+        frame, report = self.check(df, offset)
+        if len(report):
+            raise SchemaValidationError(report)
+        return frame
+
+    def validate_chunks(
+        self,
+        chunks: Iterable[pd.DataFrame],
+        on_duplicates: Optional[Callable[[pd.DataFrame], None]] = None,
+    ) -> Iterator[pd.DataFrame]:
+        """Validate a stream of chunks as if they were one frame.
+
+        Rows are reported by their position in the stream, and unique
+        columns are also checked against earlier chunks through a bitmap of
+        the values seen so far, which grows in place.
+
+        Args:
+            chunks (Iterable[pd.DataFrame]): Consecutive chunks of one input
+            on_duplicates (Callable, optional): Called with the input rows of
+                each chunk that repeat a unique value; those rows are dropped
+                instead of failing validation, so earlier rows win
+
+        Yields:
+            pd.DataFrame: Coerced chunk
+
+        Raises:
+            SchemaValidationError: On the first chunk with invalid values
+        """
+        seen: Dict[str, RoaringBitmap] = {
+            name: RoaringBitmap() for name, rule in self.columns.items() if rule.unique
+        }
+        offset = 0
+        for chunk in chunks:
+            dropped = ValidationReport() if on_duplicates is not None else None
+            frame, report = self.check(chunk, offset, dropped)
+            for name, bitmap in seen.items():
+                values = frame[name].to_numpy(dtype=np.int64)
+                repeated = bitmap.contains(values)
+                positions = chunk.index.get_indexer(frame.index[repeated])
+                (report if dropped is None else dropped).add(
+                    positions + offset, name, "duplicate value"
+                )
+                if dropped is not None and repeated.any():
+                    frame = frame[~repeated]
+                bitmap.update(values)
+            if len(report):
+                raise SchemaValidationError(report)
+            if dropped is not None and len(dropped):
+                on_duplicates(chunk.iloc[dropped.rows - offset])
+            offset += len(chunk)
+            yield frame
+
+    def _check_columns(self, df: pd.DataFrame, report: ValidationReport) -> None:
+        rows = np.array([COLUMN_ERROR_ROW])
+        for name in self.columns:
+            if name not in df.columns:
+                report.add(rows, name, "missing column")
+        if self.strict:
+            for name in df.columns:
+                if name not in self.columns:
+                    report.add(rows, str(name), "unexpected column")
+
+    def _coerce(
+        self, column: pd.Series, name: str, offset: int, report: ValidationReport
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Convert a column to int64 values and a null mask in one pass.
+
+        Args:
+            column (pd.Series): Input column
+            name (str): Column name
+            offset (int): Position of the first row
+            report (ValidationReport): Collects rejected values
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: int64 values (0 where null or
+                invalid) and null mask
+        """
+        rule = self.columns[name]
+        dtype = column.dtype
+        if dtype == np.int64:
+            nulls = np.zeros(len(column), dtype=bool)
+            values = column.to_numpy()
+        elif dtype.kind in "iub":
+            nulls = column.isna().to_numpy()
+            values = column.to_numpy(dtype=np.int64, na_value=0)
+        else:
+            nulls = column.isna().to_numpy()
+            numbers = column
+            if dtype.kind != "f":
+                # Strings and mixed objects; unparseable values become NaN
+                numbers = pd.to_numeric(column, errors="coerce")
+            if numbers.dtype.kind in "iu":
+                values = numbers.to_numpy(dtype=np.int64)
+            else:
+                floats = numbers.to_numpy(dtype=np.float64, na_value=np.nan)
+                with np.errstate(invalid="ignore"):
+                    integral = (
+                        np.isfinite(floats)
+                        & (floats == np.floor(floats))
+                        & (floats >= _INT64.min)
+                        & (floats < -float(_INT64.min))
+                    )
+                invalid = np.flatnonzero(~nulls & ~integral)
+                report.add(invalid + offset, name, "not an integer")
+                values = np.where(integral, floats, 0).astype(np.int64)
+
+        if not rule.nullable:
+            report.add(np.flatnonzero(nulls) + offset, name, "null value")
+        return values, nulls
+
+    def _build(
+        self,
+        df: pd.DataFrame,
+        columns: Dict[str, Tuple[np.ndarray, np.ndarray]],
+        valid: np.ndarray,
+    ) -> pd.DataFrame:
+        index = df.index
+        keep: Optional[np.ndarray] = None if valid.all() else valid
+        if keep is not None:
+            index = index[keep]
+        data = {}
+        for name, (values, nulls) in columns.items():
+            if keep is not None:
+                values, nulls = values[keep], nulls[keep]
+            if self.columns[name].nullable:
+                data[name] = pd.arrays.IntegerArray(values, nulls.copy())
+            else:
+                data[name] = values
+        return pd.DataFrame(data, index=index, copy=False)
 
-# Schema configuration notes:
-# - strict=True: Ensures DataFrame has exactly these columns, no extra columns allowed
-# - coerce=True: Automatically converts data types (e.g., string "123" to integer 123)
 
 # Schema for validating orders data
-orders_schema = pa.DataFrameSchema(
+orders_schema = FrameSchema(
     {
-        "order_id": pa.Column(
-            int,
-            unique=True,
-            coerce=True,  # Convert to integer if needed
-            description="Unique identifier for each order",
+        "order_id": IntColumn(
+            unique=True, description="Unique identifier for each order"
         ),
-        "customer_id": pa.Column(
-            int,
-            coerce=True,  # Convert to integer if needed
-            description="Customer identifier - can have multiple orders",
+        "customer_id": IntColumn(
+            description="Customer identifier - can have multiple orders"
         ),
     },
     strict=True,  # Ensure no unexpected columns
 )
 
 # Schema for validating barcodes data
-barcodes_schema = pa.DataFrameSchema(
+barcodes_schema = FrameSchema(
     {
-        "barcode": pa.Column(
-            int,
-            unique=True,
-            coerce=True,  # Convert to integer if needed
-            description="Unique identifier for each ticket",
+        "barcode": IntColumn(
+            unique=True, description="Unique identifier for each ticket"
         ),
-        "order_id": pa.Column(
-            float,
+        "order_id": IntColumn(
             nullable=True,
-            coerce=True,  # Convert to float if needed
             description="Order ID if barcode is sold, null if unused",
         ),
     },
     strict=True,  # Ensure no unexpected columns
 )
+
+# Barcodes deduplicated by DataLoader._check_duplicate_barcodes are unique
+# already, so the uniqueness check is skipped
+deduplicated_barcodes_schema = barcodes_schema.update_column("barcode", unique=False)
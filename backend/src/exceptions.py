@@ -10,6 +10,18 @@ class DataValidationError(TiqetsProcessorError):
     pass
 
 
+class SchemaValidationError(DataValidationError):
+    """Raised when input data does not match its schema.
+
+    Attributes:
+        report (ValidationReport): Rows, columns and reasons of the failures
+    """
+
+    def __init__(self, report):
+        super().__init__(report.summary())
+        self.report = report
+
+
 class DataProcessingError(TiqetsProcessorError):
     """Raised when data processing fails."""
 
@@ -26,3 +38,9 @@ class FileOperationError(TiqetsProcessorError):
     """Raised when file operations fail."""
 
     pass
+
+
+class InventoryError(TiqetsProcessorError):
+    """Raised when barcodes cannot be allocated or released."""
+
+    pass
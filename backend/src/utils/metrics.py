@@ -0,0 +1,408 @@
+import json
+import resource
+import sys
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+# ru_maxrss is reported in bytes on macOS and in kilobytes elsewhere
+_MAXRSS_UNIT = 1 if sys.platform == "darwin" else 1024
+
+
+class Metrics:
+    """Per-stage timing and memory instrumentation.
+
+    Stages record wall time, CPU time (of the calling thread), peak memory and
+    row counts. Records are collected by the runs active in the calling thread
+    (one per CLI run, job or request) and aggregated for Prometheus.
+
+    Peak memory is the tracemalloc peak during the stage when memory tracing
+    is enabled, otherwise the process' peak resident set size at the end of
+    the stage. When disabled, stages and runs are shared no-op objects.
+    """
+
+    def __init__(self, enabled: bool = False, trace_memory: bool = False):
+        """Initialize Metrics.
+
+        Args:
+            enabled (bool): Record stages and requests
+            trace_memory (bool): Measure per-stage peaks with tracemalloc,
+                which slows down allocation-heavy code
+        """
+        self.enabled = enabled
+        self.trace_memory = enabled and trace_memory
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._stages: Dict[str, List[float]] = {}
+        self._requests: Dict[Tuple[str, str, str], List[float]] = {}
+        self._pool_totals: Dict[str, List[float]] = {}
+        self._pools: Dict[str, Any] = {}
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def stage(self, name: str, rows: Optional[int] = None):
+        """Measure a stage; set ``rows`` on the returned object if not known
+        upfront.
+
+        Args:
+            name (str): Stage name
+            rows (int, optional): Number of rows the stage handled
+
+        Returns:
+            Context manager for the stage
+        """
+        if not self.enabled:
+            return _NULL_STAGE
+        return _Stage(self, name, rows)
+
+    def run(self, **info):
+        """Collect the stages measured in this thread while the run is active.
+
+        Args:
+            **info: Details added to the run report
+
+        Returns:
+            Run: Context manager; also usable through start() and stop()
+        """
+        if not self.enabled:
+            return _NULL_RUN
+        return Run(self, info)
+
+    def observe_request(
+        self, method: str, endpoint: str, status: int, wall: float, cpu: float
+    ) -> None:
+        """Record a handled HTTP request.
+
+        Args:
+            method (str): HTTP method
+            endpoint (str): URL rule of the endpoint
+            status (int): Response status code
+            wall (float): Wall time in seconds
+            cpu (float): CPU time in seconds
+        """
+        with self._lock:
+            totals = self._requests.setdefault((method, endpoint, str(status)), [0] * 3)
+            totals[0] += 1
+            totals[1] += wall
+            totals[2] += cpu
+
+    def register_pool(self, name: str, pool) -> None:
+        """Report the connection counts of a pool at every scrape.
+
+        Args:
+            name (str): Pool label, e.g. the engine's bind key
+            pool (QueuePool): Pool whose size, checked out and overflow
+                connections are reported
+        """
+        with self._lock:
+            self._pools[name] = pool
+            self._pool_totals.setdefault(name, [0] * 3)
+
+    def observe_pool_checkout(
+        self, name: str, wait: float, timed_out: bool = False
+    ) -> None:
+        """Record one connection checkout from a pool.
+
+        Args:
+            name (str): Pool label
+            wait (float): Seconds spent waiting for the connection
+            timed_out (bool): Whether the wait ended in a pool timeout
+        """
+        with self._lock:
+            totals = self._pool_totals.setdefault(name, [0] * 3)
+            totals[0] += 0 if timed_out else 1
+            totals[1] += wait
+            totals[2] += 1 if timed_out else 0
+
+    def pool_stats(self) -> Dict[str, Dict[str, float]]:
+        """Checkouts, total wait seconds and timeouts per pool."""
+        with self._lock:
+            return {
+                name: {"checkouts": t[0], "wait_seconds": t[1], "timeouts": t[2]}
+                for name, t in self._pool_totals.items()
+            }
+
+    def render_prometheus(self) -> str:
+        """Render the aggregated metrics in Prometheus text format.
+
+        Returns:
+            str: Exposition text
+        """
+        with self._lock:
+            stages = {name: list(totals) for name, totals in self._stages.items()}
+            requests = {key: list(totals) for key, totals in self._requests.items()}
+            pool_totals = {
+                name: list(totals) for name, totals in self._pool_totals.items()
+            }
+            pools = dict(self._pools)
+
+        lines = []
+
+        def family(name, kind, help_text, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for suffix, labels, value in samples:
+                label_text = ",".join(f'{k}="{v}"' for k, v in labels.items())
+                lines.append(f"{name}{suffix}{{{label_text}}} {value:.9g}")
+
+        family(
+            "tiqets_stage_wall_seconds",
+            "summary",
+            "Wall time of processing stages.",
+            [
+                sample
+                for name, (calls, wall, _, _, _) in sorted(stages.items())
+                for sample in (
+                    ("_count", {"stage": name}, calls),
+                    ("_sum", {"stage": name}, wall),
+                )
+            ],
+        )
+        family(
+            "tiqets_stage_cpu_seconds_total",
+            "counter",
+            "CPU time of processing stages.",
+            [("", {"stage": name}, t[2]) for name, t in sorted(stages.items())],
+        )
+        family(
+            "tiqets_stage_rows_total",
+            "counter",
+            "Rows handled by processing stages.",
+            [("", {"stage": name}, t[3]) for name, t in sorted(stages.items())],
+        )
+        family(
+            "tiqets_stage_peak_memory_bytes",
+            "gauge",
+            "Highest peak memory observed during processing stages.",
+            [("", {"stage": name}, t[4]) for name, t in sorted(stages.items())],
+        )
+        family(
+            "tiqets_http_request_seconds",
+            "summary",
+            "Wall time of HTTP requests.",
+            [
+                sample
+                for (method, endpoint, status), (calls, wall, _) in sorted(
+                    requests.items()
+                )
+                for sample in (
+                    ("_count", _request_labels(method, endpoint, status), calls),
+                    ("_sum", _request_labels(method, endpoint, status), wall),
+                )
+            ],
+        )
+        family(
+            "tiqets_http_request_cpu_seconds_total",
+            "counter",
+            "CPU time of HTTP requests.",
+            [
+                ("", _request_labels(*key), totals[2])
+                for key, totals in sorted(requests.items())
+            ],
+        )
+        family(
+            "tiqets_db_pool_checkouts_total",
+            "counter",
+            "Connections checked out of database pools.",
+            [("", {"pool": name}, t[0]) for name, t in sorted(pool_totals.items())],
+        )
+        family(
+            "tiqets_db_pool_wait_seconds_total",
+            "counter",
+            "Time spent waiting for database pool connections.",
+            [("", {"pool": name}, t[1]) for name, t in sorted(pool_totals.items())],
+        )
+        family(
+            "tiqets_db_pool_timeouts_total",
+            "counter",
+            "Checkouts that timed out waiting for a database pool connection.",
+            [("", {"pool": name}, t[2]) for name, t in sorted(pool_totals.items())],
+        )
+        family(
+            "tiqets_db_pool_connections",
+            "gauge",
+            "Database pool connections by state.",
+            [
+                ("", {"pool": name, "state": state}, value)
+                for name, pool in sorted(pools.items())
+                for state, value in (
+                    ("size", pool.size()),
+                    ("checked_out", pool.checkedout()),
+                    ("overflow", max(pool.overflow(), 0)),
+                )
+            ],
+        )
+        return "\n".join(lines) + "\n"
+
+    @property
+    def _runs(self) -> List["Run"]:
+        runs = getattr(self._local, "runs", None)
+        if runs is None:
+            runs = self._local.runs = []
+        return runs
+
+    @property
+    def _stack(self) -> List["_Stage"]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _record(self, record: Dict[str, Any]) -> None:
+        with self._lock:
+            totals = self._stages.setdefault(record["name"], [0] * 5)
+            totals[0] += 1
+            totals[1] += record["wall_seconds"]
+            totals[2] += record["cpu_seconds"]
+            totals[3] += record["rows"] or 0
+            totals[4] = max(totals[4], record["peak_memory_bytes"])
+        for run in self._runs:
+            run.stages.append(record)
+
+
+class Run:
+    """Stages measured in one thread between start() and stop()."""
+
+    def __init__(self, metrics: Metrics, info: Dict[str, Any]):
+        self.metrics = metrics
+        self.info = info
+        self.stages: List[Dict[str, Any]] = []
+        self.started_at: Optional[float] = None
+        self.wall_seconds = 0.0
+        self.cpu_seconds = 0.0
+
+    def start(self) -> "Run":
+        self.started_at = time.time()
+        self._wall = time.perf_counter()
+        self._cpu = time.thread_time()
+        self.metrics._runs.append(self)
+        return self
+
+    def stop(self) -> None:
+        self.wall_seconds = time.perf_counter() - self._wall
+        self.cpu_seconds = time.thread_time() - self._cpu
+        runs = self.metrics._runs
+        if self in runs:
+            runs.remove(self)
+
+    def __enter__(self) -> "Run":
+        return self.start()
+
+    def __exit__(self, *exc) -> bool:
+        self.stop()
+        return False
+
+    def server_timing(self) -> str:
+        """Stage wall times as Server-Timing header value."""
+        return ", ".join(
+            f"{stage['name']};dur={stage['wall_seconds'] * 1000:.1f}"
+            for stage in self.stages
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            **self.info,
+            "started_at": self.started_at,
+            "wall_seconds": self.wall_seconds,
+            "cpu_seconds": self.cpu_seconds,
+            "stages": self.stages,
+        }
+
+    def write(self, path: Path) -> None:
+        """Write the run report as JSON.
+
+        Args:
+            path (Path): Report file
+        """
+        Path(path).write_text(json.dumps(self.to_dict(), indent=2))
+
+
+class _Stage:
+    def __init__(self, metrics: Metrics, name: str, rows: Optional[int]):
+        self.metrics = metrics
+        self.name = name
+        self.rows = rows
+        self.child_peak = 0
+
+    def __enter__(self) -> "_Stage":
+        stack = self.metrics._stack
+        if self.metrics.trace_memory:
+            if stack:
+                # Keep the enclosing stage's peak before resetting it
+                stack[-1].child_peak = max(
+                    stack[-1].child_peak, tracemalloc.get_traced_memory()[1]
+                )
+            tracemalloc.reset_peak()
+        stack.append(self)
+        self.wall = time.perf_counter()
+        self.cpu = time.thread_time()
+        return self
+
+    def __exit__(self, exc_type, *exc) -> bool:
+        wall = time.perf_counter() - self.wall
+        cpu = time.thread_time() - self.cpu
+        if self.metrics.trace_memory:
+            # Nested stages reset the peak, so include the peaks they saw
+            peak = max(tracemalloc.get_traced_memory()[1], self.child_peak)
+        else:
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * _MAXRSS_UNIT
+
+        stack = self.metrics._stack
+        stack.pop()
+        if stack:
+            stack[-1].child_peak = max(stack[-1].child_peak, peak)
+
+        self.metrics._record(
+            {
+                "name": self.name,
+                "wall_seconds": wall,
+                "cpu_seconds": cpu,
+                "peak_memory_bytes": peak,
+                "rows": self.rows,
+                "failed": exc_type is not None,
+            }
+        )
+        return False
+
+
+class _NullStage:
+    rows = None
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        # Shared by every disabled stage, so writes such as rows are dropped
+        pass
+
+    def __enter__(self) -> "_NullStage":
+        return self
+
+    def __exit__(self, *exc) -> bool:
+        return False
+
+
+class _NullRun(_NullStage):
+    stages: List[Dict[str, Any]] = []
+
+    def start(self) -> "_NullRun":
+        return self
+
+    def stop(self) -> None:
+        pass
+
+    def server_timing(self) -> str:
+        return ""
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {}
+
+    def write(self, path: Path) -> None:
+        pass
+
+
+_NULL_STAGE = _NullStage()
+_NULL_RUN = _NullRun()
+
+
+def _request_labels(method: str, endpoint: str, status: str) -> Dict[str, str]:
+    return {"method": method, "endpoint": endpoint, "status": status}
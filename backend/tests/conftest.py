@@ -19,6 +19,7 @@ def app(tmp_path):
         SQLALCHEMY_DATABASE_URI = "sqlite:///:memory:"
         SQLALCHEMY_TRACK_MODIFICATIONS = False
         SECRET_KEY = "test-secret-key"
+        JOB_WORKERS = 0  # Run background jobs inline
 
         # Use temporary directories for test data
         INPUT_DIR = tmp_path / "input"
@@ -99,9 +100,9 @@ def db_sample_data(app):
             db.session.flush()
 
             # Create barcodes
-            barcode1 = Barcode(barcode_value="1001", order_id=1)
-            barcode2 = Barcode(barcode_value="1002", order_id=1)
-            barcode3 = Barcode(barcode_value="1003", order_id=2)
+            barcode1 = Barcode(barcode_value=1001, order_id=1)
+            barcode2 = Barcode(barcode_value=1002, order_id=1)
+            barcode3 = Barcode(barcode_value=1003, order_id=2)
             db.session.add_all([barcode1, barcode2, barcode3])
 
             db.session.commit()
@@ -0,0 +1,77 @@
+import asyncio
+
+import pandas as pd
+import pytest
+from app.asgi import AsyncAPI
+
+
+def asgi_get(asgi_app, path, query_string=b""):
+    """Send one GET request through the ASGI app."""
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": path,
+        "query_string": query_string,
+        "headers": [(b"host", b"localhost")],
+    }
+    asyncio.run(asgi_app(scope, receive, send))
+    start, *bodies = messages
+    assert not bodies[-1].get("more_body")
+    return (
+        start["status"],
+        dict(start["headers"]),
+        b"".join(body["body"] for body in bodies),
+        bodies,
+    )
+
+
+@pytest.mark.parametrize(
+    "path, query_string",
+    [
+        ("/api/customers/top", b"limit=2"),
+        ("/api/barcodes/unused", b"limit=2"),
+        ("/api/barcodes/unused", b"format=ndjson"),
+        ("/api/orders/101", b""),
+        ("/api/orders/999", b""),
+        ("/api/customers/top", b"limit=0"),
+        ("/api/", b""),
+    ],
+)
+def test_asgi_matches_wsgi(app, client, setup_test_data, path, query_string):
+    """Test the ASGI app serves the same responses as the Flask views."""
+    setup_test_data()
+    asgi_app = AsyncAPI(app, workers=2)
+
+    status, headers, body, _ = asgi_get(asgi_app, path, query_string)
+    expected = client.get(f"{path}?{query_string.decode()}")
+
+    assert status == expected.status_code
+    assert headers[b"content-type"] == expected.content_type.encode()
+    assert body == expected.data
+
+
+def test_asgi_streams_ndjson(app, setup_test_data):
+    """Test streamed responses are sent chunk by chunk, not buffered."""
+    setup_test_data(
+        barcodes_data=pd.DataFrame(
+            {"barcode": [1001, 1002, 1003, 1004], "order_id": [1.0, 2.0, None, None]}
+        )
+    )
+    asgi_app = AsyncAPI(app, workers=2)
+
+    _, _, body, bodies = asgi_get(asgi_app, "/api/barcodes/unused", b"format=ndjson")
+    assert body.count(b"\n") == 2
+    assert all(message["more_body"] for message in bodies[:-1])
+    assert len(bodies) > 1 and bodies[-1]["body"] == b""
+
+    # JSON responses are a single body message
+    _, _, _, bodies = asgi_get(asgi_app, "/api/customers/top")
+    assert len(bodies) == 1
@@ -1,7 +1,9 @@
 import json
 
+import pandas as pd
 import pytest
-from app.api.routes import get_processed_data
+from app.api.routes import enqueue_processing_job, purge_processed_data
+from src.utils.metrics import Metrics
 
 
 def test_process_orders_endpoint(client, sample_data, setup_test_data):
@@ -10,7 +12,7 @@ def test_process_orders_endpoint(client, sample_data, setup_test_data):
     setup_test_data()
 
     # Clear cache
-    get_processed_data.cache_clear()
+    purge_processed_data()
 
     response = client.get("/api/process")
     assert response.status_code == 200
@@ -26,7 +28,7 @@ def test_top_customers_endpoint(client, sample_data, setup_test_data):
     setup_test_data()
 
     # Clear cache
-    get_processed_data.cache_clear()
+    purge_processed_data()
 
     # Test default limit
     response = client.get("/api/customers/top")
@@ -41,7 +43,7 @@ def test_unused_barcodes_endpoint(client, sample_data, setup_test_data):
     setup_test_data()
 
     # Clear cache
-    get_processed_data.cache_clear()
+    purge_processed_data()
 
     response = client.get("/api/barcodes/unused")
     assert response.status_code == 200
@@ -57,7 +59,7 @@ def test_customer_orders_endpoint(client, db_sample_data, app, setup_test_data):
         setup_test_data()
 
         # Clear cache
-        get_processed_data.cache_clear()
+        purge_processed_data()
 
         # Test existing customer
         response = client.get("/api/orders/101")
@@ -77,9 +79,230 @@ def test_endpoint_response_structure(client, db_sample_data, setup_test_data, en
     setup_test_data()
 
     # Clear cache
-    get_processed_data.cache_clear()
+    purge_processed_data()
 
     response = client.get(endpoint)
     assert response.status_code in [200, 404]
     data = json.loads(response.data)
     assert "status" in data
+
+
+def test_processed_data_cache_invalidation(client, setup_test_data):
+    """Test cached results follow input changes and explicit purges."""
+    paths = setup_test_data()
+
+    response = client.get("/api/orders/102")
+    assert response.status_code == 200
+
+    # Customer 103 only appears after the inputs change
+    orders = pd.DataFrame({"order_id": [1, 2, 3], "customer_id": [101, 102, 103]})
+    orders.to_csv(paths["input_dir"] / "orders.csv", index=False)
+    barcodes = pd.DataFrame(
+        {"barcode": [1001, 1002, 1003, 1004], "order_id": [1.0, 1.0, 2.0, 3.0]}
+    )
+    barcodes.to_csv(paths["input_dir"] / "barcodes.csv", index=False)
+
+    response = client.get("/api/orders/103")
+    assert response.status_code == 200
+
+    response = client.delete("/api/cache")
+    assert response.status_code == 200
+    assert json.loads(response.data)["status"] == "success"
+
+
+@pytest.mark.parametrize(
+    "endpoint",
+    ["/api/process", "/api/customers/top", "/api/barcodes/unused", "/api/orders/101"],
+)
+def test_validated_responses_match_fast_path(app, client, setup_test_data, endpoint):
+    """Test the fast serializer returns the same data as the schema path."""
+    setup_test_data()
+
+    fast = json.loads(client.get(endpoint).data)
+    app.config["VALIDATE_RESPONSES"] = True
+    validated = json.loads(client.get(endpoint).data)
+
+    # Each /api/process call reports its own background job
+    fast.pop("job", None)
+    validated.pop("job", None)
+    assert fast == validated
+    assert fast["status"] == "success"
+
+
+def test_paginated_orders(client, setup_test_data):
+    """Test /api/process pages orders with limit and after cursors."""
+    setup_test_data()
+
+    data = json.loads(client.get("/api/process?limit=1").data)
+    assert [order["order_id"] for order in data["data"]["orders"]] == [1]
+    assert data["data"]["analytics"]["unused_barcodes"] == {"count": 0}
+    assert data["pagination"] == {"limit": 1, "next": 1}
+
+    data = json.loads(client.get("/api/process?limit=1&after=1").data)
+    assert [order["order_id"] for order in data["data"]["orders"]] == [2]
+
+    data = json.loads(client.get("/api/process?limit=1&after=2").data)
+    assert data["data"]["orders"] == []
+    assert data["pagination"]["next"] is None
+
+    response = client.get("/api/process?limit=1&after=99")
+    assert response.status_code == 400
+
+
+def test_paginated_unused_barcodes(client, setup_test_data):
+    """Test unused barcodes are paged and streamed as NDJSON."""
+    setup_test_data(
+        barcodes_data=pd.DataFrame(
+            {
+                "barcode": [1001, 1002, 1003, 1006, 1005, 1004],
+                "order_id": [1.0, 1.0, 2.0, None, None, None],
+            }
+        )
+    )
+
+    data = json.loads(client.get("/api/barcodes/unused?limit=2").data)
+    assert data["data"]["count"] == 3
+    assert [b["barcode"] for b in data["data"]["barcodes"]] == [1004, 1005]
+    assert data["pagination"]["next"] == 1005
+
+    data = json.loads(client.get("/api/barcodes/unused?limit=2&after=1005").data)
+    assert [b["barcode"] for b in data["data"]["barcodes"]] == [1006]
+    assert data["pagination"]["next"] is None
+
+    response = client.get("/api/barcodes/unused?format=ndjson")
+    assert response.mimetype == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.data.splitlines()]
+    assert lines == [{"barcode": b, "order_id": None} for b in (1004, 1005, 1006)]
+
+    response = client.get("/api/process?format=ndjson")
+    types = [json.loads(line)["type"] for line in response.data.splitlines()]
+    assert types == ["order"] * 2 + ["unused_barcode"] * 3
+
+    assert client.get("/api/barcodes/unused?limit=0").status_code == 400
+
+
+def test_database_query_backend_matches_memory(app, client, setup_test_data):
+    """Test the database backend answers the analytics endpoints like the CSVs."""
+    setup_test_data(
+        barcodes_data=pd.DataFrame(
+            {
+                "barcode": [1001, 1002, 1003, 1006, 1005, 1004],
+                "order_id": [1.0, 1.0, 2.0, None, None, None],
+            }
+        )
+    )
+    urls = [
+        "/api/customers/top?limit=2",
+        "/api/barcodes/unused",
+        "/api/barcodes/unused?limit=2&after=1004",
+        "/api/orders/101",
+        "/api/orders/999",
+    ]
+    expected = [client.get(url) for url in urls]
+
+    # Ingest into the database, then serve without the CSV inputs
+    client.get("/api/process")
+    for name in ("orders.csv", "barcodes.csv"):
+        (app.config["INPUT_DIR"] / name).unlink()
+    purge_processed_data()
+    app.config["QUERY_BACKEND"] = "database"
+
+    for url, response in zip(urls, expected):
+        actual = client.get(url)
+        assert actual.status_code == response.status_code, url
+        assert json.loads(actual.data) == json.loads(response.data), url
+
+
+def test_allocate_and_release_barcodes(client, setup_test_data):
+    """Test allocated barcodes leave the unused listing until released."""
+    setup_test_data(
+        barcodes_data=pd.DataFrame(
+            {
+                "barcode": [1001, 1002, 1003, 1006, 1005, 1004],
+                "order_id": [1.0, 1.0, 2.0, None, None, None],
+            }
+        )
+    )
+
+    response = client.post("/api/barcodes/allocate", json={"count": 2})
+    assert response.status_code == 200
+    assert json.loads(response.data)["data"] == {
+        "barcodes": [1004, 1005],
+        "remaining": 1,
+    }
+    data = json.loads(client.get("/api/barcodes/unused").data)["data"]
+    assert data["count"] == 1
+    assert [b["barcode"] for b in data["barcodes"]] == [1006]
+
+    response = client.post("/api/barcodes/allocate", json={"count": 2})
+    assert response.status_code == 409
+    response = client.post("/api/barcodes/allocate", json={"count": 0})
+    assert response.status_code == 400
+
+    response = client.post("/api/barcodes/release", json={"barcodes": [1005]})
+    assert json.loads(response.data)["data"] == {"released": 1, "remaining": 2}
+    response = client.post("/api/barcodes/release", json={"barcodes": [1001]})
+    assert response.status_code == 409
+    data = json.loads(client.get("/api/barcodes/unused").data)["data"]
+    assert [b["barcode"] for b in data["barcodes"]] == [1005, 1006]
+
+
+def test_process_enqueues_job(client, setup_test_data):
+    """Test /api/process reports a background job with its progress."""
+    setup_test_data()
+
+    data = json.loads(client.get("/api/process").data)
+    job_id = data["job"]["id"]
+
+    response = client.get(f"/api/jobs/{job_id}")
+    assert response.status_code == 200
+    job = json.loads(response.data)["data"]
+    assert job["status"] == "succeeded"
+    assert job["progress"] == 1.0
+    assert job["result"]["orders"] == {"inserted": 2, "updated": 0, "skipped": 0}
+    assert set(job["timings"]) == {"process", "save_results", "save_to_database"}
+
+    # Unchanged inputs are not saved again
+    assert json.loads(client.get("/api/process").data)["job"]["id"] == job_id
+    setup_test_data(
+        orders_data=pd.DataFrame({"order_id": [1, 2], "customer_id": [101, 103]})
+    )
+    assert json.loads(client.get("/api/process").data)["job"]["id"] != job_id
+
+    assert client.get("/api/jobs/unknown").status_code == 404
+
+
+def test_metrics_and_run_report(app, client, setup_test_data):
+    """Test processing stages are exposed via /api/metrics and the run report."""
+    setup_test_data()
+    app.extensions["metrics"] = Metrics(enabled=True)
+
+    # A job for inputs that are not cached yet processes them itself
+    with app.test_request_context():
+        enqueue_processing_job(
+            str(app.config["INPUT_DIR"]), str(app.config["OUTPUT_DIR"])
+        )
+
+    report = json.loads((app.config["OUTPUT_DIR"] / "run_report.json").read_text())
+    names = [stage["name"] for stage in report["stages"]]
+    for name in [
+        "load_orders",
+        "load_barcodes",
+        "validate_orders_barcodes",
+        "build_dataset",
+        "save_results",
+        "save_to_database",
+    ]:
+        assert name in names
+    assert names.index("build_dataset") < names.index("save_results")
+
+    assert 'tiqets_stage_rows_total{stage="save_results"} 2' in (
+        app.extensions["metrics"].render_prometheus()
+    )
+
+    client.get("/api/process")
+    response = client.get("/api/metrics")
+    assert response.status_code == 200
+    assert response.mimetype == "text/plain"
+    # The response and the processing job share one processed dataset
+    assert 'tiqets_stage_wall_seconds_count{stage="load_orders"} 1' in response.text
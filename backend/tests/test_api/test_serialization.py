@@ -0,0 +1,28 @@
+import json
+
+import numpy as np
+import pandas as pd
+from app.api.serialization import dumps, orders_records, unused_barcodes_record
+from src.data_processing.dataset import ProcessedDataset
+
+
+def test_dumps_numpy_values():
+    """Test numpy scalars and arrays are encoded like Python values."""
+    payload = {"count": np.int64(2), "barcodes": np.array([1001, 1002])}
+
+    assert json.loads(dumps(payload)) == {"count": 2, "barcodes": [1001, 1002]}
+
+
+def test_records_shape():
+    """Test columnar records keep the response shape."""
+    dataset = ProcessedDataset.from_frame(
+        pd.DataFrame({"customer_id": [101], "order_id": [1], "barcode": [[1001, 1002]]})
+    )
+
+    assert json.loads(dumps(orders_records(dataset, range(1)))) == [
+        {"customer_id": 101, "order_id": 1, "barcodes": [1001, 1002]}
+    ]
+    assert json.loads(dumps(unused_barcodes_record(1, np.array([1004])))) == {
+        "count": 1,
+        "barcodes": [{"barcode": 1004, "order_id": None}],
+    }
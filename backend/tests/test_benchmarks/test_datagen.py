@@ -0,0 +1,44 @@
+import pandas as pd
+import pytest
+from benchmarks.datagen import generate_dataset
+from src.data_processing.validator import orders_schema
+
+
+def test_generate_dataset_shape(tmp_path):
+    """Test generated files match the requested distribution."""
+    stats = generate_dataset(
+        str(tmp_path),
+        orders=500,
+        customers=50,
+        barcodes_per_order=2.5,
+        unused_fraction=0.2,
+        duplicate_rate=0.01,
+        missing_barcode_rate=0.1,
+        chunk_size=200,
+    )
+
+    orders = orders_schema.validate(pd.read_csv(tmp_path / "orders.csv"))
+    barcodes = pd.read_csv(tmp_path / "barcodes.csv")
+
+    assert len(orders) == stats["orders"] == 500
+    assert orders["customer_id"].between(1, 50).all()
+    assert len(barcodes) == (
+        stats["sold_barcodes"] + stats["unused_barcodes"] + stats["duplicates"]
+    )
+    assert barcodes["barcode"].duplicated().sum() == stats["duplicates"] > 0
+
+    unique = barcodes.drop_duplicates("barcode", keep="first")
+    assert unique["order_id"].isna().mean() == pytest.approx(0.2, abs=0.05)
+    without_barcodes = set(orders["order_id"]) - set(barcodes["order_id"].dropna())
+    assert 0 < len(without_barcodes) < 100
+
+
+def test_generate_dataset_is_reproducible(tmp_path):
+    """Test the same seed generates identical files."""
+    generate_dataset(str(tmp_path / "a"), orders=100, customers=10, seed=7)
+    generate_dataset(str(tmp_path / "b"), orders=100, customers=10, seed=7)
+
+    for name in ("orders.csv", "barcodes.csv"):
+        assert (tmp_path / "a" / name).read_bytes() == (
+            tmp_path / "b" / name
+        ).read_bytes()
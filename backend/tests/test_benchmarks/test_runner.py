@@ -0,0 +1,38 @@
+import tracemalloc
+
+import pytest
+from benchmarks.runner import measure, parse_args
+
+
+def test_measure_times_without_tracing():
+    """Test timed runs are untraced and peak memory comes from a separate run."""
+    traced = []
+
+    def func():
+        traced.append(tracemalloc.is_tracing())
+        return len(bytearray(2**20))
+
+    result = measure("alloc", func, repeat=3)
+
+    assert traced == [False, False, False, True]
+    assert len(result["runs"]) == 3
+    assert result["rows"] == 2**20
+    assert result["peak_mb"] >= 1
+
+    traced.clear()
+    assert measure("alloc", func, memory=False)["peak_mb"] is None
+    assert traced == [False]
+
+
+def test_database_url_requires_allow_destructive(capsys):
+    """Test suites that drop tables refuse a given database without the flag."""
+    url = ["--database-url", "postgresql://localhost/bench"]
+
+    with pytest.raises(SystemExit):
+        parse_args(url)
+    assert "--allow-destructive" in capsys.readouterr().err
+
+    assert parse_args(url + ["--allow-destructive"]).allow_destructive
+    # The schema and validation suites only touch their own tables
+    assert parse_args(url + ["--suites", "schema", "validation"])
+    assert parse_args([]).database_url is None
@@ -0,0 +1,117 @@
+import os
+import threading
+import time
+
+import numpy as np
+
+from app.core.cache import ResultCache
+
+
+def _touch(path, content):
+    path.write_text(content)
+    stat = path.stat()
+    # Make sure the mtime moves even on coarse-grained filesystems
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+
+def test_cache_invalidated_by_fingerprint(tmp_path):
+    """Test cached results are recomputed when an input changes."""
+    source = tmp_path / "orders.csv"
+    source.write_text("order_id,customer_id\n1,101\n")
+    cache = ResultCache()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return len(calls)
+
+    assert cache.get_or_compute("key", [source], compute) == 1
+    assert cache.get_or_compute("key", [source], compute) == 1
+
+    _touch(source, "order_id,customer_id\n1,101\n2,102\n")
+    assert cache.get_or_compute("key", [source], compute) == 2
+
+
+def test_cache_ttl_and_purge(tmp_path):
+    """Test entries expire after the TTL and on explicit purge."""
+    cache = ResultCache(ttl=0.05)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return len(calls)
+
+    assert cache.get_or_compute("key", [], compute) == 1
+    time.sleep(0.1)
+    assert cache.get_or_compute("key", [], compute) == 2
+
+    cache.purge()
+    assert cache.get_or_compute("key", [], compute) == 3
+
+
+def test_cache_single_flight(tmp_path):
+    """Test concurrent misses trigger a single computation."""
+    cache = ResultCache(cache_dir=str(tmp_path / "cache"))
+    calls = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.05)
+        return "result"
+
+    results = []
+    threads = [
+        threading.Thread(
+            target=lambda: results.append(cache.get_or_compute("key", [], compute))
+        )
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == ["result"] * 8
+    assert len(calls) == 1
+
+
+def test_cache_shared_between_instances(tmp_path):
+    """Test workers sharing a cache directory reuse one computation."""
+    cache_dir = str(tmp_path / "cache")
+    first = ResultCache(cache_dir=cache_dir)
+    second = ResultCache(cache_dir=cache_dir)
+
+    assert first.get_or_compute("key", [], lambda: {"rows": 3}) == {"rows": 3}
+    assert second.get_or_compute("key", [], lambda: None) == {"rows": 3}
+
+    second.purge()
+    assert first.get_or_compute("other", [], lambda: 1) == 1
+    assert second.get_or_compute("key", [], lambda: None) is None
+
+
+def test_cache_purge_seen_by_other_instances(tmp_path):
+    """Test a purge by one worker stops the others serving their copies."""
+    cache_dir = str(tmp_path / "cache")
+    first = ResultCache(cache_dir=cache_dir)
+    second = ResultCache(cache_dir=cache_dir)
+
+    assert first.get_or_compute("key", [], lambda: "old") == "old"
+    assert second.get_or_compute("key", [], lambda: None) == "old"
+
+    second.purge()
+    assert first.get_or_compute("key", [], lambda: "new") == "new"
+    assert second.get_or_compute("key", [], lambda: None) == "new"
+
+
+def test_cache_maps_shared_arrays(tmp_path):
+    """Test stored arrays are read-only views of the shared file."""
+    cache_dir = str(tmp_path / "cache")
+    values = {"barcodes": np.arange(1000, dtype=np.int64), "name": "dataset"}
+    ResultCache(cache_dir=cache_dir).get_or_compute("key", [], lambda: values)
+
+    loaded = ResultCache(cache_dir=cache_dir).get_or_compute("key", [], lambda: None)
+
+    assert loaded["name"] == "dataset"
+    np.testing.assert_array_equal(loaded["barcodes"], values["barcodes"])
+    assert not loaded["barcodes"].flags.writeable
+    assert loaded["barcodes"].ctypes.data % 64 == 0
@@ -0,0 +1,94 @@
+import json
+import socket
+import threading
+
+from app.core.jobs import JobQueue
+
+
+def test_jobs_deduplicated_by_key():
+    """Test concurrent submissions for the same key share one job."""
+    queue = JobQueue(max_workers=2)
+    release = threading.Event()
+    calls = []
+
+    def run(job):
+        calls.append(job.id)
+        with job.stage("wait", 0.5):
+            release.wait(5)
+        return {"rows": 3}
+
+    first = queue.submit("fingerprint", run)
+    second = queue.submit("fingerprint", run)
+    other = queue.submit("other", run)
+    assert first is second
+    assert other is not first
+
+    release.set()
+    assert first.wait(5) and other.wait(5)
+    assert first.to_dict()["status"] == "succeeded"
+    assert first.result == {"rows": 3}
+    assert first.progress == 1.0
+    assert set(first.timings) == {"wait"}
+    assert len(calls) == 2
+
+    # Succeeded jobs keep absorbing submissions of their key
+    assert queue.submit("fingerprint", run) is first
+    assert len(calls) == 2
+
+
+def test_job_failure_and_inline_mode():
+    """Test failed jobs report their error and inline queues run on submit."""
+    queue = JobQueue(max_workers=0)
+
+    def fail(job):
+        raise ValueError("boom")
+
+    job = queue.submit("key", fail)
+
+    assert job.status == "failed"
+    assert job.error == "boom"
+    assert queue.get(job.id) is job
+    assert queue.get("unknown") is None
+
+    # A failed key runs again
+    retry = queue.submit("key", lambda job: {"rows": 1})
+    assert retry is not job
+    assert retry.status == "succeeded"
+
+
+def test_jobs_shared_between_queues(tmp_path):
+    """Test queues sharing a state directory see each other's jobs."""
+    first, second = JobQueue(max_workers=2, state_dir=tmp_path), JobQueue(
+        max_workers=0, state_dir=tmp_path
+    )
+    release = threading.Event()
+
+    def run(job):
+        with job.stage("wait", 0.5):
+            release.wait(5)
+        return {"rows": 3}
+
+    job = first.submit("fingerprint", run)
+    shared = second.submit("fingerprint", run)
+    assert shared.id == job.id
+    assert second.get(job.id).status in ("queued", "running")
+
+    release.set()
+    assert shared.wait(5)
+    assert second.get(job.id).to_dict()["result"] == {"rows": 3}
+    assert second.get(job.id).timings.keys() == {"wait"}
+    assert second.submit("fingerprint", run).id == job.id
+    assert second.get("../jobs") is None
+
+
+def test_jobs_of_exited_process_fail(tmp_path):
+    """Test a job left running by an exited process stops absorbing its key."""
+    queue = JobQueue(max_workers=0, state_dir=tmp_path)
+    job = queue.submit("key", lambda job: None)
+    record = json.loads((tmp_path / f"{job.id}.json").read_text())
+    record.update(status="running", owner=f"{socket.gethostname()}:999999999")
+    (tmp_path / f"{job.id}.json").write_text(json.dumps(record))
+
+    other = JobQueue(max_workers=0, state_dir=tmp_path)
+    assert other.get(job.id).status == "failed"
+    assert other.submit("key", lambda job: None).id != job.id
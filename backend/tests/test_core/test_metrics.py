@@ -0,0 +1,28 @@
+from app.core.metrics import init_request_metrics
+from flask import Flask
+from src.utils.metrics import Metrics
+
+
+def test_requests_measured_with_server_timing():
+    """Test requests are counted per URL rule and report their stages."""
+    app = Flask(__name__)
+    metrics = Metrics(enabled=True)
+    init_request_metrics(app, metrics)
+
+    @app.route("/orders/<int:customer_id>")
+    def orders(customer_id):
+        with metrics.stage("load_orders", rows=customer_id):
+            pass
+        return {"customer_id": customer_id}
+
+    client = app.test_client()
+    response = client.get("/orders/7")
+    client.get("/orders/8")
+
+    assert response.headers["Server-Timing"].startswith("load_orders;dur=")
+    text = metrics.render_prometheus()
+    assert (
+        'tiqets_http_request_seconds_count{method="GET",'
+        'endpoint="/orders/<int:customer_id>",status="200"} 2'
+    ) in text
+    assert 'tiqets_stage_rows_total{stage="load_orders"} 15' in text
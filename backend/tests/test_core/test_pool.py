@@ -0,0 +1,48 @@
+import pytest
+from app import create_app, db
+from app.core.config import engine_options
+from sqlalchemy import text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+
+def test_engine_options():
+    """Test pool options skip in-memory SQLite and set PostgreSQL timeouts."""
+    assert engine_options("sqlite:///:memory:") == {}
+    assert engine_options("sqlite://") == {}
+    assert engine_options("sqlite:////tmp/app.db", pool_size=3)["pool_size"] == 3
+
+    options = engine_options("postgresql://u:p@db/app", statement_timeout_ms=500)
+    assert options["connect_args"] == {"options": "-c statement_timeout=500"}
+
+
+def test_pool_checkouts_and_timeouts_reported(tmp_path):
+    """Test checkouts, waits and pool exhaustion show up in /api/metrics."""
+
+    class PoolConfig:
+        TESTING = True
+        SECRET_KEY = "test-secret-key"
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'pool.db'}"
+        SQLALCHEMY_ENGINE_OPTIONS = engine_options(
+            SQLALCHEMY_DATABASE_URI, pool_size=1, max_overflow=0, pool_timeout=1
+        )
+        METRICS_ENABLED = True
+        JOB_WORKERS = 0
+        INPUT_DIR = tmp_path / "input"
+        OUTPUT_DIR = tmp_path / "output"
+
+    app = create_app(PoolConfig)
+    with app.app_context():
+        with db.engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            # The only connection is taken, so a second checkout times out
+            with pytest.raises(PoolTimeoutError):
+                db.engine.connect()
+
+    stats = app.extensions["metrics"].pool_stats()["default"]
+    assert stats["checkouts"] == 1
+    assert stats["timeouts"] == 1
+    assert stats["wait_seconds"] >= 1
+
+    body = app.test_client().get("/api/metrics").get_data(as_text=True)
+    assert 'tiqets_db_pool_timeouts_total{pool="default"} 1' in body
+    assert 'tiqets_db_pool_connections{pool="default",state="size"} 1' in body
@@ -0,0 +1,49 @@
+import pandas as pd
+from src.data_processing.analytics import (
+    top_customers_from_csv,
+    top_customers_from_stream,
+)
+from src.data_processing.dataset import ProcessedDataset
+
+
+def _processed_df():
+    return pd.DataFrame(
+        {
+            "customer_id": [101, 101, 102, 103, 104],
+            "order_id": [1, 2, 3, 4, 5],
+            "barcode": [[1001], [1002, 1003], [1004, 1005, 1006], [1007], [1008]],
+        }
+    )
+
+
+def test_dataset_top_customers_matches_explode():
+    """Test precomputed ranking matches counting exploded barcodes."""
+    df = _processed_df()
+    expected = df.explode("barcode").groupby("customer_id").size().nlargest(4)
+
+    dataset = ProcessedDataset.from_frame(df)
+
+    assert dataset.top_customers(4) == list(expected.items())
+    assert dataset.top_customers(1) == [(101, 3)]
+    assert dataset.top_customers(100) == [(101, 3), (102, 3), (103, 1), (104, 1)]
+
+
+def test_top_customers_from_stream():
+    """Test the heap-based path over rows grouped by customer."""
+    rows = [(101, 1), (101, 2), (102, 3), (103, 1), (104, 5)]
+
+    assert top_customers_from_stream(rows, 2) == [(104, 5), (101, 3)]
+    assert top_customers_from_stream(rows, 3) == [(104, 5), (101, 3), (102, 3)]
+    assert top_customers_from_stream([], 3) == []
+
+
+def test_top_customers_from_csv(tmp_path):
+    """Test top customers can be read from the processed output file."""
+    path = tmp_path / "processed_orders.csv"
+    _processed_df().to_csv(path, index=False)
+
+    assert top_customers_from_csv(path, 3, chunksize=2) == [
+        (101, 3),
+        (102, 3),
+        (103, 1),
+    ]
@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+from src.data_processing.bitmap import BarcodeIndex, RoaringBitmap
+from src.data_processing.dataset import ProcessedDataset
+
+
+def test_set_operations_match_python_sets():
+    """Test array and bitmap containers give the same results as sets."""
+    rng = np.random.default_rng(0)
+    # A dense barcode range becomes bitmap containers, random values arrays
+    dense = np.arange(11111111111, 11111111111 + 150_000)
+    sparse = rng.integers(11111100000, 11111400000, 20_000)
+    left, right = RoaringBitmap.from_values(dense), RoaringBitmap.from_values(sparse)
+    dense_set, sparse_set = set(dense.tolist()), set(sparse.tolist())
+
+    assert len(left) == len(dense_set)
+    assert (left | right).to_array().tolist() == sorted(dense_set | sparse_set)
+    assert (left & right).to_array().tolist() == sorted(dense_set & sparse_set)
+    assert (left - right).to_array().tolist() == sorted(dense_set - sparse_set)
+    assert (right - left).to_array().tolist() == sorted(sparse_set - dense_set)
+    assert left.intersection_count(right) == len(dense_set & sparse_set)
+
+    queries = rng.integers(11111000000, 11111500000, 1000)
+    assert left.contains(queries).tolist() == [q in dense_set for q in queries]
+    assert 11111111111 in left and 11111111110 not in left
+    assert left.nbytes < dense.nbytes / 10
+
+
+def test_barcode_index_persists(tmp_path):
+    """Test the index answers unused and order questions after a round trip."""
+    barcodes_df = pd.DataFrame(
+        {
+            "barcode": [1003, 1001, 1002, 1004],
+            "order_id": pd.array([2, 1, None, None], dtype="Int64"),
+        }
+    )
+    index = BarcodeIndex.from_frame(barcodes_df)
+    index.save(tmp_path / "index.npz")
+    loaded = BarcodeIndex.load(tmp_path / "index.npz")
+
+    assert loaded.unused.to_array().tolist() == [1002, 1004]
+    assert loaded.sold == index.sold
+    assert loaded.orders.contains([1, 2, 3]).tolist() == [True, True, False]
+
+    # The processed dataset of the same barcodes gives the same index
+    dataset = ProcessedDataset.from_frame(
+        pd.DataFrame(
+            {"customer_id": [101, 102], "order_id": [1, 2], "barcode": [[1001], [1003]]}
+        ),
+        np.array([1002, 1004]),
+    )
+    from_dataset = BarcodeIndex.from_dataset(dataset)
+    for name in BarcodeIndex.NAMES:
+        assert getattr(from_dataset, name) == getattr(index, name)
+
+
+def test_update_in_place_matches_union():
+    """Test adding chunks in place gives the union with per-container counts."""
+    rng = np.random.default_rng(1)
+    chunks = [
+        np.arange(11111111111, 11111111111 + 70_000),
+        rng.integers(11111100000, 11111400000, 5_000),
+        np.arange(11111300000, 11111300010),
+    ]
+    bitmap, expected = RoaringBitmap(), RoaringBitmap()
+    for chunk in chunks:
+        bitmap.update(chunk)
+        expected = expected | RoaringBitmap.from_values(chunk)
+
+    assert bitmap == expected
+    assert len(bitmap) == len(set(np.concatenate(chunks).tolist()))
+    assert (
+        bitmap.counts.tolist()
+        == RoaringBitmap(bitmap.keys, bitmap.containers).counts.tolist()
+    )
@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+from src.data_processing.dataset import ProcessedDataset
+
+
+def test_customer_index():
+    """Test the customer index maps customers to their row ranges."""
+    df = pd.DataFrame(
+        {
+            "order_id": [3, 1, 2, 4],
+            "customer_id": [101, 101, 102, 104],
+            "barcode": [[1003], [1001, 1002], [1004], [1005]],
+        }
+    )
+    dataset = ProcessedDataset.from_frame(df)
+
+    assert dataset.customer_ids.tolist() == [101, 102, 104]
+    assert dataset.customer_offsets.tolist() == [0, 2, 3, 4]
+    assert dataset.barcode_offsets.tolist() == [0, 2, 3, 4, 5]
+    assert dataset.order_ids[dataset.customer_orders(101)].tolist() == [1, 3]
+    assert dataset.to_frame(dataset.customer_orders(104))["barcode"].tolist() == [
+        [1005]
+    ]
+
+
+def test_customer_index_missing_customer():
+    """Test lookups of unknown customers return no rows."""
+    df = pd.DataFrame({"order_id": [1], "customer_id": [101], "barcode": [[1001]]})
+    dataset = ProcessedDataset.from_frame(df)
+
+    assert not dataset.customer_orders(100)
+    assert not dataset.customer_orders(102)
+    assert not ProcessedDataset.from_frame(df.iloc[0:0]).customer_orders(101)
+
+
+def test_from_inputs_matches_list_representation():
+    """Test building from validated inputs matches the grouped lists."""
+    orders_df = pd.DataFrame({"order_id": [2, 1, 3], "customer_id": [102, 101, 101]})
+    barcodes_df = pd.DataFrame(
+        {
+            "barcode": [1004, 1001, 1003, 1002, 1005],
+            "order_id": pd.array([1, 1, None, 2, 9], dtype="Int64"),
+        }
+    )
+    dataset = ProcessedDataset.from_inputs(orders_df, barcodes_df)
+
+    # Order 3 has no barcodes and barcode 1005 belongs to an unknown order
+    assert dataset.to_frame().to_dict("list") == {
+        "order_id": [1, 2],
+        "customer_id": [101, 102],
+        "barcode": [[1004, 1001], [1002]],
+    }
+    assert dataset.unused_barcodes.tolist() == [1003]
+    assert dataset.order_ids.dtype == np.int32
+    assert dataset.barcodes.dtype == np.int64
+
+
+def test_to_csv_matches_list_output(tmp_path):
+    """Test the compact writer produces the processed_orders.csv format."""
+    df = pd.DataFrame(
+        {
+            "customer_id": [101, 102],
+            "order_id": [1, 2],
+            "barcode": [[11111111111, 11111111112], [11111111113]],
+        }
+    )
+    df.to_csv(tmp_path / "expected.csv", index=False)
+
+    ProcessedDataset.from_frame(df).to_csv(tmp_path / "compact.csv")
+
+    assert (tmp_path / "compact.csv").read_text() == (
+        tmp_path / "expected.csv"
+    ).read_text()
@@ -0,0 +1,155 @@
+from app.models.models import Barcode, Order
+from src.data_processing.incremental import IncrementalProcessor
+from src.data_processing.processor import OrderProcessor
+from src.utils.logger import setup_logger
+
+
+def _processor(sample_data):
+    return OrderProcessor(
+        setup_logger(),
+        input_dir=str(sample_data["input_dir"]),
+        output_dir=str(sample_data["output_dir"]),
+    )
+
+
+def _append(path, lines):
+    with open(path, "a") as f:
+        f.write("".join(f"{line}\n" for line in lines))
+
+
+def test_incremental_first_run_is_full(sample_data):
+    """Test the first incremental run treats every order as changed."""
+    processor = _processor(sample_data)
+    result_df, delta_df = IncrementalProcessor(processor).run()
+
+    assert result_df["order_id"].tolist() == [1, 2]
+    assert delta_df["barcode"].tolist() == [[1001, 1002], [1003]]
+    assert (sample_data["output_dir"] / "processed_orders.csv").exists()
+
+
+def test_incremental_appended_rows(sample_data):
+    """Test appended rows yield only new orders and new barcodes."""
+    processor = _processor(sample_data)
+    IncrementalProcessor(processor).run()
+
+    _append(sample_data["input_dir"] / "orders.csv", ["4,103"])
+    _append(sample_data["input_dir"] / "barcodes.csv", ["1005,4.0", "1006,3.0"])
+
+    result_df, delta_df = IncrementalProcessor(processor).run()
+
+    # Order 3 only becomes valid now that it has a barcode
+    assert result_df["order_id"].tolist() == [1, 3, 2, 4]
+    assert delta_df[["order_id", "barcode"]].values.tolist() == [
+        [3, [1006]],
+        [4, [1005]],
+    ]
+
+    # Nothing changed since the last run
+    _, delta_df = IncrementalProcessor(processor).run()
+    assert delta_df.empty
+
+
+def test_incremental_rewritten_file(sample_data):
+    """Test rewritten inputs are diffed to find barcodes that became sold."""
+    processor = _processor(sample_data)
+    IncrementalProcessor(processor).run()
+
+    barcodes = sample_data["barcodes"].copy()
+    barcodes.loc[barcodes["barcode"] == 1004, "order_id"] = 2.0
+    barcodes.to_csv(sample_data["input_dir"] / "barcodes.csv", index=False)
+
+    result_df, delta_df = IncrementalProcessor(processor).run()
+
+    assert result_df.set_index("order_id")["barcode"][2] == [1003, 1004]
+    assert delta_df[["order_id", "barcode"]].values.tolist() == [[2, [1004]]]
+
+
+def test_incremental_database_delta(app, sample_data):
+    """Test applying deltas keeps one database order per source order."""
+    with app.app_context():
+        processor = _processor(sample_data)
+        IncrementalProcessor(processor).run(apply_delta=processor.bulk_save_to_database)
+
+        _append(sample_data["input_dir"] / "barcodes.csv", ["1005,1.0"])
+        IncrementalProcessor(processor).run(apply_delta=processor.bulk_save_to_database)
+
+        assert Order.query.count() == 2
+        order = Order.query.filter_by(source_order_id=1).one()
+        assert sorted(b.barcode_value for b in order.barcodes) == [1001, 1002, 1005]
+        assert Barcode.query.count() == 5
+
+
+def test_incremental_database_unused_barcodes(app, sample_data):
+    """Test new unused barcodes reach the database with the delta."""
+    with app.app_context():
+        processor = _processor(sample_data)
+        IncrementalProcessor(processor).run(apply_delta=processor.bulk_save_to_database)
+
+        # Only unused barcodes were appended, so no order changed
+        _append(sample_data["input_dir"] / "barcodes.csv", ["1005,", "1006,"])
+        _, delta_df = IncrementalProcessor(processor).run(
+            apply_delta=processor.bulk_save_to_database
+        )
+
+        assert delta_df.empty
+        unused = Barcode.query.filter(Barcode.order_id.is_(None))
+        assert sorted(b.barcode_value for b in unused) == [1004, 1005, 1006]
+
+
+def test_incremental_last_line_without_newline(sample_data):
+    """Test the last row is read at the end of a file without a newline."""
+    processor = _processor(sample_data)
+    path = sample_data["input_dir"] / "barcodes.csv"
+    path.write_bytes(path.read_bytes().rstrip(b"\n"))
+
+    result_df, _ = IncrementalProcessor(processor).run()
+    assert result_df["barcode"].tolist() == [[1001, 1002], [1003]]
+
+    # The unterminated row is consumed, so an appended line is separate
+    with open(path, "a") as f:
+        f.write("\n1005,2.0\n")
+    _, delta_df = IncrementalProcessor(processor).run()
+    assert delta_df[["order_id", "barcode"]].values.tolist() == [[2, [1005]]]
+
+    # Extending an unterminated row reloads the file instead of misreading it
+    with open(path, "a") as f:
+        f.write("1006")
+    IncrementalProcessor(processor).run()
+    with open(path, "a") as f:
+        f.write(",1.0\n")
+    _, delta_df = IncrementalProcessor(processor).run()
+    assert delta_df[["order_id", "barcode"]].values.tolist() == [[1, [1006]]]
+
+
+def test_incremental_appended_bad_lines(sample_data):
+    """Test appended bad lines are dropped and reported by file line."""
+    processor = _processor(sample_data)
+    IncrementalProcessor(processor).run()
+
+    _append(sample_data["input_dir"] / "barcodes.csv", ["1005,2.0", "x,1.0"])
+    _, delta_df = IncrementalProcessor(processor).run()
+
+    assert delta_df[["order_id", "barcode"]].values.tolist() == [[2, [1005]]]
+    report = processor.loader.bad_lines["barcodes.csv"].to_frame()
+    assert report["row"].tolist() == [7]
+
+
+def test_incremental_moved_barcodes_left_out(app, sample_data):
+    """Test barcodes moved to another order stay with their stored order."""
+    with app.app_context():
+        processor = _processor(sample_data)
+        IncrementalProcessor(processor).run(apply_delta=processor.bulk_save_to_database)
+
+        barcodes = sample_data["barcodes"].copy()
+        barcodes.loc[barcodes["barcode"] == 1003, "order_id"] = 1.0
+        barcodes.loc[barcodes["barcode"] == 1004, "order_id"] = 2.0
+        barcodes.to_csv(sample_data["input_dir"] / "barcodes.csv", index=False)
+        result_df, delta_df = IncrementalProcessor(processor).run(
+            apply_delta=processor.bulk_save_to_database
+        )
+
+        # The processed file follows the input, the delta only sells 1004
+        assert result_df.set_index("order_id")["barcode"][1] == [1001, 1002, 1003]
+        assert delta_df[["order_id", "barcode"]].values.tolist() == [[2, [1004]]]
+        stored = {b.barcode_value: b.order.source_order_id for b in Barcode.query}
+        assert stored == {1001: 1, 1002: 1, 1003: 2, 1004: 2}
@@ -0,0 +1,108 @@
+import numpy as np
+import pytest
+from src.data_processing.inventory import BarcodeInventory
+from src.exceptions import InventoryError
+
+
+def test_count_and_pages(app):
+    """Test unsorted input is ordered and paged after a cursor."""
+    inventory = BarcodeInventory([1005, 1001, 1003, 1002])
+
+    assert len(inventory) == 4
+    assert inventory.page(limit=2).tolist() == [1001, 1002]
+    assert inventory.page(after=1002, limit=5).tolist() == [1003, 1005]
+    assert inventory.page(after=1005).tolist() == []
+
+
+def test_allocate_and_release(app):
+    """Test allocations take the lowest barcodes and releases return them."""
+    inventory = BarcodeInventory(np.arange(1001, 1006))
+
+    assert inventory.allocate(2).tolist() == [1001, 1002]
+    assert len(inventory) == 3
+    assert inventory.page().tolist() == [1003, 1004, 1005]
+    assert inventory.page(limit=2).tolist() == [1003, 1004]
+
+    with pytest.raises(InventoryError):
+        inventory.allocate(4)
+    assert len(inventory) == 3
+
+    # Only allocated barcodes can be released
+    with pytest.raises(InventoryError):
+        inventory.release([1003])
+    with pytest.raises(InventoryError):
+        inventory.release([999])
+
+    assert inventory.release([1002]) == 1
+    assert inventory.page().tolist() == [1002, 1003, 1004, 1005]
+    assert inventory.allocate(1).tolist() == [1002]
+
+
+def test_separate_inventories_share_allocations(app, monkeypatch):
+    """Test two inventories, as in two workers, never allocate a barcode twice."""
+    first = BarcodeInventory(np.arange(1001, 1006))
+    second = BarcodeInventory(np.arange(1001, 1006))
+
+    assert first.allocate(2).tolist() == [1001, 1002]
+    assert len(second) == 3
+    assert second.allocate(2).tolist() == [1003, 1004]
+
+    # A worker that has not seen the latest allocations still skips them
+    monkeypatch.setattr(
+        second,
+        "_reserved",
+        lambda within=None: np.array([], dtype=np.int64),
+        raising=False,
+    )
+    assert second.allocate(1).tolist() == [1005]
+    with pytest.raises(InventoryError):
+        second.allocate(1)
+    monkeypatch.undo()
+
+    # Allocations outlive the inventory that made them
+    assert first.release([1003]) == 1
+    assert BarcodeInventory(np.arange(1001, 1006)).page().tolist() == [1003]
+    assert len(second) == 1
+
+
+def test_reads_skip_allocated_prefix(app, monkeypatch):
+    """Test counts and pages do not read the reservations below the page."""
+    inventory = BarcodeInventory(np.arange(1001, 2001))
+    inventory.allocate(500)
+
+    read = []
+    reserved = inventory._reserved
+
+    def tracked(within=None):
+        read.append(None if within is None else (within[0], within[-1]))
+        return reserved(within)
+
+    monkeypatch.setattr(inventory, "_reserved", tracked, raising=False)
+    assert len(inventory) == 500
+    assert inventory.page(limit=2).tolist() == [1501, 1502]
+    assert read == [(1501, 1502)]
+
+    # A release lowers the floor to the released barcode
+    inventory.release([1002])
+    assert inventory.page(limit=2).tolist() == [1002, 1501]
+    assert inventory.allocate(2).tolist() == [1002, 1501]
+    assert inventory.page(limit=1).tolist() == [1502]
+
+
+def test_new_input_drops_stale_reservations(app):
+    """Test reservations of barcodes sold in a new input are dropped."""
+    old = BarcodeInventory([1001, 1002, 1003])
+    assert old.allocate(2).tolist() == [1001, 1002]
+
+    # 1001 was sold in the new input and 1004 is a new unused barcode
+    new = BarcodeInventory([1002, 1003, 1004])
+    assert len(new) == 2
+    assert new.page().tolist() == [1003, 1004]
+    with pytest.raises(InventoryError):
+        new.release([1001])
+
+    # The outdated inventory can no longer allocate uncounted
+    with pytest.raises(InventoryError):
+        old.allocate(1)
+    assert new.allocate(1).tolist() == [1003]
+    assert len(new) == 1
@@ -1,9 +1,13 @@
+import logging
 import tempfile
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 import pytest
+from src.data_processing.dedup import DUPLICATES_FILE, duplicate_mask
 from src.data_processing.loader import DataLoader
+from src.exceptions import SchemaValidationError
 
 
 @pytest.fixture
@@ -83,6 +87,42 @@ def test_duplicate_barcodes(test_data_dir):
     assert len(result_df[result_df["barcode"] == 1001]) == 1
 
 
+def test_duplicate_barcodes_side_file(test_data_dir, tmp_path, caplog):
+    """Test all duplicates go to the side file while the log is capped."""
+    barcodes = list(range(1000, 1050)) * 2  # unsorted: 50 duplicates
+    pd.DataFrame({"barcode": barcodes, "order_id": [None] * 100}).to_csv(
+        test_data_dir / "barcodes.csv", index=False
+    )
+
+    loader = DataLoader(str(test_data_dir), duplicates_dir=str(tmp_path))
+    with caplog.at_level(logging.WARNING):
+        result_df = loader.load_barcodes()
+
+    assert result_df["barcode"].tolist() == list(range(1000, 1050))
+    side_file = pd.read_csv(tmp_path / DUPLICATES_FILE)
+    assert side_file["barcode"].tolist() == list(range(1000, 1050))
+    assert f"Found 50 duplicate barcodes: {list(range(1000, 1020))}" in caplog.text
+
+
+def test_duplicate_mask():
+    """Test sorted and unsorted inputs flag repeats after the first one."""
+    assert duplicate_mask(np.array([1, 1, 2, 3, 3, 3])).tolist() == [
+        False,
+        True,
+        False,
+        False,
+        True,
+        True,
+    ]
+    assert duplicate_mask(np.array([3, 1, 3, 2, 1])).tolist() == [
+        False,
+        False,
+        True,
+        False,
+        True,
+    ]
+
+
 def test_invalid_data(test_data_dir):
     """Test handling of invalid data in CSV files."""
     # Create invalid orders data
@@ -92,3 +132,103 @@ def test_invalid_data(test_data_dir):
     loader = DataLoader(str(test_data_dir))
     with pytest.raises(Exception):
         loader.load_orders()
+
+
+def test_load_pins_dtypes(test_data_dir):
+    """Test well-formed inputs parse straight into their pinned dtypes."""
+    loader = DataLoader(str(test_data_dir))
+
+    assert loader.load_orders().dtypes.tolist() == [np.int64, np.int64]
+    barcodes_df = loader.load_barcodes()
+    assert barcodes_df["barcode"].dtype == np.int64
+    assert barcodes_df["order_id"].dtype == "Int64"
+    assert barcodes_df["order_id"].tolist() == [1, 1, 2, pd.NA]
+    assert loader.bad_lines == {}
+
+
+def test_load_reports_bad_lines(test_data_dir, tmp_path, caplog):
+    """Test malformed lines are dropped and reported without aborting."""
+    (test_data_dir / "barcodes.csv").write_text(
+        "barcode,order_id\n1001,1\n1002,1,7\nabc,2\n1003,\n1004,2.5\n1005,2\n"
+    )
+
+    loader = DataLoader(str(test_data_dir), duplicates_dir=str(tmp_path))
+    with caplog.at_level(logging.WARNING):
+        barcodes_df = loader.load_barcodes()
+
+    assert barcodes_df["barcode"].tolist() == [1001, 1003, 1005]
+    assert barcodes_df["order_id"].tolist() == [1, pd.NA, 2]
+    expected = [
+        {"line": 3, "column": "*", "reason": "expected 2 fields, saw 3"},
+        {"line": 4, "column": "barcode", "reason": "not an integer"},
+        {"line": 6, "column": "order_id", "reason": "not an integer"},
+    ]
+    report = loader.bad_lines["barcodes.csv"].to_frame()
+    assert report.rename(columns={"row": "line"}).to_dict("records") == expected
+    side_file = pd.read_csv(tmp_path / "bad_lines_barcodes.csv")
+    assert side_file.to_dict("records") == expected
+    assert "Dropped bad lines of barcodes.csv: 3 invalid values" in caplog.text
+
+
+def test_iter_barcodes_checks_duplicates_across_chunks(test_data_dir, tmp_path):
+    """Test streamed barcodes drop repeats of earlier chunks like a full load."""
+    (test_data_dir / "barcodes.csv").write_text(
+        "barcode,order_id\n1001,1\n1002,1\n1003,2\n1001,2\n1004,\n1002,\n"
+    )
+
+    loader = DataLoader(str(test_data_dir), duplicates_dir=str(tmp_path))
+    chunks = list(loader.iter_barcodes(chunksize=2))
+
+    assert [chunk["barcode"].tolist() for chunk in chunks] == [
+        [1001, 1002],
+        [1003],
+        [1004],
+    ]
+    side_file = pd.read_csv(tmp_path / DUPLICATES_FILE)
+    assert side_file["barcode"].tolist() == [1001, 1002]
+
+
+def test_iter_orders_reports_rows_across_chunks(test_data_dir):
+    """Test repeated streamed orders are reported by their position."""
+    (test_data_dir / "orders.csv").write_text(
+        "order_id,customer_id\n1,101\n2,102\n3,101\n2,103\n"
+    )
+
+    loader = DataLoader(str(test_data_dir))
+    with pytest.raises(SchemaValidationError) as excinfo:
+        list(loader.iter_orders(chunksize=2))
+    assert excinfo.value.report.rows.tolist() == [3]
+
+
+def test_iter_barcodes_drops_bad_lines_like_load(test_data_dir, tmp_path):
+    """Test streamed chunks drop and report the bad lines of a full load."""
+    (test_data_dir / "barcodes.csv").write_text(
+        "barcode,order_id\n1001,1\n1002,1,7\nabc,2\n1003,\n1004,2.5\n1005,2"
+    )
+
+    loader = DataLoader(str(test_data_dir), duplicates_dir=str(tmp_path))
+    streamed = pd.concat(list(loader.iter_barcodes(chunksize=2)))
+    streamed_lines = loader.bad_lines["barcodes.csv"].to_frame()
+
+    loader = DataLoader(str(test_data_dir))
+    loaded = loader.load_barcodes()
+
+    assert streamed["barcode"].tolist() == loaded["barcode"].tolist()
+    assert streamed["order_id"].tolist() == [1, pd.NA, 2]
+    assert streamed["order_id"].dtype == "Int64"
+    pd.testing.assert_frame_equal(
+        streamed_lines, loader.bad_lines["barcodes.csv"].to_frame()
+    )
+    assert (tmp_path / "bad_lines_barcodes.csv").exists()
+
+
+def test_load_drops_lines_with_extra_fields(test_data_dir):
+    """Test a line with an extra field is not accepted by the typed parse."""
+    (test_data_dir / "orders.csv").write_text(
+        "order_id,customer_id\n1,101\n2,102,7\n3,101\n"
+    )
+
+    loader = DataLoader(str(test_data_dir))
+
+    assert loader.load_orders()["order_id"].tolist() == [1, 3]
+    assert loader.bad_lines["orders.csv"].rows.tolist() == [3]
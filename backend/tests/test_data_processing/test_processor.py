@@ -1,7 +1,12 @@
 from pathlib import Path
 
 import pandas as pd
+import pytest
+from app import db
+from app.models.models import Barcode, CustomerTicketStats, Order
+from benchmarks.datagen import generate_dataset
 from src.data_processing.processor import OrderProcessor
+from src.data_processing.queries import DatabaseQueries
 from src.utils.logger import setup_logger
 
 
@@ -97,3 +102,222 @@ def test_save_results(app, sample_data):
         assert all(
             col in saved_data.columns for col in ["customer_id", "order_id", "barcode"]
         )
+
+
+def test_bulk_save_to_database(app, sample_data):
+    """Test bulk database ingestion and its insert/skip report."""
+    with app.app_context():
+        processor = OrderProcessor(
+            setup_logger(),
+            input_dir=str(sample_data["input_dir"]),
+            output_dir=str(sample_data["output_dir"]),
+        )
+        processor.loader.input_dir = sample_data["input_dir"]
+        result_df = processor.process()
+
+        stats = processor.bulk_save_to_database(result_df, batch_size=1)
+        assert stats["customers"] == {"inserted": 2, "updated": 0, "skipped": 0}
+        assert stats["orders"] == {"inserted": 2, "updated": 0, "skipped": 0}
+        assert stats["barcodes"] == {"inserted": 3, "updated": 0, "skipped": 0}
+
+        # Re-running skips everything that is already stored
+        stats = processor.bulk_save_to_database(result_df)
+        assert stats["customers"] == {"inserted": 0, "updated": 0, "skipped": 2}
+        assert stats["orders"] == {"inserted": 0, "updated": 0, "skipped": 2}
+        assert stats["barcodes"] == {"inserted": 0, "updated": 0, "skipped": 3}
+
+        assert Order.query.count() == 2
+        assert Barcode.query.count() == 3
+        assert {b.order.customer_id for b in Barcode.query.all()} == {101, 102}
+
+
+def test_bulk_save_counts_orders_with_new_barcodes(app, sample_data):
+    """Test stored orders that receive new barcodes are reported as updated."""
+    with app.app_context():
+        processor = OrderProcessor(
+            setup_logger(),
+            input_dir=str(sample_data["input_dir"]),
+            output_dir=str(sample_data["output_dir"]),
+        )
+        result_df = pd.DataFrame(
+            {"customer_id": [101, 102], "order_id": [1, 2], "barcode": [[1001], [1003]]}
+        )
+        processor.bulk_save_to_database(result_df)
+
+        # Order 1 keeps its customer and gains barcode 1002
+        result_df.at[0, "barcode"] = [1001, 1002]
+        stats = processor.bulk_save_to_database(result_df)
+        assert stats["orders"] == {"inserted": 0, "updated": 1, "skipped": 1}
+        assert stats["barcodes"] == {"inserted": 1, "updated": 0, "skipped": 2}
+
+        order = Order.query.filter_by(source_order_id=1).one()
+        assert sorted(b.barcode_value for b in order.barcodes) == [1001, 1002]
+
+
+def test_bulk_save_stores_unused_barcodes(app, sample_data):
+    """Test unused barcodes are stored and assigned once sold, with ticket counts."""
+    with app.app_context():
+        processor = OrderProcessor(
+            setup_logger(),
+            input_dir=str(sample_data["input_dir"]),
+            output_dir=str(sample_data["output_dir"]),
+        )
+        processor.loader.input_dir = sample_data["input_dir"]
+        dataset = processor.process_dataset()
+
+        stats = processor.bulk_save_to_database(dataset)
+        assert stats["barcodes"] == {"inserted": 4, "updated": 0, "skipped": 0}
+
+        # Barcode 1004 is sold to order 2 now
+        barcodes = sample_data["barcodes"].copy()
+        barcodes.loc[barcodes["barcode"] == 1004, "order_id"] = 2.0
+        barcodes.to_csv(sample_data["input_dir"] / "barcodes.csv", index=False)
+        processor = OrderProcessor(
+            setup_logger(),
+            input_dir=str(sample_data["input_dir"]),
+            output_dir=str(sample_data["output_dir"]),
+        )
+        stats = processor.bulk_save_to_database(processor.process_dataset())
+        assert stats["orders"] == {"inserted": 0, "updated": 1, "skipped": 1}
+        assert stats["barcodes"] == {"inserted": 0, "updated": 1, "skipped": 3}
+
+        order = Order.query.filter_by(source_order_id=2).one()
+        assert sorted(b.barcode_value for b in order.barcodes) == [1003, 1004]
+        assert Barcode.query.count() == 4
+        assert Barcode.query.filter(Barcode.order_id.is_(None)).count() == 0
+
+        # Ticket counts were incremented on ingest and match a full rebuild
+        counts = {s.customer_id: s.ticket_count for s in CustomerTicketStats.query}
+        assert counts == {101: 2, 102: 2}
+        assert DatabaseQueries().top_customers(limit=1) == [(101, 2)]
+        DatabaseQueries().rebuild_ticket_stats()
+        assert {
+            s.customer_id: s.ticket_count for s in CustomerTicketStats.query
+        } == counts
+
+
+def test_save_to_database_upserts_orders(app, sample_data):
+    """Test both save paths upsert orders by source order ID."""
+    with app.app_context():
+
+        def process():
+            processor = OrderProcessor(
+                setup_logger(),
+                input_dir=str(sample_data["input_dir"]),
+                output_dir=str(sample_data["output_dir"]),
+            )
+            return processor, processor.process_dataset()
+
+        processor, dataset = process()
+        processor.save_to_database(dataset.to_frame())
+        processor.save_to_database(dataset.to_frame())
+        assert processor.bulk_save_to_database(dataset)["orders"] == {
+            "inserted": 0,
+            "updated": 0,
+            "skipped": 2,
+        }
+
+        # Order 2 moves to customer 101 and takes its ticket along
+        orders = sample_data["orders"].copy()
+        orders.loc[orders["order_id"] == 2, "customer_id"] = 101
+        orders.to_csv(sample_data["input_dir"] / "orders.csv", index=False)
+        processor, dataset = process()
+        stats = processor.bulk_save_to_database(dataset)
+        assert stats["orders"] == {"inserted": 0, "updated": 1, "skipped": 1}
+        assert stats["barcodes"]["inserted"] == 0
+
+        assert Order.query.count() == 2
+        assert {o.source_order_id: o.customer_id for o in Order.query} == {
+            1: 101,
+            2: 101,
+        }
+        assert DatabaseQueries().top_customers() == [(101, 3)]
+
+
+def test_process_streaming_matches_in_memory(app, sample_data):
+    """Test streaming mode writes the same output as the in-memory path."""
+    with app.app_context():
+        output_dir = Path(sample_data["output_dir"])
+        processor = OrderProcessor(
+            setup_logger(),
+            input_dir=str(sample_data["input_dir"]),
+            output_dir=str(output_dir),
+        )
+        processor.loader.input_dir = sample_data["input_dir"]
+
+        processor.save_results(processor.process())
+        expected = (output_dir / "processed_orders.csv").read_text()
+
+        # A tiny budget forces single-row chunks and several partitions
+        output_path = processor.process_streaming(
+            memory_budget_mb=0.0001, output_path=output_dir / "streamed.csv"
+        )
+
+        assert output_path.read_text() == expected
+        assert sorted(p.name for p in output_dir.iterdir()) == [
+            "barcode_index.npz",
+            "processed_orders.csv",
+            "streamed.csv",
+        ]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_process_parallel_matches_in_memory(tmp_path, workers):
+    """Test parallel mode returns the same data as the in-memory path."""
+    generate_dataset(
+        str(tmp_path), orders=500, customers=40, missing_barcode_rate=0.05, seed=3
+    )
+    processor = OrderProcessor(
+        setup_logger(), input_dir=str(tmp_path), output_dir=str(tmp_path / "out")
+    )
+
+    expected = processor.process().reset_index(drop=True)
+    result = processor.process_parallel(workers=workers, partition_size=60)
+
+    pd.testing.assert_frame_equal(result, expected)
+
+
+def test_process_dataset_matches_in_memory(tmp_path):
+    """Test the compact dataset holds the same orders as process()."""
+    generate_dataset(str(tmp_path), orders=300, customers=30, seed=5)
+    processor = OrderProcessor(
+        setup_logger(), input_dir=str(tmp_path), output_dir=str(tmp_path / "out")
+    )
+
+    expected = processor.process()
+    dataset = processor.process_dataset()
+
+    pd.testing.assert_frame_equal(
+        dataset.to_frame(), expected.reset_index(drop=True)[dataset.to_frame().columns]
+    )
+    assert processor.get_top_customers(dataset, 3) == processor.get_top_customers(
+        expected, 3
+    )
+    assert processor.get_unused_barcodes(dataset)[0] == (
+        processor.get_unused_barcodes(expected)[0]
+    )
+
+
+def test_bulk_save_counts_only_inserted_barcodes(app, sample_data, monkeypatch):
+    """Test barcodes stored concurrently since the lookup count as skipped."""
+    with app.app_context():
+        processor = OrderProcessor(
+            setup_logger(),
+            input_dir=str(sample_data["input_dir"]),
+            output_dir=str(sample_data["output_dir"]),
+        )
+        dataset = processor.process_dataset()
+        processor.bulk_save_to_database(dataset)
+
+        # Another worker stored barcode 1005 after this one looked it up
+        db.session.add(Barcode(barcode_value=1005))
+        db.session.commit()
+        monkeypatch.setattr(
+            processor, "_fetch_existing_barcodes", lambda values, batch_size: {}
+        )
+        stats = processor.bulk_save_to_database(
+            dataset.to_frame().iloc[:0], unused_barcodes=[1005, 1006]
+        )
+
+        assert stats["barcodes"] == {"inserted": 1, "updated": 0, "skipped": 1}
+        assert Barcode.query.count() == 6
@@ -0,0 +1,88 @@
+import os
+
+import pandas as pd
+from src.data_processing.loader import DataLoader
+from src.data_processing.snapshot import SnapshotCache
+
+
+def test_snapshot_roundtrip(tmp_path):
+    """Test a saved snapshot is loaded back with its dtypes."""
+    source = tmp_path / "barcodes.csv"
+    df = pd.DataFrame(
+        {"barcode": [1001, 1002], "order_id": pd.array([1, None], dtype="Int64")}
+    )
+    df.to_csv(source, index=False)
+
+    cache = SnapshotCache(tmp_path / "cache")
+    assert cache.load(source) is None
+
+    cache.save(source, df)
+    cached = cache.load(source)
+
+    pd.testing.assert_frame_equal(cached, df)
+
+
+def test_snapshot_invalidation(tmp_path):
+    """Test snapshots follow source size, mtime and content changes."""
+    source = tmp_path / "orders.csv"
+    df = pd.DataFrame({"order_id": [1, 2], "customer_id": [101, 102]})
+    df.to_csv(source, index=False)
+
+    cache = SnapshotCache(tmp_path / "cache")
+    cache.save(source, df)
+
+    # Touching the file keeps the snapshot since the content is unchanged
+    stat = source.stat()
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert cache.load(source) is not None
+
+    # Same size, different content
+    source.write_text(source.read_text().replace("101", "103"))
+    assert cache.load(source) is None
+
+
+def test_snapshot_same_name_in_other_directory(tmp_path):
+    """Test inputs with the same name in different directories keep their own."""
+    cache = SnapshotCache(tmp_path / "cache")
+    frames = {}
+    for name, customer_id in (("a", 101), ("b", 102)):
+        source_dir = tmp_path / name
+        source_dir.mkdir()
+        source = source_dir / "orders.csv"
+        frames[source] = pd.DataFrame({"order_id": [1], "customer_id": [customer_id]})
+        frames[source].to_csv(source, index=False)
+        cache.save(source, frames[source])
+
+    for source, df in frames.items():
+        pd.testing.assert_frame_equal(cache.load(source), df)
+    # Every temporary file was renamed into place
+    assert not list((tmp_path / "cache").rglob("*.tmp"))
+
+
+def test_loader_uses_snapshot(tmp_path, monkeypatch):
+    """Test DataLoader reuses validated snapshots instead of re-parsing."""
+    input_dir = tmp_path / "input"
+    input_dir.mkdir()
+    pd.DataFrame({"order_id": [1, 2], "customer_id": [101, 102]}).to_csv(
+        input_dir / "orders.csv", index=False
+    )
+    pd.DataFrame({"barcode": [1001, 1001, 1002], "order_id": [1.0, 1.0, 2.0]}).to_csv(
+        input_dir / "barcodes.csv", index=False
+    )
+
+    snapshot_dir = tmp_path / "cache"
+    first = DataLoader(str(input_dir), snapshot_dir=str(snapshot_dir))
+    expected_orders = first.load_orders()
+    expected_barcodes = first.load_barcodes()
+
+    def fail_read_csv(*args, **kwargs):
+        raise AssertionError("CSV parsed despite valid snapshot")
+
+    monkeypatch.setattr(pd, "read_csv", fail_read_csv)
+    second = DataLoader(str(input_dir), snapshot_dir=str(snapshot_dir))
+    pd.testing.assert_frame_equal(
+        second.load_orders(), expected_orders.reset_index(drop=True)
+    )
+    pd.testing.assert_frame_equal(
+        second.load_barcodes(), expected_barcodes.reset_index(drop=True)
+    )
@@ -1,6 +1,7 @@
 import pandas as pd
 import pytest
 from src.data_processing.validator import barcodes_schema, orders_schema
+from src.exceptions import SchemaValidationError
 
 
 def test_valid_orders_data():
@@ -70,3 +71,37 @@ def test_duplicate_barcodes():
 
     with pytest.raises(Exception):
         barcodes_schema.validate(invalid_data)
+
+
+def test_report_lists_rows_and_reasons():
+    """Test every invalid value is reported with its row and reason."""
+    data = pd.DataFrame(
+        {"order_id": ["1", "x", "1", "2.5", None, "3"], "customer_id": range(6)}
+    )
+
+    validated_df, report = orders_schema.check(data)
+
+    assert validated_df["order_id"].tolist() == [1, 3]
+    assert validated_df.index.tolist() == [0, 5]
+    assert report.to_frame().to_dict("records") == [
+        {"row": 1, "column": "order_id", "reason": "not an integer"},
+        {"row": 2, "column": "order_id", "reason": "duplicate value"},
+        {"row": 3, "column": "order_id", "reason": "not an integer"},
+        {"row": 4, "column": "order_id", "reason": "null value"},
+    ]
+
+    with pytest.raises(SchemaValidationError) as excinfo:
+        orders_schema.validate(data.assign(extra=1))
+    assert excinfo.value.report.to_frame()["reason"].tolist() == ["unexpected column"]
+
+
+def test_validate_chunks_checks_uniqueness_across_chunks():
+    """Test chunked validation reports repeats of earlier chunks by file row."""
+    data = pd.DataFrame({"order_id": [1, 2, 3, 2], "customer_id": [5, 5, 6, 6]})
+    chunks = [data.iloc[:2], data.iloc[2:]]
+
+    validated = orders_schema.validate_chunks(chunks)
+    assert next(validated)["order_id"].tolist() == [1, 2]
+    with pytest.raises(SchemaValidationError) as excinfo:
+        next(validated)
+    assert excinfo.value.report.rows.tolist() == [3]
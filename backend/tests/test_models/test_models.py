@@ -58,19 +58,19 @@ def test_barcode_model(app):
         db.session.commit()
 
         # Test creation
-        barcode = Barcode(barcode_value="12345", order_id=order.id)
+        barcode = Barcode(barcode_value=12345, order_id=order.id)
         db.session.add(barcode)
         db.session.commit()
 
         # Test unique constraint
-        duplicate = Barcode(barcode_value="12345", order_id=order.id)
+        duplicate = Barcode(barcode_value=12345, order_id=order.id)
         db.session.add(duplicate)
         with pytest.raises(IntegrityError):
             db.session.commit()
         db.session.rollback()
 
         # Test nullable order_id (unused barcode)
-        unused = Barcode(barcode_value="54321")
+        unused = Barcode(barcode_value=54321)
         db.session.add(unused)
         db.session.commit()
 
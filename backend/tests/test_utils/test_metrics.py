@@ -0,0 +1,45 @@
+import json
+
+from src.utils.metrics import Metrics
+
+
+def test_disabled_metrics_record_nothing():
+    """Test disabled metrics share no-op stages and runs."""
+    metrics = Metrics()
+    with metrics.run() as run:
+        with metrics.stage("load_orders") as stage:
+            stage.rows = 10
+
+    assert run.stages == []
+    assert stage.rows is None
+    assert "load_orders" not in metrics.render_prometheus()
+
+
+def test_stages_recorded_in_run_and_prometheus(tmp_path):
+    """Test stages are collected by the active run and aggregated."""
+    metrics = Metrics(enabled=True, trace_memory=True)
+    with metrics.run(job_id="abc") as run:
+        with metrics.stage("load_orders") as outer:
+            with metrics.stage("validate_orders", rows=3):
+                data = [0] * 100_000
+            outer.rows = len(data)
+    with metrics.stage("load_orders", rows=2):
+        pass
+
+    assert [stage["name"] for stage in run.stages] == [
+        "validate_orders",
+        "load_orders",
+    ]
+    inner, outer = run.stages
+    assert outer["peak_memory_bytes"] >= inner["peak_memory_bytes"] > 800_000
+    assert outer["wall_seconds"] >= inner["wall_seconds"]
+
+    run.write(tmp_path / "report.json")
+    report = json.loads((tmp_path / "report.json").read_text())
+    assert report["job_id"] == "abc"
+    assert report["stages"][1]["rows"] == 100_000
+
+    text = metrics.render_prometheus()
+    assert 'tiqets_stage_wall_seconds_count{stage="load_orders"} 2' in text
+    assert 'tiqets_stage_rows_total{stage="load_orders"} 100002' in text
+    assert "# TYPE tiqets_stage_cpu_seconds_total counter" in text
@@ -1,3 +1,4 @@
+import argparse
 import signal
 import sys
 from pathlib import Path
@@ -6,8 +7,12 @@ backend_path = Path(__file__).resolve().parent.parent
 if str(backend_path) not in sys.path:
     sys.path.insert(0, str(backend_path))
 
-from src.data_processing.processor import OrderProcessor
+from app.core.config import Config
+from src.data_processing.analytics import top_customers_from_csv
+from src.data_processing.incremental import IncrementalProcessor
+from src.data_processing.processor import DEFAULT_MEMORY_BUDGET_MB, OrderProcessor
 from src.utils.logger import setup_logger
+from src.utils.metrics import Metrics
 
 
 def signal_handler(sig, frame):
@@ -15,7 +20,91 @@ def signal_handler(sig, frame):
     sys.exit(0)
 
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Process orders and barcodes")
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="process inputs in bounded chunks and write the output directly",
+    )
+    parser.add_argument(
+        "--memory-budget-mb",
+        type=float,
+        default=DEFAULT_MEMORY_BUDGET_MB,
+        help="memory budget per chunk/partition in streaming mode",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="only process rows added or changed since the last run",
+    )
+    parser.add_argument(
+        "--snapshot-dir",
+        help="directory for columnar snapshots of validated inputs",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=Config.PROCESS_WORKERS,
+        help="worker processes for partitioned processing (1 disables the pool)",
+    )
+    parser.add_argument(
+        "--partition-size",
+        type=int,
+        default=Config.PARTITION_SIZE,
+        help="orders per partition in parallel mode",
+    )
+    parser.add_argument(
+        "--metrics",
+        action="store_true",
+        help="record per-stage timings and write run_report.json to the output",
+    )
+    parser.add_argument(
+        "--trace-memory",
+        action="store_true",
+        help="measure per-stage peak memory with tracemalloc (slower)",
+    )
+    return parser.parse_args()
+
+
+def run(args, processor: OrderProcessor):
+    """Run the pipeline selected by the command line arguments."""
+    if args.stream:
+        output_path = processor.process_streaming(
+            memory_budget_mb=args.memory_budget_mb
+        )
+        print("\nTop 5 customers by number of tickets:")
+        for customer_id, ticket_count in top_customers_from_csv(output_path, 5):
+            print(f"Customer {customer_id}: {ticket_count}")
+        return
+
+    # process data
+    if args.incremental:
+        result_df, delta_df = IncrementalProcessor(processor).run()
+        print(f"\nChanged orders since last run: {len(delta_df)}")
+    elif args.workers > 1:
+        result_df = processor.process_parallel(args.workers, args.partition_size)
+    else:
+        result_df = processor.process_dataset()
+
+    # get top customers
+    top_customers = processor.get_top_customers(result_df)
+    print("\nTop 5 customers by number of tickets:")
+    for customer_id, ticket_count in top_customers:
+        print(f"Customer {customer_id}: {ticket_count}")
+
+    # get unused barcodes count
+    unused_count, _ = processor.get_unused_barcodes(result_df)
+    print(f"\nUnused barcodes: {unused_count}")
+
+    # save results (incremental runs have saved them already)
+    if not args.incremental:
+        processor.save_results(result_df)
+
+
 def main():
+    args = parse_args()
+
     # Handle Ctrl+C gracefully
     signal.signal(signal.SIGINT, signal_handler)
 
@@ -25,23 +114,14 @@ def main():
 
     try:
         # initialize processor
-        processor = OrderProcessor(logger)
-
-        # process data
-        result_df = processor.process()
-
-        # get top customers
-        top_customers = processor.get_top_customers(result_df)
-        print("\nTop 5 customers by number of tickets:")
-        for customer_id, ticket_count in top_customers:
-            print(f"Customer {customer_id}: {ticket_count}")
-
-        # get unused barcodes count
-        unused_count, _ = processor.get_unused_barcodes(result_df)
-        print(f"\nUnused barcodes: {unused_count}")
-
-        # save results
-        processor.save_results(result_df)
+        processor = OrderProcessor(
+            logger,
+            snapshot_dir=args.snapshot_dir,
+            metrics=Metrics(enabled=args.metrics, trace_memory=args.trace_memory),
+        )
+        with processor.metrics.run() as metrics_run:
+            run(args, processor)
+        processor.save_run_report(metrics_run)
         logger.info("Processing completed successfully")
 
     except Exception as e: